@@ -0,0 +1,52 @@
+"""
+Importa tareas desde un archivo NDJSON o CSV sin pasar por la API.
+
+Usa la base de datos configurada en el entorno (.env) y el mismo proceso
+de validación e inserción (COPY en PostgreSQL) que POST /import/tasks.
+
+Uso:
+    python -m app.cli.import_tasks --api-key <api-key> tareas.ndjson
+    python -m app.cli.import_tasks --api-key <api-key> --format csv tareas.csv
+    cat tareas.ndjson | python -m app.cli.import_tasks --api-key <api-key> -
+"""
+import argparse
+import json
+import sys
+from time import perf_counter
+from fastapi import HTTPException
+from app.config.database import SessionLocal
+from app.services.import_service import ImportService
+from app.utils.auth import _load_user
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import tasks from an NDJSON or CSV file")
+    parser.add_argument("file", help="path to the file, or - for stdin")
+    parser.add_argument("--api-key", required=True, help="API key of the user that owns the lists")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default=None, help="defaults to the file extension")
+    args = parser.parse_args(argv)
+
+    format = args.format or ("csv" if args.file.endswith(".csv") else "ndjson")
+    with SessionLocal() as db:
+        try:
+            user = _load_user(db, args.api_key)
+        except HTTPException as exc:
+            print(exc.detail, file=sys.stderr)
+            return 1
+
+        start = perf_counter()
+        if args.file == "-":
+            result = ImportService(db).import_tasks(user.user_id, sys.stdin, format)
+        else:
+            with open(args.file, encoding="utf-8-sig", errors="replace", newline="") as lines:
+                result = ImportService(db).import_tasks(user.user_id, lines, format)
+        elapsed = perf_counter() - start
+
+    print(json.dumps(result, indent=2))
+    rows = result["imported"] + result["failed"]
+    print(f"{result['imported']} imported, {result['failed']} failed in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)", file=sys.stderr)
+    return 0 if not result["failed"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
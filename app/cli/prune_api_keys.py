@@ -0,0 +1,31 @@
+"""
+Elimina las API keys vencidas o revocadas de la base de datos configurada.
+
+El servidor (main.py) ya lo hace cada API_KEY_PRUNE_INTERVAL_SECONDS; en
+Cloud Functions, donde no hay tareas en segundo plano, se ejecuta desde un
+cron o Cloud Scheduler.
+
+Uso:
+    python -m app.cli.prune_api_keys
+    python -m app.cli.prune_api_keys --batch-size 500
+"""
+import argparse
+import sys
+from time import perf_counter
+from app.config.settings import API_KEY_PRUNE_BATCH_SIZE
+from app.services.api_key_service import prune_api_keys
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Delete expired and revoked API keys in batches")
+    parser.add_argument("--batch-size", type=int, default=API_KEY_PRUNE_BATCH_SIZE, help="rows deleted per transaction")
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    deleted = prune_api_keys(args.batch_size)
+    print(f"{deleted} API keys deleted in {perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
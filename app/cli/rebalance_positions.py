@@ -0,0 +1,33 @@
+"""
+Reasigna claves cortas de Task.position en las listas cuyas claves crecieron
+más de REBALANCE_POSITION_LENGTH caracteres por inserciones repetidas en el
+mismo lugar.
+
+El servidor (main.py) ya lo hace cada POSITION_REBALANCE_INTERVAL_SECONDS; en
+Cloud Functions, donde no hay tareas en segundo plano, se ejecuta desde un
+cron o Cloud Scheduler.
+
+Uso:
+    python -m app.cli.rebalance_positions
+    python -m app.cli.rebalance_positions --batch-size 500
+"""
+import argparse
+import sys
+from time import perf_counter
+from app.config.settings import POSITION_REBALANCE_BATCH_SIZE
+from app.services.position_service import rebalance_positions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rewrite long task positions with short keys, list by list")
+    parser.add_argument("--batch-size", type=int, default=POSITION_REBALANCE_BATCH_SIZE, help="tasks updated per transaction")
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    rebalanced = rebalance_positions(args.batch_size)
+    print(f"{rebalanced} lists rebalanced in {perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,255 @@
-from sqlalchemy import create_engine
+from threading import Lock
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from os import getenv
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Obtener las variables de entorno
-DB_HOST = getenv("DB_HOST")
-DB_PORT = getenv("DB_PORT")
-DB_DATABASE = getenv("DB_DATABASE")
-DB_USER = getenv("DB_USER")
-DB_PASSWORD = getenv("DB_PASSWORD")
-DB_SSL = getenv("DB_SSL", "false").lower() == "true"
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from app.config.settings import (
+    DB_HOST, DB_PORT, DB_DATABASE, DB_USER, DB_PASSWORD, DB_SSL, DB_ASYNC,
+    DB_POOL_MODE, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+    DB_REPLICA_URLS
+)
+from app.utils.pool_metrics import (
+    InstrumentedAsyncQueuePool, InstrumentedNullPool, InstrumentedQueuePool, instrument_engine
+)
+from app.utils.query_metrics import instrument_queries
+from app.utils.replicas import REPLICA_LAG_QUERY, recent_writes, replica_router
 
 # Construir la URL de conexión
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_DATABASE}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_DATABASE}"
 
 # Configurar SSL si está habilitado
 connect_args = {}
+async_connect_args = {}
 if DB_SSL:
     connect_args["sslmode"] = "require"
+    async_connect_args["ssl"] = "require"
+
+def pool_options(async_mode: bool = False) -> dict:
+    """Opciones de pool para create_engine/create_async_engine según la configuración."""
+    if DB_POOL_MODE == "null":
+        return {"poolclass": InstrumentedNullPool, "pool_pre_ping": DB_POOL_PRE_PING}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if async_mode else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
 
-# Crear el engine con la configuración
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+# Los engines se crean en el primer uso y no al importar el módulo: en Cloud
+# Functions el arranque en frío no paga la carga del driver ni la creación del
+# pool, y las instancias que no llegan a consultar la base nunca lo hacen
+_engines = {}
+_engines_lock = Lock()
+
+def _build_sync_engine() -> dict:
+    engine = create_engine(DATABASE_URL, connect_args=connect_args, **pool_options())
+    instrument_engine("primary", engine)
+    instrument_queries(engine)
+    return {
+        "engine": engine,
+        "SessionLocal": sessionmaker(autocommit=False, autoflush=False, bind=engine),
+    }
+
+def _build_async_engine() -> dict:
+    # Engine asíncrono (DB_ASYNC=true): las consultas no bloquean el event loop
+    if not DB_ASYNC:
+        return {"async_engine": None, "AsyncSessionLocal": None}
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args=async_connect_args, **pool_options(async_mode=True))
+    instrument_engine("primary_async", async_engine.sync_engine)
+    instrument_queries(async_engine.sync_engine)
+    return {
+        "async_engine": async_engine,
+        "AsyncSessionLocal": async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False),
+    }
+
+def _build_replica_engines() -> dict:
+    # Un engine (y un pool) por réplica, del mismo tipo que el del primario
+    factories = []
+    for index, url in enumerate(DB_REPLICA_URLS):
+        if DB_ASYNC:
+            replica_engine = create_async_engine(
+                url.replace("postgresql://", "postgresql+asyncpg://", 1),
+                connect_args=async_connect_args, **pool_options(async_mode=True)
+            )
+            sync_engine = replica_engine.sync_engine
+            factories.append(async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False))
+        else:
+            replica_engine = sync_engine = create_engine(url, connect_args=connect_args, **pool_options())
+            factories.append(sessionmaker(autocommit=False, autoflush=False, bind=replica_engine))
+        instrument_engine(replica_router.replicas[index].name, sync_engine)
+        instrument_queries(sync_engine)
+    return {"ReplicaSessions": factories}
+
+_ENGINE_BUILDERS = {
+    "engine": _build_sync_engine,
+    "SessionLocal": _build_sync_engine,
+    "async_engine": _build_async_engine,
+    "AsyncSessionLocal": _build_async_engine,
+    "ReplicaSessions": _build_replica_engines,
+}
+
+def __getattr__(name: str):
+    """
+    engine, SessionLocal, async_engine y AsyncSessionLocal se siguen
+    importando desde este módulo, pero se construyen al accederlos por primera vez.
+    """
+    builder = _ENGINE_BUILDERS.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in _engines:
+        with _engines_lock:
+            if name not in _engines:
+                _engines.update(builder())
+    return _engines[name]
+
+def get_engine():
+    return __getattr__("engine")
+
+def get_session_factory():
+    return __getattr__("SessionLocal")
+
+def get_async_session_factory():
+    return __getattr__("AsyncSessionLocal")
+
+def get_sync_db():
+    db = get_session_factory()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
+
+# Dependencia usada por los controladores según el modo configurado
+get_db = get_async_db if DB_ASYNC else get_sync_db
+
+def get_sync_read_db():
+    db = _open_sync_read_session()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_read_db():
+    async with await _open_async_read_session() as db:
+        yield db
+
+def _open_sync_read_session():
+    factories = __getattr__("ReplicaSessions")
+    for index in replica_router.candidates():
+        db = factories[index]()
+        try:
+            # Se obtiene la conexión ya: si la réplica no responde se prueba la siguiente
+            if replica_router.check_due(index):
+                available = replica_router.record_lag(index, float(db.execute(text(REPLICA_LAG_QUERY)).scalar()))
+            else:
+                db.connection()
+                available = True
+        except SQLAlchemyError:
+            replica_router.record_failure(index)
+            available = False
+        if available:
+            return _assign_replica(db, index)
+        db.close()
+    replica_router.record_primary_fallback()
+    return get_session_factory()()
+
+async def _open_async_read_session():
+    factories = __getattr__("ReplicaSessions")
+    for index in replica_router.candidates():
+        db = factories[index]()
+        try:
+            if replica_router.check_due(index):
+                lag = (await db.execute(text(REPLICA_LAG_QUERY))).scalar()
+                available = replica_router.record_lag(index, float(lag))
+            else:
+                await db.connection()
+                available = True
+        except SQLAlchemyError:
+            replica_router.record_failure(index)
+            available = False
+        if available:
+            return _assign_replica(db, index)
+        await db.close()
+    replica_router.record_primary_fallback()
+    return get_async_session_factory()()
+
+def _assign_replica(db, index: int):
+    db.info["replica"] = index
+    replica_router.record_session(index)
+    return db
+
+# Dependencia de las rutas de lectura (GET): una sesión sobre una réplica
+# disponible, o sobre el primario si no hay réplicas configuradas o disponibles
+get_read_db = (get_async_read_db if DB_ASYNC else get_sync_read_db) if DB_REPLICA_URLS else get_db
+
+async def use_primary(db) -> None:
+    """
+    Pasa una sesión de get_read_db de su réplica al primario; las consultas
+    siguientes de la petición se hacen en el primario. No hace nada si la
+    sesión ya es del primario.
+    """
+    if db.info.pop("replica", None) is None:
+        return
+    await close_db(db)
+    if isinstance(db, AsyncSession):
+        primary = __getattr__("async_engine")
+        db.bind = primary
+        db.sync_session.bind = primary.sync_engine
+    else:
+        db.bind = get_engine()
+
+def _record_writes(session: Session) -> None:
+    # Usuarios cuya versión de datos incrementó la transacción confirmada
+    # (bump_data_version): sus próximas lecturas van al primario
+    user_ids = session.info.pop("written_users", None)
+    if user_ids:
+        recent_writes.mark(user_ids)
+
+def _discard_writes(session: Session) -> None:
+    session.info.pop("written_users", None)
+
+if DB_REPLICA_URLS:
+    event.listen(Session, "after_commit", _record_writes)
+    event.listen(Session, "after_rollback", _discard_writes)
+
+async def close_db(db) -> None:
+    """Cierra la sesión y devuelve su conexión al pool antes de que termine la petición."""
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Ejecuta fn(session, *args, **kwargs) sin bloquear el event loop.
+
+    Con una AsyncSession la función se ejecuta sobre el driver asyncpg mediante
+    run_sync; con una Session síncrona se ejecuta en el threadpool de Starlette.
+    Si la sesión es de una réplica y la consulta falla (réplica caída o
+    consulta cancelada por la recuperación), se reintenta en el primario.
+    """
+    try:
+        return await _run_db(db, fn, *args, **kwargs)
+    except OperationalError:
+        index = db.info.get("replica")
+        if index is None:
+            raise
+        replica_router.record_failure(index)
+        replica_router.record_primary_fallback()
+        await use_primary(db)
+        return await _run_db(db, fn, *args, **kwargs)
+
+async def _run_db(db, fn, *args, **kwargs):
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
@@ -0,0 +1,110 @@
+from os import getenv
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Configuración de la base de datos
+DB_HOST = getenv("DB_HOST")
+DB_PORT = getenv("DB_PORT")
+DB_DATABASE = getenv("DB_DATABASE")
+DB_USER = getenv("DB_USER")
+DB_PASSWORD = getenv("DB_PASSWORD")
+DB_SSL = getenv("DB_SSL", "false").lower() == "true"
+# Usa el driver asyncpg y AsyncSession en lugar de psycopg2
+DB_ASYNC = getenv("DB_ASYNC", "false").lower() == "true"
+
+# Pool de conexiones. DB_POOL_MODE=null abre una conexión por uso (NullPool),
+# recomendado en Cloud Functions o detrás de PgBouncer
+DB_POOL_MODE = getenv("DB_POOL_MODE", "queue").lower()
+DB_POOL_SIZE = int(getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Réplicas de lectura (opcional): DSNs postgresql:// separados por comas, cada
+# uno con su propio pool. Las rutas GET leen de una réplica salvo durante
+# READ_YOUR_WRITES_SECONDS después de una escritura del usuario. El retraso de
+# cada réplica se mide cada DB_REPLICA_CHECK_SECONDS; si supera
+# DB_REPLICA_MAX_LAG_SECONDS o la réplica falla, se omite durante
+# DB_REPLICA_RETRY_SECONDS y se lee del primario
+DB_REPLICA_URLS = [url.strip() for url in getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_MAX_LAG_SECONDS = float(getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_CHECK_SECONDS = float(getenv("DB_REPLICA_CHECK_SECONDS", "10"))
+DB_REPLICA_RETRY_SECONDS = float(getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+READ_YOUR_WRITES_SECONDS = float(getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+# Caché de autenticación por API key (0 desactiva la caché)
+AUTH_CACHE_TTL_SECONDS = float(getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_SIZE = int(getenv("AUTH_CACHE_MAX_SIZE", "10000"))
+
+# API keys: vigencia, máximo de keys activas por usuario (al emitir una nueva
+# se revocan las más antiguas) y limpieza periódica de keys vencidas o
+# revocadas (0 desactiva la tarea en segundo plano; ver app.cli.prune_api_keys)
+API_KEY_EXPIRATION_HOURS = float(getenv("API_KEY_EXPIRATION_HOURS", "24"))
+API_KEY_MAX_ACTIVE = int(getenv("API_KEY_MAX_ACTIVE", "5"))
+API_KEY_PRUNE_INTERVAL_SECONDS = float(getenv("API_KEY_PRUNE_INTERVAL_SECONDS", "3600"))
+API_KEY_PRUNE_BATCH_SIZE = int(getenv("API_KEY_PRUNE_BATCH_SIZE", "1000"))
+
+# Rebalanceo periódico de Task.position en las listas con claves largas (0
+# desactiva la tarea en segundo plano; ver app.cli.rebalance_positions)
+POSITION_REBALANCE_INTERVAL_SECONDS = float(getenv("POSITION_REBALANCE_INTERVAL_SECONDS", "3600"))
+POSITION_REBALANCE_BATCH_SIZE = int(getenv("POSITION_REBALANCE_BATCH_SIZE", "1000"))
+
+# Hashing de contraseñas (bcrypt) en un pool de threads dedicado
+BCRYPT_ROUNDS = int(getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(getenv("PASSWORD_HASH_WORKERS", "2"))
+# Operaciones en curso o en cola permitidas antes de responder 503
+PASSWORD_HASH_MAX_PENDING = int(getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+# Límite de peticiones (token bucket): "memory" (por worker), "redis"
+# (compartido, usa REDIS_URL) o "none". Cada API key admite ráfagas de
+# RATE_LIMIT_BURST peticiones y luego RATE_LIMIT_PER_SECOND por segundo;
+# /auth/login, /auth/register y las API keys inválidas se limitan por IP del
+# cliente
+RATE_LIMIT_BACKEND = getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_PER_SECOND = float(getenv("RATE_LIMIT_PER_SECOND", "20"))
+RATE_LIMIT_BURST = int(getenv("RATE_LIMIT_BURST", "100"))
+AUTH_RATE_LIMIT_PER_SECOND = float(getenv("AUTH_RATE_LIMIT_PER_SECOND", "0.2"))
+AUTH_RATE_LIMIT_BURST = int(getenv("AUTH_RATE_LIMIT_BURST", "10"))
+# Tomar la IP del cliente de X-Forwarded-For (solo detrás de un proxy de confianza)
+RATE_LIMIT_TRUST_FORWARDED = getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+# Con el backend redis, los contadores de uso de una key o IP sin peticiones
+# durante este tiempo se eliminan
+RATE_LIMIT_USAGE_TTL_SECONDS = int(getenv("RATE_LIMIT_USAGE_TTL_SECONDS", "86400"))
+
+# Caché de lecturas de listas y tareas: "none", "memory" (un solo worker) o "redis"
+CACHE_BACKEND = getenv("CACHE_BACKEND", "none").lower()
+CACHE_TTL_SECONDS = float(getenv("CACHE_TTL_SECONDS", "300"))
+REDIS_URL = getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Eventos de cambios en tiempo real (GET /events, WebSocket /events/ws):
+# "memory" (solo las conexiones del mismo worker), "postgres" (LISTEN/NOTIFY,
+# entre todos los workers) o "none". Eventos en cola por conexión antes de
+# pedirle al cliente que sincronice con GET /sync, y segundos entre heartbeats
+CHANGE_FEED_BACKEND = getenv("CHANGE_FEED_BACKEND", "memory").lower()
+CHANGE_FEED_QUEUE_SIZE = int(getenv("CHANGE_FEED_QUEUE_SIZE", "100"))
+CHANGE_FEED_HEARTBEAT_SECONDS = float(getenv("CHANGE_FEED_HEARTBEAT_SECONDS", "15"))
+
+# Serialización de las lecturas: "orjson" (filas directo a JSON) o "pydantic"
+# (validación con TypeAdapters precompilados antes de serializar)
+RESPONSE_SERIALIZATION = getenv("RESPONSE_SERIALIZATION", "orjson").lower()
+
+# Token de operador para /metrics (header X-Metrics-Token); sin token
+# configurado los endpoints de métricas responden 404
+METRICS_TOKEN = getenv("METRICS_TOKEN", "")
+
+# Conteo de consultas por petición (header Server-Timing y /metrics)
+QUERY_METRICS_ENABLED = getenv("QUERY_METRICS_ENABLED", "true").lower() == "true"
+# Las consultas que tardan más que este umbral se registran en el log con su ruta
+SLOW_QUERY_THRESHOLD_MS = float(getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+
+# Filas por consulta en las exportaciones (GET /export/...)
+EXPORT_CHUNK_SIZE = int(getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+# Importación masiva de tareas: filas validadas y copiadas por lote,
+# cantidad máxima de errores por fila incluidos en la respuesta y tamaño
+# máximo del cuerpo de POST /import/tasks (100 MB)
+IMPORT_BATCH_SIZE = int(getenv("IMPORT_BATCH_SIZE", "5000"))
+IMPORT_MAX_ERRORS = int(getenv("IMPORT_MAX_ERRORS", "1000"))
+IMPORT_MAX_BYTES = int(getenv("IMPORT_MAX_BYTES", "104857600"))
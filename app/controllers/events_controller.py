@@ -0,0 +1,125 @@
+import asyncio
+from typing import Optional, Tuple
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.config.database import close_db, get_db
+from app.config.settings import CHANGE_FEED_HEARTBEAT_SECONDS
+from app.utils.auth import get_current_user
+from app.utils.auth_cache import CurrentUser
+from app.utils.change_feed import change_feed
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# Marcador de Sec-WebSocket-Protocol: el subprotocolo siguiente es la API key
+API_KEY_SUBPROTOCOL = "api-key"
+
+@router.get("/")
+async def stream_events(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Eventos de cambios de las listas y tareas del usuario autenticado (Server-Sent Events).
+
+    Cada evento tiene como nombre el tipo de cambio (task.created, task.updated,
+    task.deleted, list.created, list.updated, list.deleted, task.imported o
+    resync) y como id el token de GET /sync de la escritura. Los datos incluyen
+    los ids afectados (null si son demasiados). Ante un resync, o al reconectar,
+    el cliente obtiene los cambios con GET /sync?since=<último token>.
+    Cada CHANGE_FEED_HEARTBEAT_SECONDS se envía un comentario para mantener la
+    conexión abierta.
+    Requiere autenticación mediante API key en el header 'X-API-Key'.
+    """
+    _ensure_enabled()
+    # La conexión usada para autenticar vuelve al pool: el stream no la retiene
+    await close_db(db)
+    user_id = current_user.user_id
+
+    async def events():
+        # La suscripción se crea al empezar el stream, dentro del async with: si
+        # el cliente se desconecta antes, nunca se registra en el hub. Los eventos
+        # llegan a partir de ": connected"
+        async with change_feed.subscribe(user_id) as subscription:
+            yield b": connected\n\n"
+            while True:
+                event = await subscription.get(CHANGE_FEED_HEARTBEAT_SECONDS)
+                yield _encode_sse(event) if event is not None else b": ping\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    db: Session = Depends(get_db)
+):
+    """
+    Los mismos eventos que GET /events sobre WebSocket, como mensajes JSON.
+    La API key se envía en el header 'X-API-Key' o, desde navegadores (que no
+    permiten headers), como subprotocolo: new WebSocket(url, ["api-key", key]).
+    Nunca en la URL, que queda en los logs de proxies y servidores.
+    Los heartbeats son mensajes {"type": "ping"}.
+    """
+    api_key, subprotocol = _websocket_api_key(websocket)
+    try:
+        _ensure_enabled()
+        current_user = await get_current_user(websocket, api_key or "", db)
+    except HTTPException as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=exc.detail)
+        return
+    finally:
+        await close_db(db)
+
+    # El servidor debe confirmar uno de los subprotocolos ofrecidos: el
+    # marcador, nunca la key
+    await websocket.accept(subprotocol=subprotocol)
+    receiver = asyncio.create_task(_wait_disconnect(websocket))
+    try:
+        async with change_feed.subscribe(current_user.user_id) as subscription:
+            while True:
+                getter = asyncio.create_task(subscription.get(CHANGE_FEED_HEARTBEAT_SECONDS))
+                done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+                if receiver in done:
+                    getter.cancel()
+                    break
+                event = getter.result()
+                await websocket.send_bytes(orjson.dumps(event if event is not None else {"type": "ping"}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+
+def _websocket_api_key(websocket: WebSocket) -> Tuple[Optional[str], Optional[str]]:
+    """Retorna (API key, subprotocolo a confirmar) del header o de Sec-WebSocket-Protocol."""
+    api_key = websocket.headers.get("x-api-key")
+    if api_key:
+        return api_key, None
+    protocols = websocket.scope.get("subprotocols", [])
+    if API_KEY_SUBPROTOCOL in protocols:
+        index = protocols.index(API_KEY_SUBPROTOCOL)
+        if index + 1 < len(protocols):
+            return protocols[index + 1], API_KEY_SUBPROTOCOL
+    return None, None
+
+def _ensure_enabled():
+    if not change_feed.enabled:
+        raise HTTPException(status_code=503, detail="Change feed is disabled")
+
+async def _wait_disconnect(websocket: WebSocket):
+    # Los mensajes del cliente se ignoran; solo interesa detectar el cierre
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+def _encode_sse(event: dict) -> bytes:
+    lines = [f"event: {event['type']}"]
+    if event.get("token") is not None:
+        lines.append(f"id: {event['token']}")
+    lines.append(f"data: {orjson.dumps(event).decode()}")
+    return ("\n".join(lines) + "\n\n").encode()
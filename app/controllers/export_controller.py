@@ -0,0 +1,83 @@
+import csv
+import io
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.config.database import get_read_db
+from app.config.settings import EXPORT_CHUNK_SIZE
+from app.services.async_service import AsyncService
+from app.services.export_service import EXPORT_COLUMNS, ExportService
+from app.utils.auth import get_current_reader
+from app.utils.auth_cache import CurrentUser
+from app.models.schemas import ExportFormat, ExportResource
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+@router.get("/{resource}")
+async def export(
+    resource: ExportResource,
+    format: ExportFormat = ExportFormat.ndjson,
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_reader)
+):
+    """
+    Exporta todas las listas o tareas del usuario autenticado, en streaming.
+    
+    - **resource**: lists o tasks
+    - **format**: ndjson (un objeto JSON por línea, por defecto) o csv
+    - **after_id**: Reanuda la exportación después de este list_id/task_id
+    
+    Las filas se envían en orden de id, por bloques, sin cargar el conjunto
+    completo en memoria. Si la descarga se interrumpe, se puede reanudar
+    enviando como after_id el último id recibido.
+    Requiere autenticación mediante API key en el header 'X-API-Key'.
+    """
+    service = AsyncService(ExportService, db)
+    encode = _encode_csv if format == ExportFormat.csv else _encode_ndjson
+    columns = EXPORT_COLUMNS[resource.value]
+    id_key = columns[0]
+
+    async def rows():
+        if format == ExportFormat.csv:
+            yield _csv_line(columns)
+        last_id = after_id
+        while True:
+            chunk = await service.get_chunk(resource.value, current_user.user_id, last_id, EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield encode(chunk, columns)
+            last_id = chunk[-1][id_key]
+            if len(chunk) < EXPORT_CHUNK_SIZE:
+                break
+
+    return StreamingResponse(
+        rows(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{resource.value}.{format.value}"'}
+    )
+
+def _encode_ndjson(rows: list, columns: list) -> bytes:
+    return b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+def _encode_csv(rows: list, columns: list) -> bytes:
+    return b"".join(_csv_line([_csv_value(row[column]) for column in columns]) for row in rows)
+
+def _csv_line(values: list) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue().encode()
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value.isoformat() if hasattr(value, "isoformat") else value
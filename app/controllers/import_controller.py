@@ -0,0 +1,53 @@
+import io
+from tempfile import SpooledTemporaryFile
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from app.config.database import get_db
+from app.config.settings import IMPORT_MAX_BYTES
+from app.services.async_service import AsyncService
+from app.services.import_service import ImportService
+from app.utils.auth import get_current_user
+from app.utils.auth_cache import CurrentUser
+from app.models.schemas import ImportFormat, ImportResponse
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+# Cuerpos más grandes que esto se guardan en disco mientras se importan
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+@router.post("/tasks", response_model=ImportResponse)
+async def import_tasks(
+    request: Request,
+    format: ImportFormat = ImportFormat.ndjson,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Importa tareas de forma masiva desde el cuerpo de la petición.
+    
+    - **format**: ndjson (un objeto por línea, por defecto) o csv (con encabezado)
+    
+    Cada fila tiene los mismos campos que POST /tasks (list_id, task_name,
+    description, is_completed). Las filas válidas se insertan en una sola
+    transacción; las inválidas (también las que no son UTF-8 válido) o de
+    listas ajenas se omiten y se reportan con su número de línea. Un cuerpo
+    de más de IMPORT_MAX_BYTES se rechaza con 413.
+    Requiere autenticación mediante API key en el header 'X-API-Key'.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Request body too large")
+
+    with SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as body:
+        # Sin Content-Length (chunked) el límite se controla mientras se recibe
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="Request body too large")
+            body.write(chunk)
+        body.seek(0)
+        # Los bytes inválidos se reemplazan por U+FFFD y la fila se reporta como error
+        lines = io.TextIOWrapper(body, encoding="utf-8-sig", errors="replace", newline="")
+        service = AsyncService(ImportService, db)
+        return await service.import_tasks(current_user.user_id, lines, format.value)
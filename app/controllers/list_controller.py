@@ -1,32 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from app.config.database import get_db
+from typing import List, Optional
+from app.config.database import get_db, get_read_db
 from app.services.list_service import ListService
-from app.utils.auth import get_current_user
-from app.models.models import User
-from app.models.schemas import ListCreateRequest, ListResponse
+from app.services.async_service import AsyncService
+from app.utils.auth import get_current_user, get_current_reader
+from app.utils.auth_cache import CurrentUser
+from app.utils.etag import etag_matches
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.serialization import json_response, list_adapter, list_summaries_adapter, lists_adapter
+from app.models.schemas import ListCreateRequest, ListResponse, ListSummaryResponse
 
 router = APIRouter(prefix="/lists", tags=["lists"])
 
-@router.get("/", response_model=List[ListResponse])
+@router.get(
+    "/",
+    response_model=List[ListResponse],
+    responses={200: {
+        "description": "Listas del usuario; con summary=true cada una tiene la forma de ListSummaryResponse",
+        "content": {"application/json": {"examples": {
+            "default": {"value": [ListResponse.model_config["json_schema_extra"]["example"]]},
+            "summary": {"value": [ListSummaryResponse.model_config["json_schema_extra"]["example"]]}
+        }}}
+    }}
+)
 async def get_lists(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    summary: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_reader)
 ):
     """
-    Obtiene todas las listas de tareas del usuario autenticado.
+    Obtiene las listas de tareas del usuario autenticado, ordenadas por fecha de creación.
+    
+    - **limit**: Tamaño de página (por defecto 100, máximo 1000)
+    - **cursor**: Cursor de la página siguiente, tomado del header 'X-Next-Cursor'
+    - **summary**: Si es true, cada lista incluye task_count, completed_count y
+      last_activity, calculados en la misma consulta
     
     Requiere autenticación mediante API key en el header 'X-API-Key'.
+    Si existen más resultados, la respuesta incluye el header 'X-Next-Cursor'.
+    La respuesta incluye un 'ETag'; si se envía en 'If-None-Match' y nada
+    cambió, se responde 304 sin cuerpo.
     """
-    service = ListService(db)
-    return service.get_user_lists(current_user.user_id)
+    service = AsyncService(ListService, db)
+    etag = await service.get_lists_etag(current_user.user_id, cursor=cursor, limit=limit, summary=summary)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    page = await service.get_user_lists(current_user.user_id, cursor=cursor, limit=limit, summary=summary, etag=etag)
+    headers = {"ETag": etag}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return json_response(list_summaries_adapter if summary else lists_adapter, page.items, headers=headers)
 
 @router.get("/{list_id}", response_model=ListResponse)
 async def get_list(
     list_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_reader)
 ):
     """
     Obtiene una lista de tareas específica por su ID.
@@ -36,14 +70,14 @@ async def get_list(
     Requiere autenticación mediante API key en el header 'X-API-Key'.
     Solo puede acceder a las listas propias del usuario.
     """
-    service = ListService(db)
-    return service.get_list(list_id, current_user.user_id)
+    service = AsyncService(ListService, db)
+    return json_response(list_adapter, await service.get_list(list_id, current_user.user_id))
 
 @router.post("/", response_model=ListResponse, status_code=201)
 async def create_list(
     list_data: ListCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Crea una nueva lista de tareas.
@@ -53,15 +87,15 @@ async def create_list(
     Requiere autenticación mediante API key en el header 'X-API-Key'.
     La lista se asociará automáticamente al usuario autenticado.
     """
-    service = ListService(db)
-    return service.create_list(current_user.user_id, list_data.list_name)
+    service = AsyncService(ListService, db)
+    return await service.create_list(current_user.user_id, list_data.list_name)
 
 @router.put("/{list_id}", response_model=ListResponse)
 async def update_list(
     list_id: int,
     list_data: ListCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Actualiza una lista de tareas existente.
@@ -72,14 +106,14 @@ async def update_list(
     Requiere autenticación mediante API key en el header 'X-API-Key'.
     Solo puede modificar las listas propias del usuario.
     """
-    service = ListService(db)
-    return service.update_list(list_id, current_user.user_id, {"list_name": list_data.list_name})
+    service = AsyncService(ListService, db)
+    return await service.update_list(list_id, current_user.user_id, {"list_name": list_data.list_name})
 
 @router.delete("/{list_id}")
 async def delete_list(
     list_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Elimina una lista de tareas.
@@ -90,7 +124,7 @@ async def delete_list(
     Solo puede eliminar las listas propias del usuario.
     Al eliminar una lista, se eliminarán también todas las tareas asociadas.
     """
-    service = ListService(db)
-    if service.delete_list(list_id, current_user.user_id):
+    service = AsyncService(ListService, db)
+    if await service.delete_list(list_id, current_user.user_id):
         return {"message": "List deleted successfully"}
     raise HTTPException(status_code=404, detail="List not found") 
\ No newline at end of file
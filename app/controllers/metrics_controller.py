@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends
+from app.utils.auth import require_metrics_token
+from app.utils.auth_cache import api_key_cache
+from app.utils.cache import response_cache
+from app.utils.change_feed import change_feed
+from app.utils.password_hasher import password_hasher
+from app.utils.pool_metrics import pool_stats
+from app.utils.query_metrics import query_metrics
+from app.utils.rate_limit import api_key_rate_limiter, auth_rate_limiter
+from app.utils.replicas import recent_writes, replica_router
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/", dependencies=[Depends(require_metrics_token)])
+async def get_metrics():
+    """
+    Métricas operativas de la instancia.
+
+    Requiere el token de operador (METRICS_TOKEN) en el header 'X-Metrics-Token';
+    sin token configurado responde 404.
+
+    - **database**: estado de cada pool de conexiones (conexiones prestadas,
+      overflow, tiempo de espera y errores de conexión)
+    - **auth_cache**: aciertos, fallos y desalojos de la caché de API keys
+    - **password_hasher**: operaciones de bcrypt en curso y rechazadas (503)
+    - **response_cache**: aciertos y fallos de la caché de lecturas
+    - **queries**: por ruta, histogramas de consultas SQL y tiempo en la base
+      de datos por petición, la consulta más lenta y el total de consultas lentas
+    - **rate_limit**: configuración y peticiones aceptadas/rechazadas (429) de
+      los límites por API key y por IP en /auth
+    - **change_feed**: usuarios y conexiones suscritos a /events en este worker,
+      eventos publicados, entregados y descartados, y estado del listener
+    - **read_replicas**: por réplica, disponibilidad, último retraso medido,
+      sesiones asignadas, fallas y veces que se apartó por retraso, más las
+      lecturas enviadas al primario por no haber réplicas disponibles y los
+      errores del backend de read-your-writes
+    """
+    return {
+        "database": pool_stats(),
+        "auth_cache": api_key_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "response_cache": response_cache.stats(),
+        "queries": query_metrics.stats(),
+        "rate_limit": {
+            "api_key": api_key_rate_limiter.stats(),
+            "auth": auth_rate_limiter.stats()
+        },
+        "change_feed": change_feed.stats(),
+        "read_replicas": {**replica_router.stats(), "recent_write_errors": recent_writes.errors}
+    }
+
+@router.get("/usage", dependencies=[Depends(require_metrics_token)])
+async def get_usage():
+    """
+    Uso por API key y por IP (en /auth y con API keys inválidas) registrado por el límite de peticiones.
+
+    Requiere el token de operador (METRICS_TOKEN) en el header 'X-Metrics-Token';
+    sin token configurado responde 404.
+
+    - **api_keys**: por prefijo público de la API key (nunca la key completa), el
+      user_id, las peticiones recibidas y las rechazadas con 429
+    - **auth_ips**: lo mismo por IP del cliente para login, registro y API
+      keys inválidas
+
+    Con RATE_LIMIT_BACKEND=redis los contadores son de todos los workers y
+    expiran tras RATE_LIMIT_USAGE_TTL_SECONDS sin peticiones.
+    """
+    return {
+        "api_keys": await api_key_rate_limiter.usage(),
+        "auth_ips": await auth_rate_limiter.usage()
+    }
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Header, Query, Response
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.config.database import get_read_db
+from app.services.async_service import AsyncService
+from app.services.sync_service import SyncService
+from app.utils.auth import get_current_reader
+from app.utils.auth_cache import CurrentUser
+from app.utils.etag import etag_matches
+from app.utils.serialization import json_response, sync_adapter
+from app.models.schemas import SyncResponse
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+@router.get("/", response_model=SyncResponse)
+async def sync(
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_reader)
+):
+    """
+    Obtiene los cambios de las listas y tareas del usuario desde la última sincronización.
+    
+    - **since**: Token retornado por la sincronización anterior (opcional)
+    
+    Retorna las listas y tareas creadas o modificadas después de since, y en
+    'deleted' los ids de las eliminadas (incluidas las tareas de una lista
+    eliminada). El campo 'token' se envía como since en la siguiente llamada.
+    Sin since, o con un token desconocido, se retorna el conjunto completo con
+    'full' en true y el cliente debe reemplazar sus datos locales.
+    Requiere autenticación mediante API key en el header 'X-API-Key'.
+    La respuesta incluye un 'ETag'; si se envía en 'If-None-Match' y nada
+    cambió, se responde 304 sin cuerpo.
+    """
+    service = AsyncService(SyncService, db)
+    etag = await service.get_sync_etag(current_user.user_id, since)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    changes = await service.get_changes(current_user.user_id, since, etag=etag)
+    return json_response(sync_adapter, changes, headers={"ETag": etag})
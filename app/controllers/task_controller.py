@@ -1,33 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from app.config.database import get_db
+from typing import List, Optional
+from datetime import datetime
+from app.config.database import get_db, get_read_db
 from app.services.task_service import TaskService
-from app.utils.auth import get_current_user
-from app.models.models import User
-from app.models.schemas import TaskCreateRequest, TaskUpdateRequest, TaskResponse
+from app.services.async_service import AsyncService
+from app.utils.auth import get_current_user, get_current_reader
+from app.utils.auth_cache import CurrentUser
+from app.utils.etag import etag_matches
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.serialization import json_response, search_results_adapter, task_adapter, tasks_adapter
+from app.models.schemas import (
+    TaskCreateRequest, TaskUpdateRequest, TaskMoveRequest, TaskOrder, TaskResponse, TaskSearchResult,
+    BulkTaskCreateRequest, BulkTaskUpdateRequest, BulkTaskIdsRequest, BulkTaskCompleteRequest, BulkTaskResponse
+)
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 @router.get("/", response_model=List[TaskResponse])
 async def get_tasks(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    is_completed: Optional[bool] = None,
+    list_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: TaskOrder = TaskOrder.created_at,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_reader)
 ):
     """
-    Obtiene todas las tareas del usuario autenticado.
+    Obtiene las tareas del usuario autenticado, ordenadas por fecha de creación
+    o por position.
+    
+    - **is_completed**: Filtra por estado de completitud (opcional)
+    - **list_id**: Filtra por lista (opcional)
+    - **created_after**: Solo tareas creadas después de esta fecha (opcional)
+    - **limit**: Tamaño de página (por defecto 100, máximo 1000)
+    - **cursor**: Cursor de la página siguiente, tomado del header 'X-Next-Cursor'
+    - **order**: created_at (por defecto) o position, el orden manual de la lista (requiere list_id)
     
     Requiere autenticación mediante API key en el header 'X-API-Key'.
     Las tareas se obtienen de todas las listas del usuario.
+    Si existen más resultados, la respuesta incluye el header 'X-Next-Cursor'.
+    La respuesta incluye un 'ETag'; si se envía en 'If-None-Match' y nada
+    cambió, se responde 304 sin cuerpo.
+    """
+    service = AsyncService(TaskService, db)
+    params = {
+        "is_completed": is_completed,
+        "list_id": list_id,
+        "created_after": created_after,
+        "cursor": cursor,
+        "limit": limit,
+        "order": order.value
+    }
+    etag = await service.get_tasks_etag(current_user.user_id, **params)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    page = await service.get_user_tasks(current_user.user_id, **params, etag=etag)
+    headers = {"ETag": etag}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return json_response(tasks_adapter, page.items, headers=headers)
+
+@router.get("/search", response_model=List[TaskSearchResult])
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    is_completed: Optional[bool] = None,
+    list_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_reader)
+):
+    """
+    Busca tareas del usuario autenticado por texto en el nombre y la descripción.
+    
+    - **q**: Texto a buscar; cada palabra debe aparecer completa o como prefijo
+    - **is_completed**: Filtra por estado de completitud (opcional)
+    - **list_id**: Filtra por lista (opcional)
+    - **limit**: Tamaño de página (opcional, por defecto 100)
+    - **cursor**: Cursor de la página siguiente, tomado del header 'X-Next-Cursor'
+    
+    Los resultados se ordenan por relevancia (campo "rank").
+    Requiere autenticación mediante API key en el header 'X-API-Key'.
     """
-    service = TaskService(db)
-    return service.get_user_tasks(current_user.user_id)
+    service = AsyncService(TaskService, db)
+    params = {
+        "is_completed": is_completed,
+        "list_id": list_id,
+        "cursor": cursor,
+        "limit": limit
+    }
+    etag = await service.get_search_etag(current_user.user_id, q, **params)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    page = await service.search_tasks(current_user.user_id, q, **params, etag=etag)
+    headers = {"ETag": etag}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return json_response(search_results_adapter, page.items, headers=headers)
 
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_reader)
 ):
     """
     Obtiene una tarea específica por su ID.
@@ -37,14 +119,14 @@ async def get_task(
     Requiere autenticación mediante API key en el header 'X-API-Key'.
     Solo puede acceder a las tareas de las listas propias del usuario.
     """
-    service = TaskService(db)
-    return service.get_task(task_id, current_user.user_id)
+    service = AsyncService(TaskService, db)
+    return json_response(task_adapter, await service.get_task(task_id, current_user.user_id))
 
 @router.post("/", response_model=TaskResponse, status_code=201)
 async def create_task(
     task_data: TaskCreateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Crea una nueva tarea.
@@ -57,15 +139,88 @@ async def create_task(
     Requiere autenticación mediante API key en el header 'X-API-Key'.
     Solo puede crear tareas en listas propias del usuario.
     """
-    service = TaskService(db)
-    return service.create_task(task_data.list_id, current_user.user_id, task_data.dict())
+    service = AsyncService(TaskService, db)
+    return await service.create_task(task_data.list_id, current_user.user_id, task_data.dict())
+
+@router.post("/bulk", response_model=BulkTaskResponse)
+async def bulk_create_tasks(
+    bulk_data: BulkTaskCreateRequest,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Crea varias tareas en una sola transacción.
+    
+    - **tasks**: Lista de tareas con los mismos campos que POST /tasks (máximo 1000)
+    
+    Requiere autenticación mediante API key en el header 'X-API-Key'.
+    Retorna un resultado por tarea, en el mismo orden: 201 si se creó o 403
+    si la lista no pertenece al usuario.
+    """
+    service = AsyncService(TaskService, db)
+    tasks = [task.dict() for task in bulk_data.tasks]
+    return {"results": await service.bulk_create_tasks(current_user.user_id, tasks)}
+
+@router.put("/bulk", response_model=BulkTaskResponse)
+async def bulk_update_tasks(
+    bulk_data: BulkTaskUpdateRequest,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Actualiza varias tareas en una sola transacción.
+    
+    - **tasks**: Lista de cambios; cada uno incluye **task_id** y los campos a modificar (máximo 1000)
+    
+    Requiere autenticación mediante API key en el header 'X-API-Key'.
+    Retorna un resultado por tarea: 200, 403 (tarea ajena) o 404 (inexistente).
+    """
+    service = AsyncService(TaskService, db)
+    tasks = [task.dict(exclude_unset=True) for task in bulk_data.tasks]
+    return {"results": await service.bulk_update_tasks(current_user.user_id, tasks)}
+
+@router.post("/bulk/complete", response_model=BulkTaskResponse)
+async def bulk_complete_tasks(
+    bulk_data: BulkTaskCompleteRequest,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Marca varias tareas como completadas (o pendientes) con una sola sentencia.
+    
+    - **task_ids**: IDs de las tareas (máximo 1000)
+    - **is_completed**: Estado a asignar (opcional, default: true)
+    
+    Requiere autenticación mediante API key en el header 'X-API-Key'.
+    Retorna un resultado por tarea: 200, 403 (tarea ajena) o 404 (inexistente).
+    """
+    service = AsyncService(TaskService, db)
+    results = await service.bulk_set_completed(current_user.user_id, bulk_data.task_ids, bulk_data.is_completed)
+    return {"results": results}
+
+@router.post("/bulk/delete", response_model=BulkTaskResponse)
+async def bulk_delete_tasks(
+    bulk_data: BulkTaskIdsRequest,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Elimina varias tareas con una sola sentencia.
+    
+    - **task_ids**: IDs de las tareas a eliminar (máximo 1000)
+    
+    Requiere autenticación mediante API key en el header 'X-API-Key'.
+    Retorna un resultado por tarea: 200, 403 (tarea ajena) o 404 (inexistente).
+    """
+    service = AsyncService(TaskService, db)
+    return {"results": await service.bulk_delete_tasks(current_user.user_id, bulk_data.task_ids)}
 
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: int,
     task_data: TaskUpdateRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Actualiza una tarea existente.
@@ -78,14 +233,35 @@ async def update_task(
     Requiere autenticación mediante API key en el header 'X-API-Key'.
     Solo puede modificar tareas de las listas propias del usuario.
     """
-    service = TaskService(db)
-    return service.update_task(task_id, current_user.user_id, task_data.dict(exclude_unset=True))
+    service = AsyncService(TaskService, db)
+    return await service.update_task(task_id, current_user.user_id, task_data.dict(exclude_unset=True))
+
+@router.post("/{task_id}/move", response_model=TaskResponse)
+async def move_task(
+    task_id: int,
+    move_data: TaskMoveRequest,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Cambia la posición de una tarea dentro de su lista o la mueve a otra lista.
+    
+    - **task_id**: ID de la tarea a mover
+    - **after_task_id**: La tarea queda inmediatamente después de esta (opcional)
+    - **before_task_id**: La tarea queda inmediatamente antes de esta (opcional)
+    - **list_id**: Lista de destino (opcional); sin tarea de referencia, la tarea queda al final
+    
+    Requiere autenticación mediante API key en el header 'X-API-Key'.
+    Solo se modifica la fila de la tarea movida; el resto de la lista no cambia.
+    """
+    service = AsyncService(TaskService, db)
+    return await service.move_task(task_id, current_user.user_id, move_data.dict(exclude_unset=True))
 
 @router.delete("/{task_id}")
 async def delete_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Elimina una tarea.
@@ -95,7 +271,7 @@ async def delete_task(
     Requiere autenticación mediante API key en el header 'X-API-Key'.
     Solo puede eliminar tareas de las listas propias del usuario.
     """
-    service = TaskService(db)
-    if service.delete_task(task_id, current_user.user_id):
+    service = AsyncService(TaskService, db)
+    if await service.delete_task(task_id, current_user.user_id):
         return {"message": "Task deleted successfully"}
     raise HTTPException(status_code=404, detail="Task not found") 
\ No newline at end of file
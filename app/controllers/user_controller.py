@@ -2,12 +2,15 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.services.user_service import UserService
+from app.services.async_service import AsyncService
+from app.utils.password_hasher import password_hasher
+from app.utils.rate_limit import limit_auth_requests
 from app.models.schemas import UserRegisterRequest, UserLoginRequest, UserResponse
 from typing import List
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
-@router.post("/register", response_model=UserResponse, status_code=201)
+@router.post("/register", response_model=UserResponse, status_code=201, dependencies=[Depends(limit_auth_requests)])
 async def register(
     user_data: UserRegisterRequest,
     db: Session = Depends(get_db)
@@ -20,11 +23,16 @@ async def register(
     - **password**: Contraseña del usuario
     
     Retorna el usuario creado junto con su API key para autenticación.
+    Si el servidor está saturado calculando hashes, retorna un error 503.
+    Si la IP superó el límite de intentos, retorna un error 429 con 'Retry-After'.
     """
-    service = UserService(db)
-    return service.register(user_data.username, user_data.email, user_data.password)
+    service = AsyncService(UserService, db)
+    # Validar antes de pagar el costo de bcrypt
+    await service.check_available(user_data.username, user_data.email)
+    password_hash = await password_hasher.hash(user_data.password)
+    return await service.register(user_data.username, user_data.email, password_hash)
 
-@router.post("/login", response_model=UserResponse)
+@router.post("/login", response_model=UserResponse, dependencies=[Depends(limit_auth_requests)])
 async def login(
     login_data: UserLoginRequest,
     db: Session = Depends(get_db)
@@ -37,6 +45,12 @@ async def login(
     
     Retorna la información del usuario y su API key para autenticación.
     Si las credenciales son inválidas, retorna un error 401.
+    Si el servidor está saturado verificando contraseñas, retorna un error 503.
+    Si la IP superó el límite de intentos, retorna un error 429 con 'Retry-After'.
     """
-    service = UserService(db)
-    return service.login(login_data.email, login_data.password) 
\ No newline at end of file
+    service = AsyncService(UserService, db)
+    credentials = await service.get_login_user(login_data.email)
+    valid, new_password_hash = await password_hasher.verify_and_update(login_data.password, credentials["password_hash"])
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    return await service.login(credentials["user_id"], new_password_hash) 
\ No newline at end of file
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.config.database import Base
+from app.utils.positions import MAX_POSITION_LENGTH, REBALANCE_POSITION_LENGTH
 from datetime import datetime
 
 class User(Base):
@@ -12,6 +13,8 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     password_hash = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Se incrementa en cada escritura sobre las listas o tareas del usuario (ETags)
+    data_version = Column(Integer, default=0, nullable=False)
     
     lists = relationship("List", back_populates="user")
     api_keys = relationship("APIKey", back_populates="user")
@@ -23,28 +26,99 @@ class List(Base):
     user_id = Column(Integer, ForeignKey("users.user_id"))
     list_name = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # users.data_version de la escritura que creó o modificó la fila (GET /sync)
+    change_version = Column(Integer, default=0, nullable=False)
 
     user = relationship("User", back_populates="lists")
-    tasks = relationship("Task", back_populates="list", cascade="all, delete-orphan")
+    # passive_deletes: al eliminar una lista, la base de datos elimina sus tareas
+    # (ON DELETE CASCADE) sin que el ORM las cargue
+    tasks = relationship("Task", back_populates="list", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Paginación keyset de las listas de un usuario
+        Index("idx_lists_user_created", "user_id", "created_at", "list_id"),
+        # Cambios desde una versión (GET /sync)
+        Index("idx_lists_user_version", "user_id", "change_version"),
+    )
 
 class Task(Base):
     __tablename__ = "tasks"
 
     task_id = Column(Integer, primary_key=True, index=True)
-    list_id = Column(Integer, ForeignKey("lists.list_id"))
+    list_id = Column(Integer, ForeignKey("lists.list_id", ondelete="CASCADE"))
+    # Dueño de la lista, copiado en la tarea: permite paginar todas las tareas
+    # del usuario por índice sin unir ni ordenar sus listas
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
     task_name = Column(String)
     description = Column(Text, nullable=True)
     is_completed = Column(Boolean, default=False)
+    # Clave de orden fraccionaria dentro de la lista (app/utils/positions.py);
+    # se compara byte a byte, por eso en PostgreSQL usa COLLATE "C"
+    position = Column(
+        String(MAX_POSITION_LENGTH).with_variant(String(MAX_POSITION_LENGTH, collation="C"), "postgresql"),
+        nullable=False
+    )
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # users.data_version de la escritura que creó o modificó la fila (GET /sync)
+    change_version = Column(Integer, default=0, nullable=False)
 
     list = relationship("List", back_populates="tasks")
 
+    __table_args__ = (
+        # Paginación keyset de las tareas, con y sin filtro de completitud, de
+        # una lista o de todas las listas del usuario
+        Index("idx_tasks_list_created", "list_id", "created_at", "task_id"),
+        Index("idx_tasks_list_completed_created", "list_id", "is_completed", "created_at", "task_id"),
+        Index("idx_tasks_user_created", "user_id", "created_at", "task_id"),
+        Index("idx_tasks_user_completed_created", "user_id", "is_completed", "created_at", "task_id"),
+        # Cambios desde una versión (GET /sync)
+        Index("idx_tasks_list_version", "list_id", "change_version"),
+        # Lectura ordenada de una lista y vecinos de una tarea al moverla
+        Index("idx_tasks_list_position", "list_id", "position", "task_id"),
+        # Listas con claves de orden largas, pendientes de rebalanceo
+        Index(
+            "idx_tasks_long_position", "list_id",
+            postgresql_where=text(f"length(position) > {REBALANCE_POSITION_LENGTH}"),
+            sqlite_where=text(f"length(position) > {REBALANCE_POSITION_LENGTH}")
+        ),
+    )
+
 class APIKey(Base):
     __tablename__ = "api_keys"
 
     api_key_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.user_id"))
-    api_key = Column(String, unique=True, index=True)
+    # Parte pública de la key ("<prefijo>.<secreto>"), buscada por índice único
+    key_prefix = Column(String(16), unique=True, index=True, nullable=False)
+    # SHA-256 del secreto; la key completa nunca se guarda
+    key_hash = Column(String(64), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+    user = relationship("User", back_populates="api_keys")
+
+    __table_args__ = (
+        # Keys activas de un usuario (límite por usuario) y limpieza de vencidas
+        Index("idx_api_keys_user_created", "user_id", "created_at"),
+        Index("idx_api_keys_expires_at", "expires_at"),
+    )
+
+class Tombstone(Base):
+    """Registro de una lista o tarea eliminada, para que GET /sync informe la baja."""
+    __tablename__ = "tombstones"
+
+    tombstone_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+    # "list" o "task"
+    resource = Column(String(8), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    # users.data_version de la escritura que eliminó la fila
+    change_version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
 
-    user = relationship("User", back_populates="api_keys") 
\ No newline at end of file
+    __table_args__ = (
+        Index("idx_tombstones_user_version", "user_id", "change_version"),
+    )
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import List, Optional
 from datetime import datetime
+from enum import Enum
 
 # Auth Schemas
 class UserRegisterRequest(BaseModel):
@@ -63,6 +64,7 @@ class ListResponse(BaseModel):
     user_id: int
     list_name: str
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         json_schema_extra = {
@@ -70,7 +72,28 @@ class ListResponse(BaseModel):
                 "list_id": 1,
                 "user_id": 1,
                 "list_name": "Compras del supermercado",
-                "created_at": "2024-03-14T12:00:00"
+                "created_at": "2024-03-14T12:00:00",
+                "updated_at": "2024-03-14T12:00:00"
+            }
+        }
+
+class ListSummaryResponse(ListResponse):
+    # Solo se incluyen con GET /lists?summary=true
+    task_count: Optional[int] = None
+    completed_count: Optional[int] = None
+    last_activity: Optional[datetime] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "list_id": 1,
+                "user_id": 1,
+                "list_name": "Compras del supermercado",
+                "created_at": "2024-03-14T12:00:00",
+                "updated_at": "2024-03-14T12:00:00",
+                "task_count": 12,
+                "completed_count": 5,
+                "last_activity": "2024-03-15T09:30:00"
             }
         }
 
@@ -96,6 +119,15 @@ class TaskUpdateRequest(BaseModel):
     description: Optional[str] = None
     is_completed: Optional[bool] = None
 
+    # Los campos se pueden omitir, pero no enviar como null: las columnas no
+    # admiten NULL (description sí)
+    @field_validator("task_name", "is_completed")
+    @classmethod
+    def reject_null(cls, value):
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -111,7 +143,10 @@ class TaskResponse(BaseModel):
     task_name: str
     description: Optional[str]
     is_completed: bool
+    # Clave de orden dentro de la lista: ordenar por position y luego task_id
+    position: Optional[str] = None
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         json_schema_extra = {
@@ -121,6 +156,185 @@ class TaskResponse(BaseModel):
                 "task_name": "Comprar leche",
                 "description": "2 litros de leche deslactosada",
                 "is_completed": False,
-                "created_at": "2024-03-14T12:00:00"
+                "position": "a3",
+                "created_at": "2024-03-14T12:00:00",
+                "updated_at": "2024-03-14T12:00:00"
+            }
+        } 
+
+class TaskSearchResult(TaskResponse):
+    rank: float
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "task_id": 1,
+                "list_id": 1,
+                "task_name": "Comprar leche",
+                "description": "2 litros de leche deslactosada",
+                "is_completed": False,
+                "position": "a3",
+                "created_at": "2024-03-14T12:00:00",
+                "updated_at": "2024-03-14T12:00:00",
+                "rank": 0.4
+            }
+        }
+
+class TaskMoveRequest(BaseModel):
+    # Con after_task_id o before_task_id la tarea queda junto a esa tarea, en
+    # su lista; sin ninguno, al final de list_id (o de su lista actual)
+    list_id: Optional[int] = None
+    after_task_id: Optional[int] = None
+    before_task_id: Optional[int] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "after_task_id": 12
+            }
+        }
+
+class TaskOrder(str, Enum):
+    created_at = "created_at"
+    position = "position"
+
+# Sync Schemas
+class SyncDeleted(BaseModel):
+    lists: List[int]
+    tasks: List[int]
+
+class SyncResponse(BaseModel):
+    token: int
+    full: bool
+    lists: List[ListResponse]
+    tasks: List[TaskResponse]
+    deleted: SyncDeleted
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "token": 42,
+                "full": False,
+                "lists": [],
+                "tasks": [
+                    {
+                        "task_id": 1,
+                        "list_id": 1,
+                        "task_name": "Comprar leche",
+                        "description": "2 litros de leche deslactosada",
+                        "is_completed": True,
+                        "created_at": "2024-03-14T12:00:00",
+                        "updated_at": "2024-03-15T09:30:00"
+                    }
+                ],
+                "deleted": {"lists": [], "tasks": [7, 8]}
+            }
+        }
+
+# Bulk Task Schemas
+MAX_BULK_ITEMS = 1000
+
+class BulkTaskCreateRequest(BaseModel):
+    tasks: List[TaskCreateRequest] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "tasks": [
+                    {"list_id": 1, "task_name": "Comprar leche"},
+                    {"list_id": 1, "task_name": "Comprar pan", "description": "Integral"}
+                ]
+            }
+        }
+
+class BulkTaskUpdateItem(TaskUpdateRequest):
+    task_id: int
+
+class BulkTaskUpdateRequest(BaseModel):
+    tasks: List[BulkTaskUpdateItem] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "tasks": [
+                    {"task_id": 1, "task_name": "Comprar leche entera"},
+                    {"task_id": 2, "is_completed": True}
+                ]
+            }
+        }
+
+class BulkTaskIdsRequest(BaseModel):
+    task_ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "task_ids": [1, 2, 3]
+            }
+        }
+
+class BulkTaskCompleteRequest(BulkTaskIdsRequest):
+    is_completed: bool = True
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "task_ids": [1, 2, 3],
+                "is_completed": True
+            }
+        }
+
+class BulkTaskResult(BaseModel):
+    index: int
+    task_id: Optional[int] = None
+    status: int
+    detail: Optional[str] = None
+    task: Optional[TaskResponse] = None
+
+class BulkTaskResponse(BaseModel):
+    results: List[BulkTaskResult]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "results": [
+                    {"index": 0, "task_id": 1, "status": 200, "detail": None, "task": None},
+                    {"index": 1, "task_id": 7, "status": 403, "detail": "Not authorized to access this task", "task": None}
+                ]
             }
-        } 
\ No newline at end of file
+        }
+
+# Export Schemas
+class ExportResource(str, Enum):
+    lists = "lists"
+    tasks = "tasks"
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+# Import Schemas
+class ImportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+class ImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "imported": 99998,
+                "failed": 2,
+                "errors": [
+                    {"line": 17, "detail": "task_name: Field required"},
+                    {"line": 512, "detail": "Not authorized to create tasks in this list"}
+                ]
+            }
+        }
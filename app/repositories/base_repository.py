@@ -1,4 +1,7 @@
+from datetime import datetime
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
+from app.models.models import Tombstone, User
 
 class BaseRepository:
     def __init__(self, db: Session, model):
@@ -11,11 +14,15 @@ class BaseRepository:
     def get_by_id(self, id: int):
         return self.db.query(self.model).filter(self.model.id == id).first()
 
-    def create(self, entity):
-        self.db.add(entity)
-        self.db.commit()
-        self.db.refresh(entity)
-        return entity
+    def create(self, values: dict, columns=None, commit: bool = True) -> dict:
+        """
+        Inserta una fila con un único INSERT ... RETURNING y la retorna como dict,
+        sin el SELECT adicional de refresh() después del commit.
+
+        - **columns**: columnas a retornar (por defecto, todas las del modelo)
+        - **commit**: con False la fila queda en la transacción en curso
+        """
+        return self._insert(self.model, values, columns, commit)
 
     def update(self, entity):
         self.db.merge(entity)
@@ -28,4 +35,57 @@ class BaseRepository:
             self.db.delete(entity)
             self.db.commit()
             return True
-        return False 
\ No newline at end of file
+        return False
+
+    def bump_data_version(self, user_id: int) -> int:
+        """
+        Incrementa la versión de datos del usuario dentro de la transacción en
+        curso; se confirma junto con la escritura que la acompaña.
+
+        Retorna la nueva versión, con la que la escritura marca las filas que
+        modifica (change_version). El UPDATE bloquea la fila del usuario hasta
+        el commit, por lo que las versiones de un usuario se confirman en orden.
+        """
+        # Con réplicas de lectura, el commit abre la ventana de read-your-writes del usuario
+        self.db.info.setdefault("written_users", set()).add(user_id)
+        return self.db.execute(
+            update(User)
+            .where(User.user_id == user_id)
+            .values(data_version=User.data_version + 1)
+            .returning(User.data_version)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+
+    def add_tombstones(self, user_id: int, resource: str, row_ids, change_version: int) -> None:
+        """Registra, en la transacción en curso, las filas eliminadas de resource ("list" o "task")."""
+        if not row_ids:
+            return
+        now = datetime.utcnow()
+        self.db.execute(insert(Tombstone), [
+            {"user_id": user_id, "resource": resource, "row_id": row_id, "change_version": change_version, "deleted_at": now}
+            for row_id in row_ids
+        ])
+
+    def get_tombstones(self, user_id: int, since: int, until: int) -> list:
+        """Filas (resource, row_id) eliminadas con since < change_version <= until."""
+        rows = self.db.execute(
+            select(Tombstone.resource, Tombstone.row_id)
+            .where(
+                Tombstone.user_id == user_id,
+                Tombstone.change_version > since,
+                Tombstone.change_version <= until
+            )
+            .order_by(Tombstone.change_version, Tombstone.tombstone_id)
+        ).mappings()
+        return [dict(row) for row in rows]
+
+    def _insert(self, model, values: dict, columns=None, commit: bool = True) -> dict:
+        # Los valores por defecto de Python (created_at, ...) se resuelven en el INSERT
+        stmt = insert(model).values(**values).returning(*(columns or model.__table__.columns))
+        row = self.db.execute(stmt).mappings().one()
+        if commit:
+            self.db.commit()
+        return dict(row)
+
+    def get_data_version(self, user_id: int) -> int:
+        return self.db.query(User.data_version).filter(User.user_id == user_id).scalar() or 0
@@ -1,36 +1,119 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import case, delete, func, insert, literal, select, tuple_, update
 from sqlalchemy.orm import Session
-from app.models.models import List
+from app.models.models import List, Task, Tombstone
 from .base_repository import BaseRepository
 
+# Columnas de ListResponse; las lecturas las obtienen como filas, sin objetos ORM
+LIST_COLUMNS = (List.list_id, List.user_id, List.list_name, List.created_at, List.updated_at)
+
+# Resumen de las tareas de cada lista, calculado en la misma consulta agrupada
+LIST_SUMMARY_COLUMNS = (
+    func.count(Task.task_id).label("task_count"),
+    func.coalesce(func.sum(case((Task.is_completed, 1), else_=0)), 0).label("completed_count"),
+    func.coalesce(func.max(Task.updated_at), List.updated_at).label("last_activity"),
+)
+
 class ListRepository(BaseRepository):
     def __init__(self, db: Session):
         super().__init__(db, List)
 
-    def get_lists_by_user(self, user_id: int):
-        return self.db.query(List).filter(List.user_id == user_id).all()
-
-    def get_list_by_id(self, list_id: int):
-        return self.db.query(List).filter(List.list_id == list_id).first()
-
-    def create_list(self, list_obj: List):
-        self.db.add(list_obj)
-        self.db.commit()
-        self.db.refresh(list_obj)
-        return list_obj
-
-    def update_list(self, list_id: int, list_data: dict):
-        list_obj = self.get_list_by_id(list_id)
-        if list_obj:
-            for key, value in list_data.items():
-                setattr(list_obj, key, value)
-            self.db.commit()
-            self.db.refresh(list_obj)
-        return list_obj
-
-    def delete_list(self, list_id: int) -> bool:
-        list_obj = self.get_list_by_id(list_id)
-        if list_obj:
-            self.db.delete(list_obj)
-            self.db.commit()
-            return True
-        return False 
\ No newline at end of file
+    def get_lists_by_user(
+        self,
+        user_id: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+        with_summary: bool = False
+    ):
+        """
+        Obtiene las filas de las listas del usuario ordenadas por (created_at, list_id).
+
+        - **after**: posición (created_at, list_id) desde la cual continuar (keyset)
+        - **limit**: cantidad máxima de filas a retornar
+        - **with_summary**: agrega task_count, completed_count y last_activity
+          (última modificación de sus tareas, o de la lista si no tiene tareas)
+        """
+        query = select(*LIST_COLUMNS).where(List.user_id == user_id)
+        if with_summary:
+            query = (
+                query.add_columns(*LIST_SUMMARY_COLUMNS)
+                .outerjoin(Task, Task.list_id == List.list_id)
+                .group_by(*LIST_COLUMNS)
+            )
+        if after is not None:
+            query = query.where(tuple_(List.created_at, List.list_id) > after)
+        query = query.order_by(List.created_at, List.list_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return [dict(row) for row in self.db.execute(query).mappings()]
+
+    def get_lists_after_id(self, user_id: int, after_id: Optional[int], limit: int) -> list:
+        """Siguiente bloque de filas de las listas del usuario en orden de list_id (exportación)."""
+        query = select(*LIST_COLUMNS).where(List.user_id == user_id)
+        if after_id is not None:
+            query = query.where(List.list_id > after_id)
+        query = query.order_by(List.list_id).limit(limit)
+        return [dict(row) for row in self.db.execute(query).mappings()]
+
+    def get_list_row(self, list_id: int) -> Optional[dict]:
+        row = self.db.execute(select(*LIST_COLUMNS).where(List.list_id == list_id)).mappings().first()
+        return dict(row) if row else None
+
+    def create_list(self, list_data: dict) -> dict:
+        """Inserta la lista en la transacción en curso."""
+        return self.create(list_data, LIST_COLUMNS, commit=False)
+
+    def update_list(self, list_id: int, list_data: dict, user_id: Optional[int] = None) -> Optional[dict]:
+        """
+        Actualiza la lista con un único UPDATE ... RETURNING.
+
+        Con user_id, la lista solo se actualiza si pertenece a ese usuario.
+        Retorna la fila actualizada o None si ninguna fila fue afectada; el
+        cambio queda en la transacción en curso.
+        """
+        stmt = update(List).where(List.list_id == list_id)
+        if user_id is not None:
+            stmt = stmt.where(List.user_id == user_id)
+        stmt = stmt.values(**list_data).returning(*LIST_COLUMNS).execution_options(synchronize_session=False)
+        row = self.db.execute(stmt).mappings().first()
+        return dict(row) if row else None
+
+    def get_lists_changed(self, user_id: int, since: int, until: int) -> list:
+        """Filas de las listas del usuario con since < change_version <= until (GET /sync)."""
+        query = (
+            select(*LIST_COLUMNS)
+            .where(List.user_id == user_id, List.change_version > since, List.change_version <= until)
+            .order_by(List.list_id)
+        )
+        return [dict(row) for row in self.db.execute(query).mappings()]
+
+    def delete_list(self, list_id: int, user_id: int, change_version: int) -> bool:
+        """
+        Elimina la lista y registra los tombstones de la lista y de sus tareas
+        con change_version para GET /sync, en la transacción en curso.
+
+        Las tareas las elimina la base de datos (ON DELETE CASCADE): ni ellas ni
+        sus ids se cargan en memoria, así que la cantidad de sentencias no
+        depende del tamaño de la lista.
+        """
+        # Los tombstones de las tareas se copian antes de que el DELETE las elimine
+        self.db.execute(
+            insert(Tombstone).from_select(
+                ["user_id", "resource", "row_id", "change_version", "deleted_at"],
+                select(
+                    literal(user_id), literal("task"), Task.task_id, literal(change_version), literal(datetime.utcnow())
+                ).where(Task.list_id == list_id)
+            )
+        )
+        deleted = self.db.execute(
+            delete(List)
+            .where(List.list_id == list_id, List.user_id == user_id)
+            .returning(List.list_id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if deleted is None:
+            self.db.rollback()
+            return False
+        self.add_tombstones(user_id, "list", [list_id], change_version)
+        return True
\ No newline at end of file
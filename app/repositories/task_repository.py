@@ -1,44 +1,365 @@
+import io
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import delete, func, insert, literal_column, or_, select, text, tuple_, update
 from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
 from app.models.models import Task, List
 from .base_repository import BaseRepository
 
+# Columnas de TaskResponse; las lecturas las obtienen como filas, sin objetos ORM
+TASK_COLUMNS = (
+    Task.task_id, Task.list_id, Task.task_name, Task.description,
+    Task.is_completed, Task.position, Task.created_at, Task.updated_at
+)
+
+# Columnas de la tabla temporal de importación
+IMPORT_COLUMNS = ["line", "list_id", "task_name", "description", "is_completed", "position"]
+
 class TaskRepository(BaseRepository):
     def __init__(self, db: Session):
         super().__init__(db, Task)
 
-    def get_tasks_by_list_id(self, list_id: int):
-        return self.db.query(Task).filter(Task.list_id == list_id).all()
-
-    def get_task_by_id(self, task_id: int):
-        return self.db.query(Task).filter(Task.task_id == task_id).first()
-
-    def get_user_tasks(self, user_id: int):
-        return (
-            self.db.query(Task)
-            .join(List)
-            .filter(List.user_id == user_id)
-            .all()
-        )
-
-    def create_task(self, task):
-        self.db.add(task)
-        self.db.commit()
-        self.db.refresh(task)
-        return task
-
-    def update_task(self, task_id: int, task_data: dict):
-        task = self.get_task_by_id(task_id)
-        if task:
-            for key, value in task_data.items():
-                setattr(task, key, value)
-            self.db.commit()
-            self.db.refresh(task)
-        return task
-
-    def delete_task(self, task_id: int) -> bool:
-        task = self.get_task_by_id(task_id)
-        if task:
-            self.db.delete(task)
-            self.db.commit()
-            return True
-        return False 
\ No newline at end of file
+    def get_task_with_owner(self, task_id: int) -> Optional[dict]:
+        """
+        Obtiene la fila de la tarea junto con el user_id dueño de su lista
+        (clave "owner_id") en una sola consulta, o None si la tarea no existe.
+        """
+        row = self.db.execute(
+            select(*TASK_COLUMNS, List.user_id.label("owner_id"))
+            .outerjoin(List, Task.list_id == List.list_id)
+            .where(Task.task_id == task_id)
+        ).mappings().first()
+        return dict(row) if row else None
+
+    def get_user_tasks(
+        self,
+        user_id: int,
+        is_completed: Optional[bool] = None,
+        list_id: Optional[int] = None,
+        created_after: Optional[datetime] = None,
+        after: Optional[tuple] = None,
+        limit: Optional[int] = None,
+        order: str = "created_at"
+    ):
+        """
+        Obtiene las filas de las tareas del usuario ordenadas por (created_at, task_id),
+        o por (position, task_id) con order="position".
+
+        - **after**: clave (created_at o position, task_id) desde la cual continuar (keyset)
+        - **limit**: cantidad máxima de filas a retornar
+        """
+        order_column = Task.position if order == "position" else Task.created_at
+        # Task.user_id evita unir lists: sin list_id, el orden lo sirve idx_tasks_user_created
+        query = select(*TASK_COLUMNS).where(Task.user_id == user_id)
+        if is_completed is not None:
+            query = query.where(Task.is_completed == is_completed)
+        if list_id is not None:
+            query = query.where(Task.list_id == list_id)
+        if created_after is not None:
+            query = query.where(Task.created_at > created_after)
+        if after is not None:
+            query = query.where(tuple_(order_column, Task.task_id) > after)
+        query = query.order_by(order_column, Task.task_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return [dict(row) for row in self.db.execute(query).mappings()]
+
+    def search_tasks(
+        self,
+        user_id: int,
+        terms: list,
+        query: str,
+        is_completed: Optional[bool] = None,
+        list_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100
+    ) -> list:
+        """
+        Búsqueda de texto completo (solo PostgreSQL) sobre la columna generada
+        search_vector (índice GIN), más coincidencia por prefijo del nombre con
+        el índice de trigramas. Ordena por relevancia ("rank") y task_id.
+        """
+        search_vector = literal_column("tasks.search_vector")
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        rank = (func.ts_rank(search_vector, tsquery) + func.similarity(Task.task_name, query)).label("rank")
+        prefix = query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+        stmt = select(*TASK_COLUMNS, rank).where(
+            Task.list_id.in_(self._user_list_ids(user_id)),
+            or_(search_vector.op("@@")(tsquery), Task.task_name.ilike(prefix, escape="\\"))
+        )
+        if is_completed is not None:
+            stmt = stmt.where(Task.is_completed == is_completed)
+        if list_id is not None:
+            stmt = stmt.where(Task.list_id == list_id)
+        stmt = stmt.order_by(rank.desc(), Task.task_id).offset(offset).limit(limit)
+        return [dict(row) for row in self.db.execute(stmt).mappings()]
+
+    def get_user_tasks_changed(self, user_id: int, since: int, until: int) -> list:
+        """Filas de las tareas del usuario con since < change_version <= until (GET /sync)."""
+        query = (
+            select(*TASK_COLUMNS)
+            .where(
+                Task.list_id.in_(self._user_list_ids(user_id)),
+                Task.change_version > since,
+                Task.change_version <= until
+            )
+            .order_by(Task.task_id)
+        )
+        return [dict(row) for row in self.db.execute(query).mappings()]
+
+    def get_user_tasks_after_id(self, user_id: int, after_id: Optional[int], limit: int) -> list:
+        """Siguiente bloque de filas de las tareas del usuario en orden de task_id (exportación)."""
+        query = select(*TASK_COLUMNS).where(Task.list_id.in_(self._user_list_ids(user_id)))
+        if after_id is not None:
+            query = query.where(Task.task_id > after_id)
+        query = query.order_by(Task.task_id).limit(limit)
+        return [dict(row) for row in self.db.execute(query).mappings()]
+
+    def create_task(self, task_data: dict) -> dict:
+        """Inserta la tarea en la transacción en curso."""
+        return self.create(task_data, TASK_COLUMNS, commit=False)
+
+    def update_user_task(self, task_id: int, user_id: int, task_data: dict):
+        """
+        Actualiza la tarea solo si pertenece a una lista del usuario, con un único
+        UPDATE ... RETURNING.
+
+        Retorna la fila actualizada o None si la tarea no existe o es de otro
+        usuario; el cambio queda en la transacción en curso.
+        """
+        stmt = (
+            update(Task)
+            .where(Task.task_id == task_id, Task.list_id.in_(self._user_list_ids(user_id)))
+            .values(**task_data)
+            .returning(*TASK_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        row = self.db.execute(stmt).mappings().first()
+        return dict(row) if row else None
+
+    def delete_user_task(self, task_id: int, user_id: int, change_version: int) -> bool:
+        """
+        Elimina la tarea solo si pertenece a una lista del usuario, con un único
+        DELETE ... RETURNING, y registra su tombstone con change_version, en la
+        transacción en curso.
+        """
+        stmt = (
+            delete(Task)
+            .where(Task.task_id == task_id, Task.list_id.in_(self._user_list_ids(user_id)))
+            .returning(Task.task_id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = self.db.execute(stmt).first()
+        if deleted is not None:
+            self.add_tombstones(user_id, "task", [task_id], change_version)
+        return deleted is not None
+
+    def get_owned_list_tails(self, user_id: int, list_ids=None) -> dict:
+        """
+        Retorna, en una sola consulta, las listas dadas (todas si list_ids es
+        None) que pertenecen al usuario con la última position de cada una
+        (None si la lista está vacía).
+        """
+        last_position = (
+            select(func.max(Task.position)).where(Task.list_id == List.list_id).scalar_subquery()
+        )
+        query = select(List.list_id, last_position).where(List.user_id == user_id)
+        if list_ids is not None:
+            query = query.where(List.list_id.in_(set(list_ids)))
+        return {list_id: position for list_id, position in self.db.execute(query)}
+
+    def get_adjacent_position(
+        self, list_id: int, position: str, task_id: int, exclude_task_id: int, before: bool = False
+    ) -> Optional[str]:
+        """
+        position de la tarea siguiente a (position, task_id) en la lista, o de
+        la anterior con before=True, sin contar exclude_task_id (la tarea que se mueve).
+        """
+        key = tuple_(Task.position, Task.task_id)
+        query = select(Task.position).where(Task.list_id == list_id, Task.task_id != exclude_task_id)
+        if before:
+            query = query.where(key < (position, task_id)).order_by(Task.position.desc(), Task.task_id.desc())
+        else:
+            query = query.where(key > (position, task_id)).order_by(Task.position, Task.task_id)
+        return self.db.execute(query.limit(1)).scalar()
+
+    def get_list_tail(self, list_id: int, exclude_task_id: Optional[int] = None) -> Optional[str]:
+        query = select(func.max(Task.position)).where(Task.list_id == list_id)
+        if exclude_task_id is not None:
+            query = query.where(Task.task_id != exclude_task_id)
+        return self.db.execute(query).scalar()
+
+    def get_lists_with_long_positions(self, length: int, after_list_id: int, limit: int) -> list:
+        """
+        Pares (list_id, user_id), en orden de list_id y después de after_list_id,
+        de las listas con alguna position de más de length caracteres (índice
+        parcial idx_tasks_long_position).
+        """
+        long_lists = (
+            select(Task.list_id)
+            .where(func.length(Task.position) > length, Task.list_id > after_list_id)
+            .distinct()
+            .order_by(Task.list_id)
+            .limit(limit)
+            .subquery()
+        )
+        rows = self.db.execute(
+            select(List.list_id, List.user_id)
+            .join(long_lists, List.list_id == long_lists.c.list_id)
+            .order_by(List.list_id)
+        )
+        return list(rows.tuples())
+
+    def get_position_chunk(self, list_id: int, after: Optional[Tuple[str, int]], limit: Optional[int]) -> list:
+        """Siguientes limit filas (task_id, position) de la lista en orden, después de after."""
+        query = select(Task.task_id, Task.position).where(Task.list_id == list_id)
+        if after is not None:
+            query = query.where(tuple_(Task.position, Task.task_id) > after)
+        query = query.order_by(Task.position, Task.task_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return [dict(row) for row in self.db.execute(query).mappings()]
+
+    def set_task_positions(self, task_rows: list) -> None:
+        """Actualiza position (y change_version) por clave primaria, dentro de la transacción en curso."""
+        if task_rows:
+            self.db.execute(update(Task), task_rows)
+
+    def get_owned_task_ids(self, user_id: int, task_ids) -> set:
+        """Retorna, en una sola consulta, cuáles de las tareas dadas pertenecen al usuario."""
+        rows = self.db.execute(
+            select(Task.task_id).where(
+                Task.task_id.in_(set(task_ids)),
+                Task.list_id.in_(self._user_list_ids(user_id))
+            )
+        )
+        return set(rows.scalars())
+
+    def get_existing_task_ids(self, task_ids) -> set:
+        rows = self.db.execute(select(Task.task_id).where(Task.task_id.in_(set(task_ids))))
+        return set(rows.scalars())
+
+    def get_task_rows(self, task_ids) -> dict:
+        """Retorna las filas de las tareas dadas indexadas por task_id."""
+        rows = self.db.execute(
+            select(*TASK_COLUMNS).where(Task.task_id.in_(set(task_ids)))
+        ).mappings()
+        return {row["task_id"]: dict(row) for row in rows}
+
+    def bulk_create_tasks(self, task_rows: list) -> list:
+        """
+        Inserta todas las tareas con un INSERT ... RETURNING de múltiples filas,
+        en la transacción en curso.
+
+        Las filas retornadas mantienen el orden de task_rows; cada fila debe
+        tener un (list_id, position) distinto dentro del lote.
+        """
+        # Sin sort_by_parameter_order: en SQLite esa opción ejecuta un INSERT por
+        # fila. RETURNING no garantiza el orden, así que las filas se reordenan
+        # por (list_id, position), única dentro del lote
+        rows = self.db.execute(insert(Task).returning(*TASK_COLUMNS), task_rows).mappings()
+        order = {(row["list_id"], row["position"]): index for index, row in enumerate(task_rows)}
+        return sorted((dict(row) for row in rows), key=lambda row: order[(row["list_id"], row["position"])])
+
+    def bulk_update_tasks(self, task_rows: list) -> None:
+        """
+        Actualiza las tareas por clave primaria en la transacción en curso.
+
+        Cada elemento debe incluir task_id; las tareas con los mismos campos
+        se agrupan en un executemany.
+        """
+        if task_rows:
+            self.db.execute(update(Task), task_rows)
+
+    def set_user_tasks_completed(self, user_id: int, task_ids, is_completed: bool, change_version: int) -> list:
+        """Marca las tareas del usuario con un único UPDATE ... RETURNING, en la transacción en curso."""
+        stmt = (
+            update(Task)
+            .where(Task.task_id.in_(set(task_ids)), Task.list_id.in_(self._user_list_ids(user_id)))
+            .values(is_completed=is_completed, change_version=change_version)
+            .returning(*TASK_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        rows = self.db.execute(stmt).mappings().all()
+        return [dict(row) for row in rows]
+
+    def delete_user_tasks(self, user_id: int, task_ids, change_version: int) -> set:
+        """
+        Elimina las tareas del usuario con un único DELETE ... RETURNING y
+        registra sus tombstones con change_version, en la transacción en curso.
+        """
+        stmt = (
+            delete(Task)
+            .where(Task.task_id.in_(set(task_ids)), Task.list_id.in_(self._user_list_ids(user_id)))
+            .returning(Task.task_id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = set(self.db.execute(stmt).scalars())
+        self.add_tombstones(user_id, "task", sorted(deleted), change_version)
+        return deleted
+
+    def create_import_staging(self) -> None:
+        """
+        Crea la tabla temporal donde COPY carga las filas importadas; se
+        elimina sola al terminar la transacción (solo PostgreSQL).
+        """
+        self.db.execute(text(
+            "CREATE TEMP TABLE task_import ("
+            "line INTEGER, list_id INTEGER, task_name TEXT, description TEXT, is_completed BOOLEAN, position TEXT"
+            ") ON COMMIT DROP"
+        ))
+
+    def copy_import_rows(self, rows: list) -> None:
+        """Carga las filas (line, list_id, task_name, description, is_completed, position) en task_import con COPY."""
+        connection = self.db.connection().connection
+        if hasattr(connection.driver_connection, "copy_records_to_table"):
+            # asyncpg (DB_ASYNC=true): la sesión corre dentro de run_sync
+            await_only(connection.driver_connection.copy_records_to_table(
+                "task_import", records=rows, columns=IMPORT_COLUMNS
+            ))
+            return
+        buffer = io.StringIO()
+        buffer.writelines(
+            f"{line}\t{list_id}\t{_copy_text(task_name)}\t{_copy_text(description)}\t{'t' if is_completed else 'f'}\t{position}\n"
+            for line, list_id, task_name, description, is_completed, position in rows
+        )
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY task_import ({', '.join(IMPORT_COLUMNS)}) FROM STDIN", buffer)
+
+    def merge_import_staging(self, user_id: int, change_version: int) -> int:
+        """Inserta en tasks, en el orden del archivo, las filas cargadas en task_import."""
+        now = datetime.utcnow()
+        result = self.db.execute(
+            text(
+                "INSERT INTO tasks (list_id, user_id, task_name, description, is_completed, position, created_at, updated_at, change_version) "
+                "SELECT list_id, :user_id, task_name, description, is_completed, position, :now, :now, :change_version "
+                "FROM task_import ORDER BY line"
+            ),
+            {"user_id": user_id, "now": now, "change_version": change_version}
+        )
+        return result.rowcount
+
+    def insert_import_rows(self, rows: list, user_id: int, change_version: int) -> None:
+        """Alternativa a COPY para otros motores (SQLite): un executemany por lote."""
+        now = datetime.utcnow()
+        self.db.execute(insert(Task.__table__), [
+            {
+                "list_id": list_id, "user_id": user_id, "task_name": task_name, "description": description,
+                "is_completed": is_completed, "position": position, "created_at": now, "updated_at": now,
+                "change_version": change_version
+            }
+            for _, list_id, task_name, description, is_completed, position in rows
+        ])
+
+    def _user_list_ids(self, user_id: int):
+        return select(List.list_id).where(List.user_id == user_id)
+
+
+def _copy_text(value: Optional[str]) -> str:
+    # Formato text de COPY: \N es NULL; barras, tabs y saltos de línea se escapan
+    if value is None:
+        return "\\N"
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
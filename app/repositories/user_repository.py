@@ -1,7 +1,9 @@
+from datetime import datetime
+from sqlalchemy import delete, or_, select, update
 from sqlalchemy.orm import Session
 from app.models.models import User, APIKey
 from .base_repository import BaseRepository
-from typing import Optional
+from typing import Optional, Tuple
 
 class UserRepository(BaseRepository):
     def __init__(self, db: Session):
@@ -9,25 +11,93 @@ class UserRepository(BaseRepository):
 
     def get_user_by_email(self, email: str) -> Optional[User]:
         return self.db.query(User).filter(User.email == email).first()
-    
+
     def get_user_by_username(self, username: str) -> Optional[User]:
         return self.db.query(User).filter(User.username == username).first()
 
-    def create_user(self, user: User) -> User:
-        self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
-        return user
+    def get_login_credentials(self, email: str) -> Optional[dict]:
+        """Solo user_id y password_hash, como columnas (sin instancias ORM en la sesión)."""
+        row = self.db.execute(
+            select(User.user_id, User.password_hash).where(User.email == email)
+        ).mappings().first()
+        return dict(row) if row else None
+
+    def get_user_profile(self, user_id: int, password_hash: Optional[str] = None) -> Optional[dict]:
+        """
+        Datos públicos del usuario; con password_hash, además lo reemplaza en la
+        transacción en curso (UPDATE ... RETURNING, sin consulta adicional).
+        """
+        columns = (User.user_id, User.username, User.email, User.created_at)
+        if password_hash is None:
+            stmt = select(*columns).where(User.user_id == user_id)
+        else:
+            stmt = (
+                update(User)
+                .where(User.user_id == user_id)
+                .values(password_hash=password_hash)
+                .returning(*columns)
+                .execution_options(synchronize_session=False)
+            )
+        row = self.db.execute(stmt).mappings().first()
+        return dict(row) if row else None
+
+    def create_user(self, user_data: dict, commit: bool = True) -> dict:
+        return self.create(user_data, commit=commit)
 
-    def create_api_key(self, api_key: APIKey) -> APIKey:
-        self.db.add(api_key)
+    def create_api_key(self, api_key: dict, commit: bool = True) -> dict:
+        """Inserta una key ya emitida (user_id, key_prefix, key_hash, expires_at)."""
+        return self._insert(APIKey, api_key, commit=commit)
+
+    def create_user_with_api_key(self, user_data: dict, api_key: dict) -> Tuple[dict, dict]:
+        """Crea el usuario y su API key en una sola transacción."""
+        user = self.create_user(user_data, commit=False)
+        api_key_row = self.create_api_key({**api_key, "user_id": user["user_id"]}, commit=False)
         self.db.commit()
-        self.db.refresh(api_key)
-        return api_key
+        return user, api_key_row
+
+    def get_api_key_with_user(self, key_prefix: str) -> Optional[dict]:
+        """Key y datos de su usuario en una sola consulta, por el índice único del prefijo."""
+        stmt = (
+            select(
+                APIKey.key_hash, APIKey.expires_at, APIKey.revoked_at,
+                User.user_id, User.username, User.email, User.created_at
+            )
+            .join(User, User.user_id == APIKey.user_id)
+            .where(APIKey.key_prefix == key_prefix)
+        )
+        row = self.db.execute(stmt).mappings().first()
+        return dict(row) if row else None
 
-    def get_api_key(self, user_id: int) -> Optional[APIKey]:
-        return self.db.query(APIKey).filter(APIKey.user_id == user_id).first()
+    def revoke_excess_api_keys(self, user_id: int, keep: int, now: datetime) -> int:
+        """
+        Revoca las keys del usuario que exceden las `keep` más recientes
+        vigentes, dentro de la transacción en curso.
+        """
+        newest = (
+            select(APIKey.api_key_id)
+            .where(APIKey.user_id == user_id, APIKey.revoked_at.is_(None), APIKey.expires_at > now)
+            .order_by(APIKey.created_at.desc(), APIKey.api_key_id.desc())
+            .limit(keep)
+        )
+        result = self.db.execute(
+            update(APIKey)
+            .where(APIKey.user_id == user_id, APIKey.revoked_at.is_(None), APIKey.api_key_id.not_in(newest))
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
 
-    def delete_api_key(self, api_key: APIKey) -> None:
-        self.db.delete(api_key)
-        self.db.commit() 
\ No newline at end of file
+    def delete_stale_api_keys(self, now: datetime, batch_size: int) -> int:
+        """Elimina hasta batch_size keys vencidas o revocadas y confirma; retorna cuántas."""
+        batch = (
+            select(APIKey.api_key_id)
+            .where(or_(APIKey.expires_at <= now, APIKey.revoked_at.is_not(None)))
+            .limit(batch_size)
+        )
+        result = self.db.execute(
+            delete(APIKey)
+            .where(APIKey.api_key_id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
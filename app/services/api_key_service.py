@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config.settings import API_KEY_PRUNE_BATCH_SIZE
+from app.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ApiKeyService:
+    """Mantenimiento de la tabla api_keys."""
+
+    def __init__(self, db: Session):
+        self.repository = UserRepository(db)
+        self.db = db
+
+    def prune(self, batch_size: int = API_KEY_PRUNE_BATCH_SIZE, max_batches: Optional[int] = None) -> int:
+        """
+        Elimina las keys vencidas o revocadas en lotes de batch_size, cada uno
+        en su propia transacción para no bloquear la tabla. Retorna cuántas se eliminaron.
+        """
+        deleted = 0
+        batches = 0
+        now = datetime.utcnow()
+        while max_batches is None or batches < max_batches:
+            count = self.repository.delete_stale_api_keys(now, batch_size)
+            deleted += count
+            batches += 1
+            if count < batch_size:
+                break
+        return deleted
+
+
+def prune_api_keys(batch_size: int = API_KEY_PRUNE_BATCH_SIZE) -> int:
+    # Sesión propia del engine síncrono: la tarea corre fuera de una petición
+    from app.config.database import get_session_factory
+
+    with get_session_factory()() as db:
+        return ApiKeyService(db).prune(batch_size)
+
+
+async def prune_api_keys_periodically(interval_seconds: float) -> None:
+    """Tarea en segundo plano de main.py: limpia api_keys cada interval_seconds."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            deleted = await run_in_threadpool(prune_api_keys)
+            if deleted:
+                logger.info("Pruned %s expired or revoked API keys", deleted)
+        except Exception:
+            logger.exception("API key pruning failed")
@@ -0,0 +1,26 @@
+from app.config.database import run_db
+
+
+class AsyncService:
+    """
+    Expone los métodos de un servicio como corutinas.
+
+    Cada llamada crea el servicio sobre la sesión de la petición y lo ejecuta
+    mediante run_db, de modo que la misma lógica de repositorios y servicios
+    funciona tanto con Session (threadpool) como con AsyncSession (asyncpg).
+
+        service = AsyncService(TaskService, db)
+        task = await service.get_task(task_id, user_id)
+    """
+
+    def __init__(self, service_class, db):
+        self.service_class = service_class
+        self.db = db
+
+    def __getattr__(self, name: str):
+        async def call(*args, **kwargs):
+            return await run_db(
+                self.db,
+                lambda session: getattr(self.service_class(session), name)(*args, **kwargs)
+            )
+        return call
@@ -0,0 +1,32 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.repositories.list_repository import LIST_COLUMNS, ListRepository
+from app.repositories.task_repository import TASK_COLUMNS, TaskRepository
+
+EXPORT_COLUMNS = {
+    "lists": [column.key for column in LIST_COLUMNS],
+    "tasks": [column.key for column in TASK_COLUMNS],
+}
+
+
+class ExportService:
+    """
+    Lectura por bloques para las exportaciones.
+
+    Cada bloque es una consulta keyset (id > after_id) en una transacción
+    corta: la conexión vuelve al pool mientras el cliente descarga el bloque
+    anterior, y la exportación puede reanudarse desde el último id recibido.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.lists = ListRepository(db)
+        self.tasks = TaskRepository(db)
+
+    def get_chunk(self, resource: str, user_id: int, after_id: Optional[int], limit: int) -> list:
+        if resource == "lists":
+            rows = self.lists.get_lists_after_id(user_id, after_id, limit)
+        else:
+            rows = self.tasks.get_user_tasks_after_id(user_id, after_id, limit)
+        self.db.rollback()
+        return rows
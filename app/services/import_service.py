@@ -0,0 +1,141 @@
+import csv
+from typing import Iterable, Iterator, List, Tuple
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.orm import Session
+from app.config.settings import IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS
+from app.models.schemas import TaskCreateRequest
+from app.repositories.task_repository import TaskRepository
+from app.utils.change_feed import change_feed
+from app.utils.positions import key_between
+
+task_adapter = TypeAdapter(TaskCreateRequest)
+tasks_adapter = TypeAdapter(List[TaskCreateRequest])
+
+
+class ImportService:
+    """
+    Importación masiva de tareas desde NDJSON o CSV.
+
+    El archivo se lee línea por línea y se valida por lotes contra
+    TaskCreateRequest. En PostgreSQL los lotes válidos se cargan con COPY en
+    una tabla temporal y se insertan en tasks con un único INSERT ... SELECT;
+    todo ocurre en una sola transacción. Las filas inválidas o de listas
+    ajenas no se importan y se reportan con su número de línea. Las tareas
+    importadas se agregan al final de su lista, en el orden del archivo.
+    """
+
+    def __init__(self, db: Session):
+        self.repository = TaskRepository(db)
+        self.db = db
+
+    def import_tasks(self, user_id: int, lines: Iterable[str], format: str) -> dict:
+        use_copy = self.db.get_bind().dialect.name == "postgresql"
+        # La versión se incrementa antes de leer la última position de cada lista
+        change_version = self.repository.bump_data_version(user_id)
+        tails = self.repository.get_owned_list_tails(user_id)
+        if use_copy:
+            self.repository.create_import_staging()
+
+        errors = []
+        failed = 0
+        imported = 0
+        rows = _parse_csv(lines) if format == "csv" else _parse_ndjson(lines)
+        try:
+            for batch in _batches(rows, IMPORT_BATCH_SIZE):
+                valid, batch_errors = self._validate(batch, tails)
+                failed += len(batch_errors)
+                errors.extend(batch_errors[:IMPORT_MAX_ERRORS - len(errors)])
+                if not valid:
+                    continue
+                if use_copy:
+                    self.repository.copy_import_rows(valid)
+                else:
+                    self.repository.insert_import_rows(valid, user_id, change_version)
+                    imported += len(valid)
+            if use_copy:
+                imported = self.repository.merge_import_staging(user_id, change_version)
+            if imported:
+                # Los ids importados no se leen de vuelta: el cliente los obtiene
+                # con GET /sync. El evento se entrega con el commit
+                change_feed.publish(self.db, user_id, "task", "imported", None, change_version)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return {"imported": imported, "failed": failed, "errors": errors}
+
+    def _validate(self, batch: list, tails: dict) -> Tuple[list, list]:
+        valid, errors = [], []
+        try:
+            # Caso común: todo el lote es válido y se valida de una sola vez
+            tasks = tasks_adapter.validate_python([data for _, data in batch if not isinstance(data, str)])
+            if len(tasks) != len(batch):
+                raise ValueError
+            results = zip(batch, tasks)
+        except (ValidationError, ValueError):
+            results = ((row, self._validate_row(row[1])) for row in batch)
+
+        for (line, _), task in results:
+            if isinstance(task, str):
+                errors.append({"line": line, "detail": task})
+            elif task.list_id not in tails:
+                errors.append({"line": line, "detail": "Not authorized to create tasks in this list"})
+            else:
+                position = tails[task.list_id] = key_between(tails[task.list_id], None)
+                valid.append((line, task.list_id, task.task_name, task.description, bool(task.is_completed), position))
+        return valid, errors
+
+    def _validate_row(self, data):
+        # Las líneas que no se pudieron leer llegan como el mensaje de error
+        if isinstance(data, str):
+            return data
+        try:
+            return task_adapter.validate_python(data)
+        except ValidationError as exc:
+            return "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+                for error in exc.errors()
+            )
+
+
+# Carácter con el que se reemplazan los bytes que no son UTF-8 válido
+REPLACEMENT_CHARACTER = "\ufffd"
+
+
+def _parse_ndjson(lines: Iterable[str]) -> Iterator[tuple]:
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        if REPLACEMENT_CHARACTER in line:
+            yield line_number, "Invalid UTF-8"
+            continue
+        try:
+            yield line_number, orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield line_number, "Invalid JSON"
+
+
+def _parse_csv(lines: Iterable[str]) -> Iterator[tuple]:
+    # La primera fila es el encabezado; las celdas vacías se tratan como ausentes
+    reader = csv.DictReader(lines)
+    for row in reader:
+        if None in row:
+            yield reader.line_num, "Too many columns"
+            continue
+        if any(REPLACEMENT_CHARACTER in value for value in row.values() if value):
+            yield reader.line_num, "Invalid UTF-8"
+            continue
+        yield reader.line_num, {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def _batches(rows: Iterator, size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
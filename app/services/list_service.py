@@ -1,45 +1,109 @@
 from sqlalchemy.orm import Session
-from app.models.models import List
 from app.repositories.list_repository import ListRepository
 from fastapi import HTTPException
+from typing import Optional
+from app.utils.cache import response_cache
+from app.utils.change_feed import change_feed
+from app.utils.etag import make_etag
+from app.utils.pagination import DEFAULT_PAGE_SIZE, Page, decode_cursor, paginate
 
 class ListService:
     def __init__(self, db: Session):
         self.repository = ListRepository(db)
         self.db = db
 
-    def get_user_lists(self, user_id: int):
-        return self.repository.get_lists_by_user(user_id)
+    def get_user_lists(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        summary: bool = False,
+        etag: Optional[str] = None
+    ) -> Page:
+        # El ETag ya leído en esta sesión identifica la versión de los datos
+        page = response_cache.get_or_load(
+            user_id, "lists", (cursor, limit, summary),
+            lambda: self._load_user_lists(user_id, cursor, limit, summary),
+            etag or (lambda: self.repository.get_data_version(user_id))
+        )
+        return Page(*page)
+
+    def get_lists_etag(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        summary: bool = False
+    ) -> str:
+        # Solo consulta la versión de datos del usuario, sin cargar filas; las
+        # escrituras de tareas también la incrementan, por lo que cubre el resumen
+        version = self.repository.get_data_version(user_id)
+        return make_etag("lists", user_id, version, cursor, limit, summary)
 
     def get_list(self, list_id: int, user_id: int):
-        list_obj = self.repository.get_list_by_id(list_id)
-        if not list_obj:
-            raise HTTPException(status_code=404, detail="List not found")
-        
-        if list_obj.user_id != user_id:
-            raise HTTPException(status_code=403, detail="Not authorized to access this list")
-        
-        return list_obj
+        return response_cache.get_or_load(
+            user_id, "list", (list_id,),
+            lambda: self._get_owned_list(list_id, user_id),
+            lambda: self.repository.get_data_version(user_id)
+        )
 
     def create_list(self, user_id: int, list_name: str):
-        list_obj = List(
-            user_id=user_id,
-            list_name=list_name
-        )
-        return self.repository.create_list(list_obj)
+        change_version = self.repository.bump_data_version(user_id)
+        list_row = self.repository.create_list({"user_id": user_id, "list_name": list_name, "change_version": change_version})
+        # El evento se emite en la transacción de la escritura y se entrega con el commit
+        change_feed.publish(self.db, user_id, "list", "created", [list_row["list_id"]], change_version)
+        self.db.commit()
+        return list_row
 
     def update_list(self, list_id: int, user_id: int, list_data: dict):
-        # Verificar que la lista existe y pertenece al usuario
-        list_obj = self.get_list(list_id, user_id)
-        
         # Actualizar solo el nombre de la lista
         if "list_name" not in list_data:
             raise HTTPException(status_code=400, detail="list_name is required")
         
-        return self.repository.update_list(list_id, {"list_name": list_data["list_name"]})
+        # El UPDATE solo afecta la lista si pertenece al usuario
+        change_version = self.repository.bump_data_version(user_id)
+        list_row = self.repository.update_list(
+            list_id, {"list_name": list_data["list_name"], "change_version": change_version}, user_id=user_id
+        )
+        if not list_row:
+            # Ninguna fila fue afectada: distinguir entre lista inexistente (404) y ajena (403)
+            self._get_owned_list(list_id, user_id)
+            raise HTTPException(status_code=404, detail="List not found")
+        change_feed.publish(self.db, user_id, "list", "updated", [list_id], change_version)
+        self.db.commit()
+        return list_row
 
     def delete_list(self, list_id: int, user_id: int) -> bool:
         # Verificar que la lista existe y pertenece al usuario
-        list_obj = self.get_list(list_id, user_id)
+        self._get_owned_list(list_id, user_id)
+        
+        change_version = self.repository.bump_data_version(user_id)
+        deleted = self.repository.delete_list(list_id, user_id, change_version)
+        if deleted:
+            change_feed.publish(self.db, user_id, "list", "deleted", [list_id], change_version)
+            self.db.commit()
+        return deleted
+
+    def _get_owned_list(self, list_id: int, user_id: int) -> dict:
+        list_row = self.repository.get_list_row(list_id)
+        if not list_row:
+            raise HTTPException(status_code=404, detail="List not found")
         
-        return self.repository.delete_list(list_id) 
\ No newline at end of file
+        if list_row["user_id"] != user_id:
+            raise HTTPException(status_code=403, detail="Not authorized to access this list")
+        
+        return list_row
+
+    def _load_user_lists(self, user_id: int, cursor: Optional[str], limit: Optional[int], summary: bool) -> Page:
+        # Al continuar desde un cursor sin limit se usa el tamaño de página por defecto
+        if cursor and not limit:
+            limit = DEFAULT_PAGE_SIZE
+
+        # Se pide una fila extra para saber si existe una página siguiente
+        lists = self.repository.get_lists_by_user(
+            user_id,
+            after=decode_cursor(cursor) if cursor else None,
+            limit=limit + 1 if limit else None,
+            with_summary=summary
+        )
+        return paginate(lists, limit, "created_at", "list_id")
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config.settings import POSITION_REBALANCE_BATCH_SIZE
+from app.repositories.task_repository import TaskRepository
+from app.utils.change_feed import change_feed
+from app.utils.positions import REBALANCE_POSITION_LENGTH, keys_between
+
+logger = logging.getLogger(__name__)
+
+# Listas leídas por consulta al buscar claves largas
+LIST_SCAN_SIZE = 100
+
+
+class PositionService:
+    """Mantenimiento de Task.position: acorta las claves que crecieron por inserciones repetidas."""
+
+    def __init__(self, db: Session):
+        self.repository = TaskRepository(db)
+        self.db = db
+
+    def rebalance(self, batch_size: int = POSITION_REBALANCE_BATCH_SIZE) -> int:
+        """
+        Reasigna claves cortas a las listas con alguna position de más de
+        REBALANCE_POSITION_LENGTH caracteres. Retorna cuántas listas se procesaron.
+        """
+        rebalanced = 0
+        after_list_id = 0
+        while True:
+            lists = self.repository.get_lists_with_long_positions(
+                REBALANCE_POSITION_LENGTH, after_list_id, LIST_SCAN_SIZE
+            )
+            for list_id, user_id in lists:
+                self.rebalance_list(list_id, user_id, batch_size)
+                rebalanced += 1
+            if len(lists) < LIST_SCAN_SIZE:
+                return rebalanced
+            after_list_id = lists[-1][0]
+
+    def rebalance_list(self, list_id: int, user_id: int, batch_size: int = POSITION_REBALANCE_BATCH_SIZE) -> None:
+        """
+        Recorre la lista en orden en lotes de batch_size, cada uno en su propia
+        transacción: las claves nuevas de un lote quedan entre la última clave
+        ya reasignada y la clave actual de la fila siguiente, por lo que el
+        orden se conserva aunque la lista cambie entre lotes.
+        """
+        after: Optional[tuple] = None
+        previous = None
+        while True:
+            change_version = self.repository.bump_data_version(user_id)
+            rows = self.repository.get_position_chunk(list_id, after, batch_size + 1)
+            chunk, following = rows[:batch_size], rows[batch_size:]
+            if not chunk:
+                self.db.rollback()
+                return
+            keys = keys_between(previous, following[0]["position"] if following else None, len(chunk))
+            self.repository.set_task_positions([
+                {"task_id": row["task_id"], "position": key, "change_version": change_version}
+                for row, key in zip(chunk, keys)
+            ])
+            change_feed.publish(self.db, user_id, "task", "updated", [row["task_id"] for row in chunk], change_version)
+            self.db.commit()
+            if not following:
+                return
+            previous = keys[-1]
+            after = (previous, chunk[-1]["task_id"])
+
+
+def rebalance_positions(batch_size: int = POSITION_REBALANCE_BATCH_SIZE) -> int:
+    # Sesión propia del engine síncrono: la tarea corre fuera de una petición
+    from app.config.database import get_session_factory
+
+    with get_session_factory()() as db:
+        return PositionService(db).rebalance(batch_size)
+
+
+async def rebalance_positions_periodically(interval_seconds: float) -> None:
+    """Tarea en segundo plano de main.py: rebalancea posiciones cada interval_seconds."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            rebalanced = await run_in_threadpool(rebalance_positions)
+            if rebalanced:
+                logger.info("Rebalanced task positions in %s lists", rebalanced)
+        except Exception:
+            logger.exception("Task position rebalancing failed")
@@ -0,0 +1,53 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.repositories.list_repository import ListRepository
+from app.repositories.task_repository import TaskRepository
+from app.utils.cache import response_cache
+from app.utils.etag import make_etag
+
+
+class SyncService:
+    """
+    Sincronización incremental (GET /sync). El token es users.data_version:
+    cada escritura lo incrementa y marca con él las filas que crea, modifica
+    (change_version) o elimina (tombstones).
+    """
+
+    def __init__(self, db: Session):
+        self.list_repository = ListRepository(db)
+        self.task_repository = TaskRepository(db)
+        self.db = db
+
+    def get_changes(self, user_id: int, since: Optional[int] = None, etag: Optional[str] = None) -> dict:
+        return response_cache.get_or_load(
+            user_id, "sync", (since,),
+            lambda: self._load_changes(user_id, since),
+            etag or (lambda: self.list_repository.get_data_version(user_id))
+        )
+
+    def get_sync_etag(self, user_id: int, since: Optional[int] = None) -> str:
+        version = self.list_repository.get_data_version(user_id)
+        return make_etag("sync", user_id, version, since)
+
+    def _load_changes(self, user_id: int, since: Optional[int]) -> dict:
+        # La versión se lee primero: las escrituras posteriores tienen una
+        # versión mayor y quedan para la siguiente sincronización
+        token = self.list_repository.get_data_version(user_id)
+        # Sin token, o con uno que no corresponde a este usuario (mayor que su
+        # versión actual), se envía el conjunto completo sin tombstones. Las
+        # filas anteriores al seguimiento de cambios tienen change_version 0 y
+        # solo se envían en la sincronización completa
+        full = since is None or since > token
+        lower = -1 if full else since
+
+        deleted = {"lists": [], "tasks": []}
+        if not full:
+            for tombstone in self.list_repository.get_tombstones(user_id, lower, token):
+                deleted[f"{tombstone['resource']}s"].append(tombstone["row_id"])
+        return {
+            "token": token,
+            "full": full,
+            "lists": self.list_repository.get_lists_changed(user_id, lower, token),
+            "tasks": self.task_repository.get_user_tasks_changed(user_id, lower, token),
+            "deleted": deleted,
+        }
@@ -1,49 +1,355 @@
+from datetime import datetime
+from typing import Optional
 from sqlalchemy.orm import Session
-from app.models.models import Task, List
 from app.repositories.task_repository import TaskRepository
 from fastapi import HTTPException
+from app.utils.cache import response_cache
+from app.utils.change_feed import change_feed
+from app.utils.etag import make_etag
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE, Page, decode_cursor, decode_offset_cursor, decode_position_cursor,
+    encode_offset_cursor, encode_position_cursor, paginate
+)
+from app.utils.positions import MAX_POSITION_LENGTH, key_between, keys_between
+from app.utils.search import rank_rows, search_terms
 
 class TaskService:
     def __init__(self, db: Session):
         self.repository = TaskRepository(db)
         self.db = db
 
-    def get_user_tasks(self, user_id: int):
-        return self.repository.get_user_tasks(user_id)
+    def get_user_tasks(
+        self,
+        user_id: int,
+        is_completed: Optional[bool] = None,
+        list_id: Optional[int] = None,
+        created_after: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        order: str = "created_at",
+        etag: Optional[str] = None
+    ) -> Page:
+        if order == "position" and list_id is None:
+            raise HTTPException(status_code=400, detail="order=position requires list_id")
+        params = (is_completed, list_id, created_after, cursor, limit, order)
+        # El ETag ya leído en esta sesión identifica la versión de los datos
+        page = response_cache.get_or_load(
+            user_id, "tasks", params,
+            lambda: self._load_user_tasks(user_id, *params),
+            etag or (lambda: self.repository.get_data_version(user_id))
+        )
+        return Page(*page)
+
+    def get_tasks_etag(
+        self,
+        user_id: int,
+        is_completed: Optional[bool] = None,
+        list_id: Optional[int] = None,
+        created_after: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        order: str = "created_at"
+    ) -> str:
+        # Solo consulta la versión de datos del usuario, sin cargar filas
+        version = self.repository.get_data_version(user_id)
+        return make_etag("tasks", user_id, version, is_completed, list_id, created_after, cursor, limit, order)
+
+    def search_tasks(
+        self,
+        user_id: int,
+        query: str,
+        is_completed: Optional[bool] = None,
+        list_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        etag: Optional[str] = None
+    ) -> Page:
+        params = (query, is_completed, list_id, cursor, limit)
+        page = response_cache.get_or_load(
+            user_id, "search", params,
+            lambda: self._search_user_tasks(user_id, *params),
+            etag or (lambda: self.repository.get_data_version(user_id))
+        )
+        return Page(*page)
+
+    def get_search_etag(
+        self,
+        user_id: int,
+        query: str,
+        is_completed: Optional[bool] = None,
+        list_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> str:
+        version = self.repository.get_data_version(user_id)
+        return make_etag("search", user_id, version, query, is_completed, list_id, cursor, limit)
 
     def get_task(self, task_id: int, user_id: int):
-        task = self.repository.get_task_by_id(task_id)
-        if not task:
+        return response_cache.get_or_load(
+            user_id, "task", (task_id,),
+            lambda: self._get_owned_task(task_id, user_id),
+            lambda: self.repository.get_data_version(user_id)
+        )
+
+    def create_task(self, list_id: int, user_id: int, task_data: dict):
+        # La versión se incrementa primero: bloquea la fila del usuario hasta el
+        # commit, así dos inserciones concurrentes no toman la misma position
+        change_version = self.repository.bump_data_version(user_id)
+
+        # Verificar que la lista pertenece al usuario y obtener su última position
+        tails = self.repository.get_owned_list_tails(user_id, [list_id])
+        if list_id not in tails:
+            raise HTTPException(status_code=403, detail="Not authorized to create tasks in this list")
+
+        task = self.repository.create_task({
+            "list_id": list_id,
+            "user_id": user_id,
+            "task_name": task_data["task_name"],
+            "description": task_data.get("description"),
+            "is_completed": task_data.get("is_completed", False),
+            "position": key_between(tails[list_id], None),
+            "change_version": change_version
+        })
+        # El evento se emite en la transacción de la escritura y se entrega con el commit
+        change_feed.publish(self.db, user_id, "task", "created", [task["task_id"]], change_version)
+        self.db.commit()
+        return task
+
+    def update_task(self, task_id: int, user_id: int, task_data: dict):
+        if not task_data:
+            return self._get_owned_task(task_id, user_id)
+
+        # El UPDATE solo afecta la tarea si pertenece al usuario
+        change_version = self.repository.bump_data_version(user_id)
+        updated_task = self.repository.update_user_task(task_id, user_id, {**task_data, "change_version": change_version})
+        if not updated_task:
+            self._raise_access_error(task_id, user_id)
+        change_feed.publish(self.db, user_id, "task", "updated", [task_id], change_version)
+        self.db.commit()
+        return updated_task
+
+    def delete_task(self, task_id: int, user_id: int) -> bool:
+        # El DELETE solo afecta la tarea si pertenece al usuario
+        change_version = self.repository.bump_data_version(user_id)
+        if not self.repository.delete_user_task(task_id, user_id, change_version):
+            self._raise_access_error(task_id, user_id)
+        change_feed.publish(self.db, user_id, "task", "deleted", [task_id], change_version)
+        self.db.commit()
+        return True
+
+    def bulk_create_tasks(self, user_id: int, tasks: list) -> list:
+        change_version = self.repository.bump_data_version(user_id)
+        # Verificar en una sola consulta qué listas pertenecen al usuario; las
+        # tareas nuevas se agregan al final de cada lista, en el orden recibido
+        tails = self.repository.get_owned_list_tails(user_id, [task["list_id"] for task in tasks])
+        rows = []
+        for task in tasks:
+            if task["list_id"] in tails:
+                position = tails[task["list_id"]] = key_between(tails[task["list_id"]], None)
+                rows.append({
+                    "list_id": task["list_id"],
+                    "user_id": user_id,
+                    "task_name": task["task_name"],
+                    "description": task.get("description"),
+                    "is_completed": task.get("is_completed", False),
+                    "position": position,
+                    "change_version": change_version
+                })
+        created = iter([])
+        if rows:
+            created_rows = self.repository.bulk_create_tasks(rows)
+            change_feed.publish(self.db, user_id, "task", "created", [row["task_id"] for row in created_rows], change_version)
+            self.db.commit()
+            created = iter(created_rows)
+
+        results = []
+        for index, task in enumerate(tasks):
+            if task["list_id"] in tails:
+                row = next(created)
+                results.append({"index": index, "task_id": row["task_id"], "status": 201, "task": row})
+            else:
+                results.append({"index": index, "status": 403, "detail": "Not authorized to create tasks in this list"})
+        return results
+
+    def bulk_update_tasks(self, user_id: int, tasks: list) -> list:
+        task_ids = [task["task_id"] for task in tasks]
+        owned_task_ids = self.repository.get_owned_task_ids(user_id, task_ids)
+
+        # Solo se actualizan las tareas propias que traen al menos un campo además de task_id
+        change_version = self.repository.bump_data_version(user_id)
+        updates = [
+            {**task, "change_version": change_version}
+            for task in tasks if task["task_id"] in owned_task_ids and len(task) > 1
+        ]
+        self.repository.bulk_update_tasks(updates)
+        if updates:
+            change_feed.publish(self.db, user_id, "task", "updated", [task["task_id"] for task in updates], change_version)
+        self.db.commit()
+        rows = self.repository.get_task_rows(owned_task_ids) if owned_task_ids else {}
+        return self._bulk_results(task_ids, rows)
+
+    def bulk_set_completed(self, user_id: int, task_ids: list, is_completed: bool) -> list:
+        change_version = self.repository.bump_data_version(user_id)
+        rows = self.repository.set_user_tasks_completed(user_id, task_ids, is_completed, change_version)
+        if rows:
+            change_feed.publish(self.db, user_id, "task", "updated", [row["task_id"] for row in rows], change_version)
+        self.db.commit()
+        return self._bulk_results(task_ids, {row["task_id"]: row for row in rows})
+
+    def bulk_delete_tasks(self, user_id: int, task_ids: list) -> list:
+        change_version = self.repository.bump_data_version(user_id)
+        deleted = self.repository.delete_user_tasks(user_id, task_ids, change_version)
+        if deleted:
+            change_feed.publish(self.db, user_id, "task", "deleted", sorted(deleted), change_version)
+        self.db.commit()
+        return self._bulk_results(task_ids, dict.fromkeys(deleted))
+
+    def move_task(self, task_id: int, user_id: int, move: dict):
+        """
+        Cambia la position de la tarea (y opcionalmente su lista) reescribiendo
+        solo su fila: la nueva clave queda entre la de la tarea de referencia y
+        la de su vecina.
+        """
+        after_task_id, before_task_id = move.get("after_task_id"), move.get("before_task_id")
+        if after_task_id is not None and before_task_id is not None:
+            raise HTTPException(status_code=400, detail="Use either after_task_id or before_task_id")
+        anchor_id = after_task_id if after_task_id is not None else before_task_id
+        if anchor_id == task_id:
+            raise HTTPException(status_code=400, detail="A task cannot be moved next to itself")
+
+        # Bloquea la fila del usuario antes de leer las posiciones vecinas
+        change_version = self.repository.bump_data_version(user_id)
+        task = self._get_owned_task(task_id, user_id)
+        if anchor_id is not None:
+            anchor = self._get_owned_task(anchor_id, user_id)
+            list_id = anchor["list_id"]
+            if move.get("list_id") not in (None, list_id):
+                raise HTTPException(status_code=400, detail="list_id does not match the list of the reference task")
+            position = self._position_next_to(anchor, task_id, before_task_id is not None)
+            if position is None:
+                # Claves empatadas o demasiado largas: se rebalancea la lista y se recalcula
+                self._rebalance_list(list_id, change_version)
+                anchor = self._get_owned_task(anchor_id, user_id)
+                position = self._position_next_to(anchor, task_id, before_task_id is not None)
+        else:
+            list_id = move.get("list_id") or task["list_id"]
+            if list_id != task["list_id"] and list_id not in self.repository.get_owned_list_tails(user_id, [list_id]):
+                raise HTTPException(status_code=403, detail="Not authorized to move tasks to this list")
+            position = key_between(self.repository.get_list_tail(list_id, exclude_task_id=task_id), None)
+
+        moved = self.repository.update_user_task(
+            task_id, user_id, {"list_id": list_id, "position": position, "change_version": change_version}
+        )
+        change_feed.publish(self.db, user_id, "task", "updated", [task_id], change_version)
+        self.db.commit()
+        return moved
+
+    def _position_next_to(self, anchor: dict, task_id: int, before: bool) -> Optional[str]:
+        neighbor = self.repository.get_adjacent_position(
+            anchor["list_id"], anchor["position"], anchor["task_id"], task_id, before=before
+        )
+        low, high = (neighbor, anchor["position"]) if before else (anchor["position"], neighbor)
+        if low is not None and high is not None and low >= high:
+            return None
+        position = key_between(low, high)
+        return position if len(position) <= MAX_POSITION_LENGTH else None
+
+    def _rebalance_list(self, list_id: int, change_version: int) -> None:
+        # Reasigna claves cortas y equidistantes a toda la lista, en la transacción en curso
+        rows = self.repository.get_position_chunk(list_id, None, None)
+        self.repository.set_task_positions([
+            {"task_id": row["task_id"], "position": position, "change_version": change_version}
+            for row, position in zip(rows, keys_between(None, None, len(rows)))
+        ])
+
+    def _raise_access_error(self, task_id: int, user_id: int):
+        # Ninguna fila fue afectada: distinguir entre tarea inexistente (404) y ajena (403)
+        self._get_owned_task(task_id, user_id)
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    def _get_owned_task(self, task_id: int, user_id: int):
+        # Obtener la tarea y el dueño de su lista en una sola consulta
+        row = self.repository.get_task_with_owner(task_id)
+        if not row:
             raise HTTPException(status_code=404, detail="Task not found")
         
         # Verificar que la tarea pertenece al usuario
-        list_owner = self.db.query(List).filter(List.list_id == task.list_id).first()
-        if not list_owner or list_owner.user_id != user_id:
+        task = dict(row)
+        if task.pop("owner_id") != user_id:
             raise HTTPException(status_code=403, detail="Not authorized to access this task")
         
         return task
 
-    def create_task(self, list_id: int, user_id: int, task_data: dict):
-        # Verificar que la lista pertenece al usuario
-        list_obj = self.db.query(List).filter(List.list_id == list_id).first()
-        if not list_obj or list_obj.user_id != user_id:
-            raise HTTPException(status_code=403, detail="Not authorized to create tasks in this list")
+    def _load_user_tasks(
+        self,
+        user_id: int,
+        is_completed: Optional[bool],
+        list_id: Optional[int],
+        created_after: Optional[datetime],
+        cursor: Optional[str],
+        limit: Optional[int],
+        order: str
+    ) -> Page:
+        # Al continuar desde un cursor sin limit se usa el tamaño de página por defecto
+        if cursor and not limit:
+            limit = DEFAULT_PAGE_SIZE
 
-        task = Task(
+        # Se pide una fila extra para saber si existe una página siguiente
+        by_position = order == "position"
+        decode = decode_position_cursor if by_position else decode_cursor
+        tasks = self.repository.get_user_tasks(
+            user_id,
+            is_completed=is_completed,
             list_id=list_id,
-            task_name=task_data["task_name"],
-            description=task_data.get("description"),
-            is_completed=task_data.get("is_completed", False)
+            created_after=created_after,
+            after=decode(cursor) if cursor else None,
+            limit=limit + 1 if limit else None,
+            order=order
         )
-        return self.repository.create_task(task)
+        if by_position:
+            return paginate(tasks, limit, "position", "task_id", encode=encode_position_cursor)
+        return paginate(tasks, limit, "created_at", "task_id")
 
-    def update_task(self, task_id: int, user_id: int, task_data: dict):
-        task = self.get_task(task_id, user_id)  # This will handle authorization
-        updated_task = self.repository.update_task(task_id, task_data)
-        if not updated_task:
-            raise HTTPException(status_code=404, detail="Task not found")
-        return updated_task
+    def _search_user_tasks(
+        self,
+        user_id: int,
+        query: str,
+        is_completed: Optional[bool],
+        list_id: Optional[int],
+        cursor: Optional[str],
+        limit: Optional[int]
+    ) -> Page:
+        terms = search_terms(query)
+        if not terms:
+            return Page([])
+        limit = limit or DEFAULT_PAGE_SIZE
+        offset = decode_offset_cursor(cursor) if cursor else 0
 
-    def delete_task(self, task_id: int, user_id: int) -> bool:
-        task = self.get_task(task_id, user_id)  # This will handle authorization
-        return self.repository.delete_task(task_id) 
\ No newline at end of file
+        # Se pide una fila extra para saber si existe una página siguiente
+        if self.db.get_bind().dialect.name == "postgresql":
+            rows = self.repository.search_tasks(
+                user_id, terms, query,
+                is_completed=is_completed, list_id=list_id, offset=offset, limit=limit + 1
+            )
+        else:
+            tasks = self.repository.get_user_tasks(user_id, is_completed=is_completed, list_id=list_id)
+            rows = rank_rows(tasks, terms, query)[offset:offset + limit + 1]
+
+        if len(rows) <= limit:
+            return Page(rows)
+        return Page(rows[:limit], encode_offset_cursor(offset + limit))
+
+    def _bulk_results(self, task_ids: list, rows: dict) -> list:
+        # Las tareas no afectadas se clasifican en ajenas (403) o inexistentes (404) con una consulta
+        missing = set(task_ids) - rows.keys()
+        existing = self.repository.get_existing_task_ids(missing) if missing else set()
+
+        results = []
+        for index, task_id in enumerate(task_ids):
+            if task_id in rows:
+                results.append({"index": index, "task_id": task_id, "status": 200, "task": rows[task_id]})
+            elif task_id in existing:
+                results.append({"index": index, "task_id": task_id, "status": 403, "detail": "Not authorized to access this task"})
+            else:
+                results.append({"index": index, "task_id": task_id, "status": 404, "detail": "Task not found"})
+        return results
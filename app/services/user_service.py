@@ -1,19 +1,26 @@
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.models.models import User, APIKey
 from app.repositories.user_repository import UserRepository
+from app.utils.api_keys import generate_api_key
+from app.utils.auth_cache import api_key_cache
+from app.config.settings import API_KEY_EXPIRATION_HOURS, API_KEY_MAX_ACTIVE
 from fastapi import HTTPException
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
-import secrets
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from typing import Optional
 
 class UserService:
+    """
+    Operaciones de base de datos del registro y login.
+
+    El hashing y la verificación de contraseñas (bcrypt) no ocurren aquí: el
+    controlador los ejecuta en password_hasher, fuera del event loop.
+    """
+
     def __init__(self, db: Session):
         self.repository = UserRepository(db)
         self.db = db
 
-    def register(self, username: str, email: str, password: str):
+    def check_available(self, username: str, email: str) -> None:
         # Verificar si el usuario ya existe
         if self.repository.get_user_by_email(email):
             raise HTTPException(status_code=400, detail="Email already registered")
@@ -21,51 +28,68 @@ class UserService:
         if self.repository.get_user_by_username(username):
             raise HTTPException(status_code=400, detail="Username already taken")
 
-        # Crear el usuario
-        hashed_password = pwd_context.hash(password)
-        user = User(
-            username=username,
-            email=email,
-            password_hash=hashed_password,
-            created_at=datetime.utcnow()
-        )
-        
-        user = self.repository.create_user(user)
-        
-        # Crear API key
-        api_key = APIKey(
-            user_id=user.user_id,
-            api_key=secrets.token_urlsafe(32)
-        )
-        api_key = self.repository.create_api_key(api_key)
+    def register(self, username: str, email: str, password_hash: str):
+        # El usuario y su API key se crean en una sola transacción; los índices
+        # únicos cubren el registro concurrente entre la validación y el INSERT
+        issued, api_key_values = self._issue_api_key()
+        try:
+            user, _ = self.repository.create_user_with_api_key(
+                {
+                    "username": username,
+                    "email": email,
+                    "password_hash": password_hash,
+                    "created_at": api_key_values["created_at"]
+                },
+                api_key_values
+            )
+        except IntegrityError:
+            self.db.rollback()
+            self.check_available(username, email)
+            raise
+        api_key_cache.invalidate_user(user["user_id"])
         
         return {
-            "user_id": user.user_id,
-            "username": user.username,
-            "email": user.email,
-            "api_key": api_key.api_key,
-            "created_at": user.created_at
+            "user_id": user["user_id"],
+            "username": user["username"],
+            "email": user["email"],
+            "api_key": issued.api_key,
+            "created_at": user["created_at"]
         }
 
-    def login(self, email: str, password: str):
-        user = self.repository.get_user_by_email(email)
-        if not user:
+    def get_login_user(self, email: str) -> dict:
+        credentials = self.repository.get_login_credentials(email)
+        # Terminar la transacción de lectura: la conexión vuelve al pool
+        # mientras el controlador verifica la contraseña con bcrypt
+        self.db.rollback()
+        if not credentials:
             raise HTTPException(status_code=401, detail="Invalid email or password")
-        
-        if not pwd_context.verify(password, user.password_hash):
+        return credentials
+
+    def login(self, user_id: int, new_password_hash: Optional[str] = None):
+        # El usuario se vuelve a leer por id (y, si cambió el costo de bcrypt
+        # configurado, se guarda el hash recalculado en la misma sentencia)
+        response = self.repository.get_user_profile(user_id, new_password_hash)
+        if not response:
             raise HTTPException(status_code=401, detail="Invalid email or password")
+
+        # Crear nueva API key y revocar las que excedan el máximo por usuario
+        # (el commit incluye la actualización del hash)
+        issued, api_key_values = self._issue_api_key()
+        self.repository.create_api_key({**api_key_values, "user_id": response["user_id"]}, commit=False)
+        self.repository.revoke_excess_api_keys(response["user_id"], API_KEY_MAX_ACTIVE, api_key_values["created_at"])
+        self.db.commit()
+        api_key_cache.invalidate_user(response["user_id"])
         
-        # Crear nueva API key
-        api_key = APIKey(
-            user_id=user.user_id,
-            api_key=secrets.token_urlsafe(32)
-        )
-        api_key = self.repository.create_api_key(api_key)
-        
-        return {
-            "user_id": user.user_id,
-            "username": user.username,
-            "email": user.email,
-            "api_key": api_key.api_key,
-            "created_at": user.created_at
-        } 
\ No newline at end of file
+        return {**response, "api_key": issued.api_key}
+
+    def _issue_api_key(self):
+        # Solo se guardan el prefijo y el hash del secreto; la key completa se
+        # retorna una única vez en la respuesta
+        issued = generate_api_key()
+        now = datetime.utcnow()
+        return issued, {
+            "key_prefix": issued.key_prefix,
+            "key_hash": issued.key_hash,
+            "created_at": now,
+            "expires_at": now + timedelta(hours=API_KEY_EXPIRATION_HOURS)
+        }
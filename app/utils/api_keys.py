@@ -0,0 +1,41 @@
+import hashlib
+import hmac
+import secrets
+from typing import NamedTuple, Optional, Tuple
+
+# Formato de las API keys: "<prefijo>.<secreto>". El prefijo es público y se
+# busca por índice único; del secreto solo se guarda su SHA-256
+SEPARATOR = "."
+PREFIX_BYTES = 6
+SECRET_BYTES = 32
+
+
+class IssuedAPIKey(NamedTuple):
+    # Key completa: se entrega una sola vez al cliente y nunca se guarda
+    api_key: str
+    key_prefix: str
+    key_hash: str
+
+
+def generate_api_key() -> IssuedAPIKey:
+    prefix = secrets.token_hex(PREFIX_BYTES)
+    secret = secrets.token_urlsafe(SECRET_BYTES)
+    return IssuedAPIKey(f"{prefix}{SEPARATOR}{secret}", prefix, hash_secret(secret))
+
+
+def split_api_key(api_key: str) -> Optional[Tuple[str, str]]:
+    """Retorna (prefijo, secreto), o None si la key no tiene el formato esperado."""
+    prefix, separator, secret = api_key.partition(SEPARATOR)
+    if not separator or not prefix or not secret:
+        return None
+    return prefix, secret
+
+
+def hash_secret(secret: str) -> str:
+    # El secreto tiene 256 bits aleatorios: un hash rápido basta, sin sal ni bcrypt
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def verify_secret(secret: str, key_hash: str) -> bool:
+    # Comparación en tiempo constante
+    return hmac.compare_digest(hash_secret(secret), key_hash)
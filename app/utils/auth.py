@@ -1,33 +1,95 @@
+import hmac
 from datetime import datetime
+from typing import Optional
 from fastapi import Depends, HTTPException
 from fastapi.security import APIKeyHeader
 from sqlalchemy.orm import Session
-from app.models.models import APIKey, User
-from app.config.database import get_db
+from starlette.requests import HTTPConnection
+from app.config.database import get_db, get_read_db, run_db, use_primary
+from app.config.settings import METRICS_TOKEN
+from app.repositories.user_repository import UserRepository
+from app.utils.api_keys import split_api_key, verify_secret
+from app.utils.auth_cache import CurrentUser, api_key_cache
+from app.utils.rate_limit import api_key_id, api_key_rate_limiter, auth_rate_limiter, client_ip
+from app.utils.replicas import recent_writes
 
 api_key_header = APIKeyHeader(name="X-API-Key")
+metrics_token_header = APIKeyHeader(name="X-Metrics-Token", auto_error=False)
 
 async def get_current_user(
+    connection: HTTPConnection,
     api_key: str = Depends(api_key_header),
     db: Session = Depends(get_db)
-) -> User:
-    # Buscar la API key en la base de datos
-    api_key_record = db.query(APIKey).filter(
-        APIKey.api_key == api_key
-    ).first()
-    
-    if not api_key_record:
+) -> CurrentUser:
+    # Las API keys recientes se resuelven desde la caché sin consultar la base
+    # de datos; la caché se indexa por la key completa, ya verificada
+    current_user = api_key_cache.get(api_key)
+    if current_user is None:
+        try:
+            current_user = await _authenticate(db, api_key)
+        except HTTPException:
+            # Los intentos fallidos consumen del límite por IP (el mismo de
+            # /auth), no del bucket de la key: conocer el prefijo público no
+            # alcanza para agotar el límite de otro usuario
+            await auth_rate_limiter.check(client_ip(connection))
+            raise
+        api_key_cache.set(api_key, current_user)
+
+    await api_key_rate_limiter.check(api_key_id(api_key), current_user.user_id)
+    return current_user
+
+async def get_current_reader(
+    connection: HTTPConnection,
+    api_key: str = Depends(api_key_header),
+    db: Session = Depends(get_read_db)
+) -> CurrentUser:
+    """
+    get_current_user para las rutas de lectura, sobre la sesión de get_read_db.
+    Si el usuario escribió hace menos de READ_YOUR_WRITES_SECONDS, la sesión
+    pasa al primario para que la respuesta incluya sus propios cambios.
+    """
+    current_user = await get_current_user(connection, api_key, db)
+    if "replica" in db.info and await recent_writes.contains(current_user.user_id):
+        await use_primary(db)
+    return current_user
+
+async def _authenticate(db: Session, api_key: str) -> CurrentUser:
+    try:
+        return await run_db(db, _load_user, api_key)
+    except HTTPException:
+        if "replica" not in db.info:
+            raise
+        # La key puede ser más reciente que los datos de la réplica (login recién hecho)
+        await use_primary(db)
+        return await run_db(db, _load_user, api_key)
+
+def _load_user(db: Session, api_key: str) -> CurrentUser:
+    # Buscar la key por su prefijo público y verificar el secreto contra el hash
+    parts = split_api_key(api_key)
+    row = UserRepository(db).get_api_key_with_user(parts[0]) if parts else None
+    if not row or not verify_secret(parts[1], row["key_hash"]):
         raise HTTPException(
             status_code=401,
             detail="Invalid API key"
         )
-    
-    # Obtener el usuario asociado a la API key
-    user = db.query(User).filter(User.user_id == api_key_record.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=401,
-            detail="User not found"
-        )
-    
-    return user 
\ No newline at end of file
+
+    if row["revoked_at"] is not None:
+        raise HTTPException(status_code=401, detail="API key revoked")
+    if row["expires_at"] <= datetime.utcnow():
+        raise HTTPException(status_code=401, detail="API key expired")
+
+    return CurrentUser(
+        user_id=row["user_id"],
+        username=row["username"],
+        email=row["email"],
+        created_at=row["created_at"],
+        expires_at=row["expires_at"]
+    )
+
+async def require_metrics_token(token: Optional[str] = Depends(metrics_token_header)) -> None:
+    # Las métricas exponen datos internos (SQL, pools, uso por key e IP): solo
+    # los operadores con METRICS_TOKEN; sin token configurado no existen
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid metrics token")
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from time import monotonic
+from typing import NamedTuple, Optional
+from app.config.settings import AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_SECONDS
+
+
+class CurrentUser(NamedTuple):
+    """
+    Datos mínimos del usuario autenticado.
+
+    Se guarda en caché en lugar del objeto ORM para no retener sesiones
+    de base de datos entre peticiones.
+    """
+    user_id: int
+    username: str
+    email: str
+    created_at: Optional[datetime] = None
+    # Vencimiento de la API key con la que se autenticó
+    expires_at: Optional[datetime] = None
+
+
+class APIKeyCache:
+    """
+    Caché en memoria, acotada (LRU) y con expiración (TTL), que asocia
+    cada API key con el usuario al que pertenece.
+
+    Una API key caliente se resuelve sin consultar la base de datos. La
+    caché es local al proceso, por lo que las bajas de API keys hechas
+    desde otro worker solo se reflejan al expirar la entrada.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, CurrentUser]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, api_key: str) -> Optional[CurrentUser]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(api_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= monotonic():
+                del self._entries[api_key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(api_key)
+            self.hits += 1
+            return user
+
+    def set(self, api_key: str, user: CurrentUser) -> None:
+        if not self.enabled:
+            return
+        # La entrada no sobrevive al vencimiento de la key
+        ttl_seconds = self.ttl_seconds
+        if user.expires_at is not None:
+            ttl_seconds = min(ttl_seconds, (user.expires_at - datetime.utcnow()).total_seconds())
+            if ttl_seconds <= 0:
+                return
+        with self._lock:
+            self._entries[api_key] = (monotonic() + ttl_seconds, user)
+            self._entries.move_to_end(api_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, api_key: str) -> None:
+        with self._lock:
+            self._entries.pop(api_key, None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            stale = [key for key, (_, user) in self._entries.items() if user.user_id == user_id]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+api_key_cache = APIKeyCache(AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_SECONDS)
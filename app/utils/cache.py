@@ -0,0 +1,200 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from threading import Lock
+from time import monotonic
+from typing import Callable, Optional, Union
+from sqlalchemy.util import await_only
+from starlette.concurrency import run_in_threadpool
+from app.config.settings import CACHE_BACKEND, CACHE_TTL_SECONDS, REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """Backend en memoria del proceso. Solo es consistente con un único worker."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, monotonic() + ttl if ttl else None)
+            if len(self._entries) > self.max_entries:
+                self._prune()
+
+    def _prune(self) -> None:
+        # Primero se descartan las entradas vencidas y luego las más antiguas con TTL
+        now = monotonic()
+        for key in [key for key, (_, expires_at) in self._entries.items() if expires_at is not None and expires_at <= now]:
+            del self._entries[key]
+        for key in [key for key, (_, expires_at) in self._entries.items() if expires_at is not None]:
+            if len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+
+
+class RedisCacheBackend:
+    """
+    Backend sobre cualquier servidor compatible con el protocolo de Redis,
+    compartido por todos los workers.
+
+    Acepta un cliente ya construido (por ejemplo fakeredis en pruebas locales).
+    """
+
+    blocking = True
+
+    def __init__(self, url: Optional[str] = None, client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.client = client
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self.client.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+
+class ResponseCache:
+    """
+    Caché de lecturas por usuario indexada por versión de datos.
+
+    Cada clave incluye la versión (users.data_version) leída en la misma
+    sesión que los datos: toda escritura la incrementa, de modo que las
+    entradas anteriores dejan de leerse sin necesidad de borrarlas (expiran
+    por TTL). Una réplica atrasada lee una versión anterior y solo puede
+    llenar la entrada de esa versión, nunca la de la actual.
+    """
+
+    def __init__(self, backend=None, ttl_seconds: float = 300):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get_or_load(
+        self,
+        user_id: int,
+        namespace: str,
+        params: tuple,
+        loader: Callable,
+        version: Union[str, int, Callable]
+    ):
+        """
+        Retorna el valor en caché o lo calcula con loader(). El valor debe ser
+        serializable a JSON; las excepciones de loader no se guardan.
+
+        version es la versión de datos leída en la sesión de loader (o el ETag
+        calculado a partir de ella), o una función que la consulta; solo se
+        evalúa con la caché habilitada.
+        """
+        if not self.enabled:
+            return loader()
+
+        if callable(version):
+            version = version()
+        key = self._key(user_id, version, namespace, params)
+        try:
+            cached = self._call("get", key)
+        except Exception:
+            # Si el backend no responde se lee directamente de la base de datos
+            logger.exception("Response cache unavailable")
+            self._count("errors")
+            return loader()
+
+        if cached is not None:
+            self._count("hits")
+            return json.loads(cached)
+
+        self._count("misses")
+        value = loader()
+        try:
+            self._call("set", key, json.dumps(value, default=_json_default), self.ttl_seconds)
+        except Exception:
+            logger.exception("Response cache unavailable")
+            self._count("errors")
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__ if self.backend else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+            }
+
+    def _key(self, user_id: int, version, namespace: str, params: tuple) -> str:
+        return f"todo:{user_id}:{version}:{namespace}:" + ":".join(str(param) for param in params)
+
+    def _call(self, method: str, *args):
+        return call_backend(self.backend, method, *args)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def call_backend(backend, method: str, *args):
+    """
+    Ejecuta backend.method(*args) desde código síncrono.
+
+    Con DB_ASYNC los servicios se ejecutan en el event loop (run_sync de
+    AsyncSession): el cliente de Redis es síncrono, así que la llamada pasa al
+    threadpool y el greenlet de run_sync la espera sin bloquear el loop.
+    """
+    fn = getattr(backend, method)
+    if backend.blocking and _on_event_loop():
+        return await_only(run_in_threadpool(fn, *args))
+    return fn(*args)
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _json_default(value):
+    # Mismo formato ISO 8601 que Pydantic/orjson para las fechas
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def build_backend(name: str):
+    if name == "memory":
+        return MemoryCacheBackend()
+    if name == "redis":
+        return RedisCacheBackend(REDIS_URL)
+    return None
+
+
+response_cache = ResponseCache(build_backend(CACHE_BACKEND), CACHE_TTL_SECONDS)
@@ -0,0 +1,314 @@
+import asyncio
+import logging
+from threading import Lock
+from typing import Optional
+import orjson
+from sqlalchemy import event as sqlalchemy_event, func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config.settings import CHANGE_FEED_BACKEND, CHANGE_FEED_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Canal de LISTEN/NOTIFY compartido por todos los workers
+CHANNEL = "todo_changes"
+# Con más ids el evento se envía sin ellos (NOTIFY admite hasta 8000 bytes);
+# el cliente obtiene el detalle con GET /sync
+MAX_EVENT_IDS = 100
+RECONNECT_SECONDS = 5
+
+# Evento enviado a una conexión que perdió eventos (cola llena o listener
+# reconectado): el cliente debe sincronizar con GET /sync
+RESYNC_EVENT = {"type": "resync", "ids": None, "token": None}
+
+
+class Subscription:
+    """Cola de eventos de una conexión (SSE o WebSocket) de un usuario."""
+
+    def __init__(self, hub: "ChangeHub", user_id: int, queue_size: int):
+        self.hub = hub
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+
+    def put(self, event: dict) -> None:
+        # Se ejecuta en el event loop de la conexión
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+            self.hub._count("delivered")
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.hub._count("dropped")
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Siguiente evento, o None si no hubo ninguno en timeout segundos (heartbeat)."""
+        if self.overflowed:
+            # Los eventos en cola ya no alcanzan: se reemplazan por un resync
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.overflowed = False
+            return RESYNC_EVENT
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.hub.unsubscribe(self)
+
+
+class ChangeHub:
+    """
+    Suscripciones del proceso agrupadas por usuario. El backend entrega cada
+    evento una sola vez al hub, que lo reparte solo entre las conexiones de
+    ese usuario: un listener sirve a todas las conexiones del worker.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._lock = Lock()
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(self, user_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+    def dispatch(self, user_id: int, event: dict) -> None:
+        """Entrega event a las conexiones de user_id; se puede llamar desde cualquier thread."""
+        with self._lock:
+            subscriptions = tuple(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.put, event)
+
+    def dispatch_all(self, event: dict) -> None:
+        with self._lock:
+            subscriptions = [subscription for group in self._subscribers.values() for subscription in group]
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.put, event)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._subscribers),
+                "connections": sum(len(group) for group in self._subscribers.values()),
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+            }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+class MemoryChangeFeedBackend:
+    """
+    Entrega los eventos solo a las conexiones de este proceso (un worker o
+    pruebas). Como NOTIFY, cada evento se entrega al confirmarse la transacción
+    que lo emitió y se descarta si se revierte.
+    """
+
+    def __init__(self, hub: ChangeHub):
+        self.hub = hub
+        sqlalchemy_event.listen(Session, "after_commit", self._dispatch_pending)
+        sqlalchemy_event.listen(Session, "after_rollback", self._discard_pending)
+
+    def publish(self, db, user_id: int, event: dict) -> None:
+        db.info.setdefault("change_events", []).append((user_id, event))
+
+    def _dispatch_pending(self, session: Session) -> None:
+        for user_id, event in session.info.pop("change_events", ()):
+            self.hub.dispatch(user_id, event)
+
+    def _discard_pending(self, session: Session) -> None:
+        session.info.pop("change_events", None)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+class PostgresChangeFeedBackend:
+    """
+    Reparte los eventos entre workers con LISTEN/NOTIFY. Cada worker mantiene
+    una sola conexión en LISTEN, atendida desde el event loop, que alimenta su hub.
+    """
+
+    def __init__(self, hub: ChangeHub, channel: str = CHANNEL):
+        self.hub = hub
+        self.channel = channel
+        self.connected = False
+        self.connections = 0
+        self._task = None
+
+    def publish(self, db, user_id: int, event: dict) -> None:
+        # NOTIFY en la transacción de la escritura: PostgreSQL lo entrega con
+        # su commit (y lo descarta si se revierte), sin otra transacción
+        payload = orjson.dumps({**event, "user_id": user_id}).decode()
+        db.execute(select(func.pg_notify(self.channel, payload)))
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"listener_connected": self.connected, "listener_reconnects": max(self.connections - 1, 0)}
+
+    async def _listen(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                connection = await run_in_threadpool(self._connect)
+            except Exception:
+                logger.exception("Change feed listener could not connect")
+                await asyncio.sleep(RECONNECT_SECONDS)
+                continue
+
+            if self.connections:
+                # Los eventos emitidos sin listener se perdieron
+                self.hub.dispatch_all(RESYNC_EVENT)
+            self.connections += 1
+            self.connected = True
+            closed = loop.create_future()
+            loop.add_reader(connection.fileno(), self._on_readable, connection, closed)
+            try:
+                await closed
+            finally:
+                loop.remove_reader(connection.fileno())
+                self.connected = False
+                connection.close()
+            logger.warning("Change feed listener disconnected, reconnecting")
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    def _connect(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+        from app.config.database import DATABASE_URL, connect_args
+
+        # keepalives: detectar una conexión caída aunque no lleguen notificaciones
+        connection = psycopg2.connect(DATABASE_URL, keepalives=1, keepalives_idle=30, **connect_args)
+        connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        return connection
+
+    def _on_readable(self, connection, closed: asyncio.Future) -> None:
+        try:
+            connection.poll()
+        except Exception:
+            logger.exception("Change feed listener connection lost")
+            if not closed.done():
+                closed.set_result(None)
+            return
+        while connection.notifies:
+            notify = connection.notifies.pop(0)
+            try:
+                event = orjson.loads(notify.payload)
+                self.hub.dispatch(event.pop("user_id"), event)
+            except Exception:
+                logger.exception("Invalid change feed payload")
+
+
+class ChangeFeed:
+    """
+    Eventos de cambios por usuario emitidos por las escrituras de ListService,
+    TaskService e ImportService. Cada evento indica el recurso, la acción, los
+    ids afectados y el token de GET /sync de la escritura.
+
+    publish se llama dentro de la transacción de la escritura, antes del
+    commit: el evento se entrega solo si la escritura se confirma. Los
+    clientes que pierden eventos recuperan los cambios con GET /sync.
+    """
+
+    def __init__(self, backend=None, hub: Optional[ChangeHub] = None):
+        self.backend = backend
+        self.hub = hub or ChangeHub()
+        self._lock = Lock()
+        self.published = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def publish(self, db, user_id: int, resource: str, action: str, ids=None, token: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        ids = list(ids) if ids is not None else None
+        event = {
+            "type": f"{resource}.{action}",
+            "ids": ids if ids is not None and len(ids) <= MAX_EVENT_IDS else None,
+            "token": token,
+        }
+        try:
+            self.backend.publish(db, user_id, event)
+        except Exception:
+            # Con NOTIFY la transacción queda abortada: la escritura falla con él
+            logger.exception("Could not publish change event for user %s", user_id)
+            self._count("errors")
+            raise
+        self._count("published")
+
+    def subscribe(self, user_id: int) -> Subscription:
+        """Suscripción de una conexión; se usa con async with para liberarla al cerrar."""
+        return self.hub.subscribe(user_id)
+
+    async def start(self) -> None:
+        if self.enabled:
+            await self.backend.start()
+
+    async def stop(self) -> None:
+        if self.enabled:
+            await self.backend.stop()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {"published": self.published, "errors": self.errors}
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            **self.hub.stats(),
+            **(self.backend.stats() if self.backend else {}),
+            **counters,
+        }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def build_backend(name: str, hub: ChangeHub):
+    if name == "memory":
+        return MemoryChangeFeedBackend(hub)
+    if name == "postgres":
+        return PostgresChangeFeedBackend(hub)
+    return None
+
+
+change_hub = ChangeHub(CHANGE_FEED_QUEUE_SIZE)
+change_feed = ChangeFeed(build_backend(CHANGE_FEED_BACKEND, change_hub), change_hub)
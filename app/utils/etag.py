@@ -0,0 +1,16 @@
+import hashlib
+from typing import Optional
+
+
+def make_etag(*parts) -> str:
+    """Construye un ETag fuerte a partir de la versión de datos y los parámetros de la consulta."""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:24]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evalúa el header If-None-Match (lista de ETags, '*' o ETags débiles W/)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
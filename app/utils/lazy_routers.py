@@ -0,0 +1,65 @@
+from importlib import import_module
+from threading import Lock
+from typing import Optional
+
+# Rutas que necesitan todos los routers registrados (documentación OpenAPI)
+DOCS_PATHS = ("/docs", "/redoc", "/openapi.json")
+
+
+class LazyRouters:
+    """
+    Routers que se importan e incluyen en la aplicación con la primera
+    petición bajo su prefijo, en lugar de al arrancar.
+
+    Cada controlador arrastra sus servicios, repositorios, modelos y schemas;
+    diferir su importación acorta el arranque en frío de Cloud Functions, y
+    una instancia solo carga los routers que efectivamente recibe.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._pending = []
+        self._lock = Lock()
+
+    def add(self, path_prefix: str, module: str, prefix: str = "", **include_options) -> None:
+        """
+        Registra el router `module:router`, que se incluirá con
+        app.include_router(router, prefix=prefix, **include_options) cuando
+        llegue una petición cuya ruta empiece con path_prefix.
+        """
+        self._pending.append((path_prefix, module, prefix, include_options))
+
+    def load(self, path: Optional[str] = None) -> None:
+        """Incluye los routers pendientes que atienden path, o todos si path es None."""
+        if not self._pending:
+            return
+        with self._lock:
+            loaded = [
+                entry for entry in self._pending
+                if path is None or path.startswith(DOCS_PATHS) or _matches(path, entry[0])
+            ]
+            for entry in loaded:
+                path_prefix, module, prefix, include_options = entry
+                router = import_module(module).router
+                self.app.include_router(router, prefix=prefix, **include_options)
+                self._pending.remove(entry)
+            if loaded:
+                # El esquema OpenAPI se generó (si se generó) sin estos routers
+                self.app.openapi_schema = None
+
+
+def _matches(path: str, path_prefix: str) -> bool:
+    return path == path_prefix or path.startswith(path_prefix.rstrip("/") + "/")
+
+
+class LazyRoutersMiddleware:
+    """Middleware ASGI que incluye los routers de LazyRouters antes de enrutar cada petición."""
+
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            self.routers.load(scope["path"])
+        await self.app(scope, receive, send)
@@ -0,0 +1,78 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Tuple
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Codifica la posición (created_at, id) de la última fila de una página
+    como un cursor opaco para el cliente.
+    """
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_position_cursor(position: str, row_id: int) -> str:
+    """Cursor de la posición (position, id) de la última fila, para el orden manual de las tareas."""
+    payload = json.dumps({"position": position, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_position_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(payload["position"]), int(payload["id"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Cursor opaco para resultados ordenados por relevancia, sin una clave keyset estable."""
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode().rstrip("=")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded.encode()))["offset"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
+
+def paginate(rows: list, limit: Optional[int], order_key: str, id_key: str, encode=encode_cursor) -> Page:
+    """
+    Recorta las filas obtenidas con limit + 1 y calcula el cursor de la
+    siguiente página cuando quedan más filas.
+    """
+    if not limit or len(rows) <= limit:
+        return Page(rows)
+    rows = rows[:limit]
+    last = rows[-1]
+    return Page(rows, encode(_value(last, order_key), _value(last, id_key)))
+
+
+def _value(row: Any, key: str):
+    return row[key] if isinstance(row, dict) else getattr(row, key)
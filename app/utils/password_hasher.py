@@ -0,0 +1,78 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from app.config.settings import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+
+
+class PasswordHasher:
+    """
+    Ejecuta bcrypt en un pool de threads de tamaño fijo, fuera del event loop.
+
+    Si ya hay max_pending operaciones en curso o en cola, la petición se
+    rechaza de inmediato con un 503 en lugar de acumular latencia.
+    """
+
+    def __init__(self, rounds: int, max_workers: int, max_pending: int):
+        self.rounds = rounds
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        self._lock = Lock()
+        self.pending = 0
+        self.rejected = 0
+        self._context = None
+
+    @property
+    def context(self):
+        # passlib y bcrypt se importan con el primer registro o login y no al
+        # arrancar, ya que el resto de las rutas no los necesita
+        if self._context is None:
+            from passlib.context import CryptContext
+
+            # min_rounds = max_rounds = rounds: cualquier hash con otro costo se marca para actualizar
+            self._context = CryptContext(
+                schemes=["bcrypt"],
+                deprecated="auto",
+                bcrypt__default_rounds=self.rounds,
+                bcrypt__min_rounds=self.rounds,
+                bcrypt__max_rounds=self.rounds
+            )
+        return self._context
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifica la contraseña. Si es válida pero el hash usa un costo distinto
+        al configurado, retorna también el nuevo hash a guardar.
+        """
+        return await self._submit(self.context.verify_and_update, password, password_hash)
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Server busy, please retry",
+                    headers={"Retry-After": "1"}
+                )
+            self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "rejected": self.rejected,
+            }
+
+
+password_hasher = PasswordHasher(BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
@@ -0,0 +1,130 @@
+from threading import Lock
+from time import perf_counter
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Contadores de uso de un pool de conexiones: conexiones prestadas,
+    tiempo de espera para obtener una conexión y errores de conexión.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checked_out = 0
+        self.checkouts = 0
+        self.connects = 0
+        self.connect_errors = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            data = {
+                "pool_class": type(pool).__name__,
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "connect_errors": self.connect_errors,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "wait_avg_ms": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+        # Solo los pools con cola (QueuePool) reportan tamaño y overflow
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+class InstrumentedPoolMixin:
+    """Mide el tiempo que tarda cada checkout y cuenta timeouts y errores de conexión."""
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        start = perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.increment("timeouts")
+            raise
+        except Exception:
+            self.metrics.increment("connect_errors")
+            raise
+        self.metrics.record_wait(perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() recrea el pool; los contadores se conservan
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(InstrumentedPoolMixin, NullPool):
+    pass
+
+
+# Engines instrumentados, por nombre ("primary", "primary_async", ...)
+engine_registry = {}
+
+
+def instrument_engine(name: str, engine) -> PoolMetrics:
+    """
+    Registra el engine (síncrono; para AsyncEngine usar .sync_engine) y
+    suscribe los eventos del pool que alimentan sus métricas.
+    """
+    pool = engine.pool
+    metrics = PoolMetrics()
+    pool.metrics = metrics
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.increment("connects")
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment("checkouts")
+        metrics.increment("checked_out")
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.increment("checked_out", -1)
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment("invalidations")
+
+    engine_registry[name] = engine
+    return metrics
+
+
+def pool_stats() -> dict:
+    return {name: engine.pool.metrics.snapshot(engine.pool) for name, engine in engine_registry.items()}
@@ -0,0 +1,165 @@
+"""
+Claves de orden fraccionarias para Task.position.
+
+Cada clave es un texto que se compara byte a byte (COLLATE "C" en
+PostgreSQL): una parte entera de largo variable, cuyo primer carácter indica
+su largo ("a0".."az", "b00"..), seguida opcionalmente de una parte
+fraccionaria. Siempre existe una clave entre dos claves distintas, por lo que
+mover una tarea reescribe una sola fila; agregar al final incrementa la parte
+entera y el largo de las claves crece de forma logarítmica.
+"""
+from typing import List, Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+ZERO = DIGITS[0]
+# Parte entera más pequeña posible: no admite claves menores sin parte fraccionaria
+SMALLEST_INTEGER = "A" + ZERO * 26
+# Largo de la columna Task.position
+MAX_POSITION_LENGTH = 255
+# Las listas con claves más largas se rebalancean en segundo plano; el índice
+# parcial idx_tasks_long_position las encuentra sin recorrer la tabla
+REBALANCE_POSITION_LENGTH = 32
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """
+    Clave estrictamente entre a y b. None representa el inicio (a) o el
+    final (b) de la lista; a debe ser menor que b.
+    """
+    if a is not None:
+        _validate_key(a)
+    if b is not None:
+        _validate_key(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"{a!r} is not less than {b!r}")
+
+    if a is None:
+        if b is None:
+            return "a" + ZERO
+        integer_b = _integer_part(b)
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + _midpoint("", b[len(integer_b):])
+        if integer_b < b:
+            return integer_b
+        decremented = _decrement_integer(integer_b)
+        if decremented is None:
+            raise ValueError("cannot decrement any more")
+        return decremented
+
+    integer_a = _integer_part(a)
+    fraction_a = a[len(integer_a):]
+    if b is None:
+        incremented = _increment_integer(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if incremented is None else incremented
+
+    integer_b = _integer_part(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, b[len(integer_b):])
+    incremented = _increment_integer(integer_a)
+    if incremented is None:
+        raise ValueError("cannot increment any more")
+    if incremented < b:
+        return incremented
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def keys_between(a: Optional[str], b: Optional[str], count: int) -> List[str]:
+    """count claves ordenadas entre a y b, repartidas para que sean lo más cortas posible."""
+    if count <= 0:
+        return []
+    if count == 1:
+        return [key_between(a, b)]
+    if b is None:
+        keys = [key_between(a, None)]
+        for _ in range(count - 1):
+            keys.append(key_between(keys[-1], None))
+        return keys
+    if a is None:
+        keys = [key_between(None, b)]
+        for _ in range(count - 1):
+            keys.append(key_between(None, keys[-1]))
+        return keys[::-1]
+    middle = count // 2
+    key = key_between(a, b)
+    return keys_between(a, key, middle) + [key] + keys_between(key, b, count - middle - 1)
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    # a y b son partes fraccionarias (sin ceros finales); b None es el final
+    if b is not None:
+        common = 0
+        while common < len(b) and (a[common] if common < len(a) else ZERO) == b[common]:
+            common += 1
+        if common > 0:
+            return b[:common] + _midpoint(a[common:], b[common:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"invalid position head: {head!r}")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"invalid position: {key!r}")
+    return key[:length]
+
+
+def _validate_key(key: str) -> None:
+    if not key or key == SMALLEST_INTEGER:
+        raise ValueError(f"invalid position: {key!r}")
+    if key[len(_integer_part(key)):].endswith(ZERO):
+        raise ValueError(f"invalid position: {key!r}")
+
+
+def _increment_integer(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for index in range(len(digits) - 1, -1, -1):
+        value = DIGITS.index(digits[index]) + 1
+        if value < len(DIGITS):
+            digits[index] = DIGITS[value]
+            return head + "".join(digits)
+        digits[index] = ZERO
+    # Acarreo en todos los dígitos: la parte entera gana un dígito
+    if head == "Z":
+        return "a" + ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(ZERO)
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for index in range(len(digits) - 1, -1, -1):
+        value = DIGITS.index(digits[index]) - 1
+        if value >= 0:
+            digits[index] = DIGITS[value]
+            return head + "".join(digits)
+        digits[index] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
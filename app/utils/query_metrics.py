@@ -0,0 +1,206 @@
+import logging
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+from typing import Optional
+from app.config.settings import QUERY_METRICS_ENABLED, SLOW_QUERY_THRESHOLD_MS
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores de los histogramas (el último bucket es +Inf)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+STATEMENT_PREVIEW_LENGTH = 200
+
+
+class RequestQueries:
+    """Consultas ejecutadas durante una petición."""
+
+    __slots__ = ("scope", "count", "total", "slowest", "slowest_statement")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+
+    @property
+    def route(self) -> str:
+        # Plantilla de la ruta resuelta por el router, para no crear una serie por cada id
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {route.path if route else '<unmatched>'}"
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds >= self.slowest:
+            self.slowest = seconds
+            self.slowest_statement = statement
+
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            f'db;desc="{self.count} queries";dur={self.total * 1000:.2f}, '
+            f'db-slowest;dur={self.slowest * 1000:.2f}, '
+            f'total;dur={total_seconds * 1000:.2f}'
+        )
+
+
+# La petición en curso; run_in_threadpool y run_sync copian el contexto, por lo
+# que las consultas hechas en otros threads se registran en el mismo objeto
+current_request: ContextVar[Optional[RequestQueries]] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        # Conteos acumulados por límite superior, como en Prometheus
+        cumulative, buckets = 0, {}
+        for bound, count in zip([*self.buckets, "+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"buckets": buckets, "sum": round(self.sum, 3)}
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.query_count = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time_ms = Histogram(DB_TIME_BUCKETS_MS)
+        self.slowest_ms = 0.0
+        self.slowest_statement = None
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "queries_avg": round(self.queries / self.requests, 2) if self.requests else 0.0,
+            "query_count": self.query_count.snapshot(),
+            "db_time_ms": self.db_time_ms.snapshot(),
+            "slowest_ms": round(self.slowest_ms, 3),
+            "slowest_statement": self.slowest_statement,
+        }
+
+
+class QueryMetrics:
+    """
+    Agrega por ruta ("GET /tasks/{task_id}") la cantidad de consultas, el
+    tiempo total en la base de datos y la consulta más lenta de cada petición.
+    """
+
+    def __init__(self, slow_query_threshold_ms: float):
+        self.slow_query_threshold = slow_query_threshold_ms / 1000
+        self._routes = {}
+        self._lock = Lock()
+        self.slow_queries = 0
+
+    def record_request(self, queries: RequestQueries) -> None:
+        with self._lock:
+            stats = self._routes.get(queries.route)
+            if stats is None:
+                stats = self._routes[queries.route] = RouteStats()
+            stats.requests += 1
+            stats.queries += queries.count
+            stats.query_count.observe(queries.count)
+            stats.db_time_ms.observe(queries.total * 1000)
+            if queries.slowest * 1000 > stats.slowest_ms:
+                stats.slowest_ms = queries.slowest * 1000
+                stats.slowest_statement = _preview(queries.slowest_statement)
+
+    def record_statement(self, statement: str, seconds: float) -> None:
+        queries = current_request.get()
+        if queries is not None:
+            queries.record(statement, seconds)
+        if seconds >= self.slow_query_threshold:
+            with self._lock:
+                self.slow_queries += 1
+            logger.warning(
+                "Slow query (%.1f ms) on %s: %s",
+                seconds * 1000, queries.route if queries else "-", _preview(statement)
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "slow_query_threshold_ms": self.slow_query_threshold * 1000,
+                "slow_queries": self.slow_queries,
+                "routes": {route: stats.snapshot() for route, stats in sorted(self._routes.items())},
+            }
+
+
+def _preview(statement: Optional[str]) -> Optional[str]:
+    if statement is None:
+        return None
+    statement = " ".join(statement.split())
+    return statement[:STATEMENT_PREVIEW_LENGTH]
+
+
+def instrument_queries(engine) -> None:
+    """
+    Mide cada sentencia ejecutada por el engine (síncrono; para AsyncEngine
+    usar .sync_engine) y la atribuye a la petición en curso.
+    """
+    # Import local: main_function importa este módulo al arrancar (middleware),
+    # y SQLAlchemy no debe cargarse hasta que app.config.database se importe
+    # con la primera petición que usa la base de datos
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        query_metrics.record_statement(statement, perf_counter() - conn.info["query_start"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # La sentencia falló: after_cursor_execute no se ejecuta
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+
+class QueryMetricsMiddleware:
+    """
+    Middleware ASGI que abre un contador de consultas por petición, agrega
+    el header Server-Timing y registra el resultado en query_metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not QUERY_METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(scope)
+        token = current_request.set(queries)
+        start = perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", queries.server_timing(perf_counter() - start).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            query_metrics.record_request(queries)
+
+
+query_metrics = QueryMetrics(SLOW_QUERY_THRESHOLD_MS)
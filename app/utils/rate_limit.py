@@ -0,0 +1,279 @@
+import hashlib
+import logging
+from math import ceil
+from threading import Lock
+from time import monotonic, time
+from typing import NamedTuple, Optional
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import HTTPConnection
+from app.utils.api_keys import split_api_key
+from app.config.settings import (
+    AUTH_RATE_LIMIT_BURST, AUTH_RATE_LIMIT_PER_SECOND, RATE_LIMIT_BACKEND,
+    RATE_LIMIT_BURST, RATE_LIMIT_PER_SECOND, RATE_LIMIT_TRUST_FORWARDED,
+    RATE_LIMIT_USAGE_TTL_SECONDS, REDIS_URL
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    # Segundos hasta que haya un token disponible (0 si la petición fue aceptada)
+    retry_after: float
+
+
+def _refill(tokens: float, elapsed: float, rate: float, burst: int) -> float:
+    return min(burst, tokens + max(elapsed, 0) * rate)
+
+
+def _result(tokens: float, allowed: bool, rate: float) -> RateLimitResult:
+    return RateLimitResult(allowed, int(tokens), 0.0 if allowed else (1 - tokens) / rate)
+
+
+class MemoryRateLimitBackend:
+    """
+    Token buckets y contadores de uso en memoria del proceso. Con varios
+    workers cada uno aplica el límite por separado.
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._buckets = {}
+        self._usage = {}
+        self._lock = Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> RateLimitResult:
+        now = monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (burst, now))
+            tokens = _refill(tokens, now - updated_at, rate, burst)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            # Reinsertar al final: el diccionario queda ordenado por último uso
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_entries:
+                del self._buckets[next(iter(self._buckets))]
+        return _result(tokens, allowed, rate)
+
+    def record_usage(self, key_id: str, user_id: Optional[int], limited: bool) -> None:
+        with self._lock:
+            usage = self._usage.get(key_id)
+            if usage is None:
+                if len(self._usage) >= self.max_entries:
+                    return
+                usage = self._usage[key_id] = {"user_id": None, "requests": 0, "limited": 0}
+            usage["requests"] += 1
+            usage["limited"] += limited
+            if user_id is not None:
+                usage["user_id"] = user_id
+
+    def usage(self) -> dict:
+        with self._lock:
+            return {key_id: dict(usage) for key_id, usage in self._usage.items()}
+
+
+# Token bucket atómico en el servidor: lee, repone, consume y guarda en una
+# sola operación. Los tokens se retornan como texto para no truncarlos a entero
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(now - updated_at, 0) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    Token buckets y contadores de uso compartidos por todos los workers en un
+    servidor compatible con Redis (con soporte de scripts Lua). Los contadores
+    de uso expiran tras usage_ttl_seconds sin peticiones.
+    """
+
+    blocking = True
+
+    def __init__(self, url: Optional[str] = None, client=None, usage_ttl_seconds: int = 86400):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.client = client
+        self.usage_ttl_seconds = usage_ttl_seconds
+        self._take = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def take(self, key: str, rate: float, burst: int) -> RateLimitResult:
+        allowed, tokens = self._take(keys=[f"todo:ratelimit:{key}"], args=[rate, burst, time()])
+        return _result(float(tokens), bool(allowed), rate)
+
+    def record_usage(self, key_id: str, user_id: Optional[int], limited: bool) -> None:
+        key = f"todo:usage:{key_id}"
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.hincrby(key, "requests", 1)
+        if limited:
+            pipeline.hincrby(key, "limited", 1)
+        if user_id is not None:
+            pipeline.hset(key, "user_id", user_id)
+        pipeline.expire(key, self.usage_ttl_seconds)
+        pipeline.execute()
+
+    def usage(self) -> dict:
+        keys = [
+            key.decode() if isinstance(key, bytes) else key
+            for key in self.client.scan_iter(match="todo:usage:*", count=1000)
+        ]
+        # Un solo viaje de ida y vuelta para leer todos los contadores
+        pipeline = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.hgetall(key)
+
+        usage = {}
+        for key, values in zip(keys, pipeline.execute() if keys else []):
+            if not values:
+                # Expiró entre SCAN y HGETALL
+                continue
+            values = {
+                (field.decode() if isinstance(field, bytes) else field): int(value)
+                for field, value in values.items()
+            }
+            usage[key[len("todo:usage:"):]] = {
+                "user_id": values.get("user_id"),
+                "requests": values.get("requests", 0),
+                "limited": values.get("limited", 0),
+            }
+        return usage
+
+
+class RateLimiter:
+    """
+    Limita las peticiones por clave con un token bucket: se admiten ráfagas de
+    hasta burst peticiones y luego rate peticiones por segundo. Al superar el
+    límite se responde 429 con el header Retry-After.
+
+    Si el backend compartido no responde, la petición se admite (fail open):
+    el límite protege la base de datos y no debe convertirse en una caída.
+    """
+
+    def __init__(self, backend, scope: str, rate: float, burst: int):
+        self.backend = backend
+        self.scope = scope
+        self.rate = rate
+        self.burst = burst
+        self._lock = Lock()
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.rate > 0 and self.burst > 0
+
+    async def check(self, key: str, user_id: Optional[int] = None) -> None:
+        """Consume un token de key o lanza un 429; registra el uso de la clave."""
+        if not self.enabled:
+            return
+        if self.backend.blocking:
+            # El cliente de Redis es síncrono: no bloquear el event loop
+            result = await run_in_threadpool(self._take, key, user_id)
+        else:
+            result = self._take(key, user_id)
+        if result is not None and not result.allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(max(ceil(result.retry_after), 1))}
+            )
+
+    def _take(self, key: str, user_id: Optional[int]) -> Optional[RateLimitResult]:
+        try:
+            result = self.backend.take(f"{self.scope}:{key}", self.rate, self.burst)
+            self.backend.record_usage(f"{self.scope}:{key}", user_id, not result.allowed)
+        except Exception:
+            logger.exception("Rate limit backend unavailable")
+            self._count("errors")
+            return None
+        self._count("allowed" if result.allowed else "limited")
+        return result
+
+    async def usage(self) -> dict:
+        """Contadores por clave de este limitador: peticiones, rechazos (429) y usuario."""
+        if not self.enabled:
+            return {}
+        if self.backend.blocking:
+            usage = await run_in_threadpool(self.backend.usage)
+        else:
+            usage = self.backend.usage()
+        prefix = f"{self.scope}:"
+        return {
+            key_id[len(prefix):]: values
+            for key_id, values in usage.items()
+            if key_id.startswith(prefix)
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "allowed": self.allowed,
+                "limited": self.limited,
+                "errors": self.errors,
+            }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def api_key_id(api_key: str) -> str:
+    """
+    Identificador de una API key ya verificada para buckets y contadores: su
+    prefijo público ("<prefijo>.<secreto>"), o un hash truncado si la key no
+    tiene ese formato.
+    """
+    parts = split_api_key(api_key)
+    if parts:
+        return parts[0]
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def client_ip(request: HTTPConnection) -> str:
+    # Detrás de un proxy de confianza (Cloud Functions, load balancer) la IP
+    # real es la primera de X-Forwarded-For
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def limit_auth_requests(request: Request) -> None:
+    """Dependencia de /auth/login y /auth/register: límite por IP del cliente."""
+    await auth_rate_limiter.check(client_ip(request))
+
+
+def build_backend(name: str):
+    if name == "memory":
+        return MemoryRateLimitBackend()
+    if name == "redis":
+        return RedisRateLimitBackend(REDIS_URL, usage_ttl_seconds=RATE_LIMIT_USAGE_TTL_SECONDS)
+    return None
+
+
+rate_limit_backend = build_backend(RATE_LIMIT_BACKEND)
+api_key_rate_limiter = RateLimiter(rate_limit_backend, "key", RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+auth_rate_limiter = RateLimiter(rate_limit_backend, "ip", AUTH_RATE_LIMIT_PER_SECOND, AUTH_RATE_LIMIT_BURST)
@@ -0,0 +1,166 @@
+import logging
+from itertools import count
+from threading import Lock
+from time import monotonic
+from typing import Iterable, List, Optional
+from starlette.concurrency import run_in_threadpool
+from app.config.settings import (
+    CACHE_BACKEND, DB_REPLICA_CHECK_SECONDS, DB_REPLICA_MAX_LAG_SECONDS, DB_REPLICA_RETRY_SECONDS,
+    DB_REPLICA_URLS, READ_YOUR_WRITES_SECONDS
+)
+from app.utils.cache import MemoryCacheBackend, build_backend, call_backend
+
+logger = logging.getLogger(__name__)
+
+# Retraso de una réplica en segundos: 0 si ya aplicó todo lo recibido del
+# primario (un primario sin escrituras no cuenta como retraso)
+REPLICA_LAG_QUERY = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaState:
+    """Estado de una réplica visto por este worker."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lag: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.unavailable_until = 0.0
+        self.sessions = 0
+        self.failures = 0
+        self.lagging = 0
+
+
+class ReplicaRouter:
+    """
+    Elige la réplica de cada sesión de lectura (round robin entre las
+    disponibles). El retraso de una réplica se mide, como mucho, cada
+    check_seconds en la propia sesión que se le asigna; una réplica que
+    supera max_lag_seconds o que falla queda fuera durante retry_seconds y
+    sus lecturas van a las demás réplicas o al primario.
+    """
+
+    def __init__(self, names: List[str], max_lag_seconds: float = 5, check_seconds: float = 10, retry_seconds: float = 30):
+        self.replicas = [ReplicaState(name) for name in names]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.retry_seconds = retry_seconds
+        self._next = count()
+        self._lock = Lock()
+        self.primary_fallbacks = 0
+
+    def candidates(self) -> List[int]:
+        """Índices de las réplicas disponibles, empezando por la siguiente del round robin."""
+        if not self.replicas:
+            return []
+        now = monotonic()
+        total = len(self.replicas)
+        start = next(self._next) % total
+        indexes = [(start + offset) % total for offset in range(total)]
+        return [index for index in indexes if self.replicas[index].unavailable_until <= now]
+
+    def check_due(self, index: int) -> bool:
+        checked_at = self.replicas[index].checked_at
+        return checked_at is None or monotonic() - checked_at >= self.check_seconds
+
+    def record_lag(self, index: int, lag: float) -> bool:
+        """Registra el retraso medido; retorna False (y aparta la réplica) si es excesivo."""
+        replica = self.replicas[index]
+        now = monotonic()
+        with self._lock:
+            replica.lag = lag
+            replica.checked_at = now
+            if lag <= self.max_lag_seconds:
+                return True
+            replica.lagging += 1
+            replica.unavailable_until = now + self.retry_seconds
+            return False
+
+    def record_session(self, index: int) -> None:
+        with self._lock:
+            self.replicas[index].sessions += 1
+
+    def record_failure(self, index: int) -> None:
+        replica = self.replicas[index]
+        with self._lock:
+            replica.failures += 1
+            replica.checked_at = None
+            replica.unavailable_until = monotonic() + self.retry_seconds
+
+    def record_primary_fallback(self) -> None:
+        with self._lock:
+            self.primary_fallbacks += 1
+
+    def stats(self) -> dict:
+        now = monotonic()
+        with self._lock:
+            return {
+                "replicas": {
+                    replica.name: {
+                        "available": replica.unavailable_until <= now,
+                        "lag_seconds": replica.lag,
+                        "sessions": replica.sessions,
+                        "failures": replica.failures,
+                        "lagging": replica.lagging,
+                    }
+                    for replica in self.replicas
+                },
+                "primary_fallbacks": self.primary_fallbacks,
+            }
+
+
+class RecentWrites:
+    """
+    Usuarios con escrituras confirmadas en los últimos ttl_seconds: sus
+    lecturas van al primario para que vean sus propios cambios aunque las
+    réplicas aún no los hayan aplicado.
+
+    Usa los mismos backends que la caché de lecturas; con redis la ventana se
+    respeta aunque la lectura llegue a otro worker. Si el backend no responde
+    nunca falla la petición: la escritura ya confirmada se conserva y la
+    lectura se envía al primario.
+    """
+
+    def __init__(self, backend, ttl_seconds: float = 5):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = Lock()
+        self.errors = 0
+
+    def mark(self, user_ids: Iterable[int]) -> None:
+        # Se ejecuta en after_commit, también dentro de run_sync (DB_ASYNC)
+        try:
+            for user_id in user_ids:
+                call_backend(self.backend, "set", self._key(user_id), "1", self.ttl_seconds)
+        except Exception:
+            logger.exception("Could not record recent writes")
+            self._count_error()
+
+    async def contains(self, user_id: int) -> bool:
+        try:
+            if self.backend.blocking:
+                # El cliente de Redis es síncrono: no bloquear el event loop
+                value = await run_in_threadpool(self.backend.get, self._key(user_id))
+            else:
+                value = self.backend.get(self._key(user_id))
+        except Exception:
+            logger.exception("Could not check recent writes, reading from the primary")
+            self._count_error()
+            return True
+        return value is not None
+
+    def _count_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def _key(self, user_id: int) -> str:
+        return f"recent_write:{user_id}"
+
+
+replica_router = ReplicaRouter(
+    [f"replica_{index + 1}" for index in range(len(DB_REPLICA_URLS))],
+    DB_REPLICA_MAX_LAG_SECONDS, DB_REPLICA_CHECK_SECONDS, DB_REPLICA_RETRY_SECONDS
+)
+recent_writes = RecentWrites(build_backend(CACHE_BACKEND) or MemoryCacheBackend(), READ_YOUR_WRITES_SECONDS)
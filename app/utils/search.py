@@ -0,0 +1,49 @@
+import re
+from typing import List
+
+# Palabras consideradas por búsqueda; el resto se ignora
+MAX_SEARCH_TERMS = 10
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Separa el texto en palabras en minúsculas, como la configuración 'simple' de PostgreSQL."""
+    return WORD_PATTERN.findall(text.lower()) if text else []
+
+
+def search_terms(query: str) -> List[str]:
+    """Palabras únicas de la búsqueda, en orden; cada una se compara también como prefijo."""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_SEARCH_TERMS]
+
+
+def rank_rows(rows: list, terms: List[str], query: str) -> list:
+    """
+    Búsqueda en memoria, usada cuando la base de datos no es PostgreSQL
+    (SQLite en pruebas locales).
+
+    Retorna las filas que contienen todas las palabras (completas o como
+    prefijo) en task_name o description, con su "rank": las coincidencias en
+    el nombre pesan el doble y los nombres que empiezan con la búsqueda suman
+    un punto, como la similitud por trigramas. Ordenadas por rank y task_id.
+    """
+    prefix = query.strip().lower()
+    ranked = []
+    for row in rows:
+        name_tokens = tokenize(row["task_name"])
+        description_tokens = tokenize(row["description"])
+        rank = 0.0
+        for term in terms:
+            score = 2 * _matches(name_tokens, term) + _matches(description_tokens, term)
+            if not score:
+                break
+            rank += score
+        else:
+            if prefix and row["task_name"].lower().startswith(prefix):
+                rank += 1
+            ranked.append({**row, "rank": round(rank / (len(name_tokens) + len(description_tokens) + 1), 4)})
+    ranked.sort(key=lambda row: (-row["rank"], row["task_id"]))
+    return ranked
+
+
+def _matches(tokens: List[str], term: str) -> int:
+    return sum(1 for token in tokens if token.startswith(term))
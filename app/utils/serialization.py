@@ -0,0 +1,31 @@
+from typing import List, Optional
+import orjson
+from fastapi import Response
+from pydantic import TypeAdapter
+from app.config.settings import RESPONSE_SERIALIZATION
+from app.models.schemas import ListResponse, ListSummaryResponse, SyncResponse, TaskResponse, TaskSearchResult
+
+# Adaptadores compilados una sola vez al importar el módulo
+list_adapter = TypeAdapter(ListResponse)
+lists_adapter = TypeAdapter(List[ListResponse])
+list_summaries_adapter = TypeAdapter(List[ListSummaryResponse])
+task_adapter = TypeAdapter(TaskResponse)
+tasks_adapter = TypeAdapter(List[TaskResponse])
+search_results_adapter = TypeAdapter(List[TaskSearchResult])
+sync_adapter = TypeAdapter(SyncResponse)
+
+
+def json_response(adapter: TypeAdapter, content, headers: Optional[dict] = None) -> Response:
+    """
+    Serializa filas (dicts obtenidos con consultas de columnas) directamente a JSON.
+
+    Al retornar un Response, FastAPI omite la conversión y re-validación del
+    response_model de la ruta, que se mantiene solo para el esquema OpenAPI.
+    Con RESPONSE_SERIALIZATION=pydantic las filas se validan con el adaptador
+    antes de serializarse.
+    """
+    if RESPONSE_SERIALIZATION == "pydantic":
+        body = adapter.dump_json(adapter.validate_python(content))
+    else:
+        body = orjson.dumps(content)
+    return Response(content=body, media_type="application/json", headers=headers)
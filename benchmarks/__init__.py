@@ -0,0 +1 @@
+# Este archivo puede estar vacío, solo es necesario para que Python reconozca el directorio como un paquete
@@ -0,0 +1,397 @@
+"""
+Benchmark de carga de la API completa, en proceso (ASGI) y sin servidor.
+
+Crea una base de datos con N usuarios x M listas x K tareas (SQLite en un
+directorio temporal por defecto, o la URL indicada con --database-url, que
+debe apuntar a una base vacía: las tablas se recrean), recorre todos los
+routers de main.py y reporta por endpoint el throughput, la latencia
+p50/p95/p99 y las consultas SQL por petición.
+
+Con --baseline los resultados se comparan contra un archivo guardado y el
+proceso termina con código 1 si algún endpoint realiza más consultas por
+petición o responde con errores. Una p50 que supera la del baseline más la
+tolerancia (y al menos --min-delta-ms) se reporta como aviso; con
+--fail-on-latency también hace fallar el proceso. --save-baseline guarda los
+resultados como nuevo baseline.
+
+Uso:
+    python -m benchmarks.bench_api
+    python -m benchmarks.bench_api --users 20 --lists 10 --tasks 500 --requests 500
+    python -m benchmarks.bench_api --baseline benchmarks/baseline.json
+    python -m benchmarks.bench_api --save-baseline benchmarks/baseline.json
+"""
+import os
+
+# Valores por defecto para importar la aplicación sin un .env; bcrypt con el
+# costo mínimo para que login y registro midan la API y no el hashing, y API
+# keys que no expiran de la caché durante la corrida (consultas deterministas);
+# sin límite de peticiones, que rechazaría la carga con 429, y sin tope de keys
+# activas, para que los logins medidos no revoquen las keys del seed; con un
+# token de operador para medir /metrics
+for name, value in {
+    "DB_HOST": "localhost", "DB_PORT": "5432", "DB_DATABASE": "benchmark",
+    "DB_USER": "benchmark", "DB_PASSWORD": "benchmark", "DB_ASYNC": "false",
+    "BCRYPT_ROUNDS": "4", "AUTH_CACHE_TTL_SECONDS": "3600", "RATE_LIMIT_BACKEND": "none",
+    "API_KEY_MAX_ACTIVE": "1000000", "METRICS_TOKEN": "benchmark",
+}.items():
+    os.environ.setdefault(name, value)
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from time import perf_counter
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import httpx
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.config import database
+from app.utils.auth_cache import api_key_cache
+from app.utils.pool_metrics import instrument_engine
+from app.utils.query_metrics import instrument_queries
+from benchmarks.seed import PASSWORD, seed
+
+# Tareas de cada lista eliminada en DELETE /lists/{list_id}
+SPARE_LIST_TASKS = 500
+
+
+class Scenario(NamedTuple):
+    """
+    Un endpoint a medir. build(ctx, i) retorna (método, url, kwargs de httpx)
+    para la petición i; prepare(client, ctx, count) se ejecuta antes de medir.
+    """
+    name: str
+    build: Callable
+    expected_status: int = 200
+    prepare: Optional[Callable] = None
+
+
+class Context:
+    def __init__(self, users: list):
+        self.users = users
+        self.etags = {}
+        self.sync_tokens = {}
+        self.spare_lists = {}
+        self.login_emails = []
+
+    def user(self, i: int):
+        return self.users[i % len(self.users)]
+
+    def headers(self, i: int, **extra) -> dict:
+        return {"X-API-Key": self.user(i).api_key, **extra}
+
+    def take_tasks(self, i: int, count: int = 1) -> list:
+        # Las tareas eliminadas se toman del final para no afectar otras mediciones
+        task_ids = self.user(i).task_ids
+        taken = task_ids[-count:]
+        del task_ids[-count:]
+        return taken
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+async def prepare_etags(client: httpx.AsyncClient, ctx: Context, count: int) -> None:
+    for index in range(len(ctx.users)):
+        response = await client.get("/tasks/", headers=ctx.headers(index))
+        ctx.etags[index] = response.headers["ETag"]
+
+
+async def prepare_sync_tokens(client: httpx.AsyncClient, ctx: Context, count: int) -> None:
+    for index in range(len(ctx.users)):
+        response = await client.get("/sync/", headers=ctx.headers(index))
+        ctx.sync_tokens[index] = response.json()["token"]
+
+
+async def prepare_login_users(client: httpx.AsyncClient, ctx: Context, count: int) -> None:
+    # Usuarios propios del escenario: cada login invalida las API keys cacheadas
+    # de su usuario, lo que agregaría consultas a los escenarios siguientes
+    for index in range(len(ctx.users)):
+        email = f"login_user_{index}@benchmark.dev"
+        await client.post("/auth/register", json={"username": f"login_user_{index}", "email": email, "password": PASSWORD})
+        ctx.login_emails.append(email)
+
+
+async def prepare_spare_lists(client: httpx.AsyncClient, ctx: Context, count: int) -> None:
+    # Cada lista tiene SPARE_LIST_TASKS tareas: el costo de eliminarla no debe depender de ellas
+    for index in range(count):
+        response = await client.post("/lists/", json={"list_name": f"Spare {index}"}, headers=ctx.headers(index))
+        list_id = ctx.spare_lists[index] = response.json()["list_id"]
+        tasks = [{"list_id": list_id, "task_name": f"Spare task {n}"} for n in range(SPARE_LIST_TASKS)]
+        await client.post("/tasks/bulk", json={"tasks": tasks}, headers=ctx.headers(index))
+
+
+def bulk_tasks(ctx: Context, i: int) -> list:
+    list_ids = ctx.user(i).list_ids
+    return [{"list_id": list_ids[n % len(list_ids)], "task_name": f"Bulk {i}.{n}"} for n in range(50)]
+
+
+def import_body(ctx: Context, i: int) -> str:
+    list_id = ctx.user(i).list_ids[0]
+    return "".join(f'{{"list_id": {list_id}, "task_name": "Imported {i}.{n}"}}\n' for n in range(1000))
+
+
+def bulk_task_ids(ctx: Context, i: int) -> list:
+    task_ids = ctx.user(i).task_ids
+    start = (i * 50) % max(len(task_ids) - 50, 1)
+    return task_ids[start:start + 50]
+
+
+SCENARIOS = [
+    Scenario("GET /", lambda ctx, i: ("GET", "/", {})),
+    Scenario("GET /metrics/", lambda ctx, i: ("GET", "/metrics/", {"headers": {"X-Metrics-Token": os.environ["METRICS_TOKEN"]}})),
+    Scenario("GET /lists/", lambda ctx, i: ("GET", "/lists/", {"headers": ctx.headers(i)})),
+    Scenario("GET /lists/?summary=true", lambda ctx, i: ("GET", "/lists/?summary=true", {"headers": ctx.headers(i)})),
+    Scenario("GET /lists/{list_id}", lambda ctx, i: (
+        "GET", f"/lists/{ctx.user(i).list_ids[i % len(ctx.user(i).list_ids)]}", {"headers": ctx.headers(i)}
+    )),
+    Scenario("GET /tasks/", lambda ctx, i: ("GET", "/tasks/", {"headers": ctx.headers(i)})),
+    Scenario("GET /tasks/?limit=100", lambda ctx, i: ("GET", "/tasks/?limit=100", {"headers": ctx.headers(i)})),
+    Scenario("GET /tasks/?list_id&is_completed", lambda ctx, i: (
+        "GET", f"/tasks/?list_id={ctx.user(i).list_ids[0]}&is_completed=false", {"headers": ctx.headers(i)}
+    )),
+    Scenario("GET /tasks/?list_id&order=position", lambda ctx, i: (
+        "GET", f"/tasks/?list_id={ctx.user(i).list_ids[0]}&order=position&limit=100", {"headers": ctx.headers(i)}
+    )),
+    Scenario("GET /tasks/ (If-None-Match)", lambda ctx, i: (
+        "GET", "/tasks/", {"headers": ctx.headers(i, **{"If-None-Match": ctx.etags[i % len(ctx.users)]})}
+    ), expected_status=304, prepare=prepare_etags),
+    Scenario("GET /tasks/{task_id}", lambda ctx, i: (
+        "GET", f"/tasks/{ctx.user(i).task_ids[i % len(ctx.user(i).task_ids)]}", {"headers": ctx.headers(i)}
+    )),
+    Scenario("GET /sync/", lambda ctx, i: ("GET", "/sync/", {"headers": ctx.headers(i)})),
+    Scenario("GET /sync/?since", lambda ctx, i: (
+        "GET", f"/sync/?since={ctx.sync_tokens[i % len(ctx.users)]}", {"headers": ctx.headers(i)}
+    ), prepare=prepare_sync_tokens),
+    Scenario("GET /export/tasks", lambda ctx, i: ("GET", "/export/tasks", {"headers": ctx.headers(i)})),
+    Scenario("GET /export/tasks?format=csv", lambda ctx, i: ("GET", "/export/tasks?format=csv", {"headers": ctx.headers(i)})),
+    Scenario("POST /auth/login", lambda ctx, i: (
+        "POST", "/auth/login", {"json": {"email": ctx.login_emails[i % len(ctx.login_emails)], "password": PASSWORD}}
+    ), prepare=prepare_login_users),
+    Scenario("POST /auth/register", lambda ctx, i: (
+        "POST", "/auth/register", {"json": {"username": f"new_user_{i}", "email": f"new_user_{i}@benchmark.dev", "password": PASSWORD}}
+    ), expected_status=201),
+    Scenario("POST /lists/", lambda ctx, i: (
+        "POST", "/lists/", {"json": {"list_name": f"New list {i}"}, "headers": ctx.headers(i)}
+    ), expected_status=201),
+    Scenario("PUT /lists/{list_id}", lambda ctx, i: (
+        "PUT", f"/lists/{ctx.user(i).list_ids[0]}", {"json": {"list_name": f"Renamed {i}"}, "headers": ctx.headers(i)}
+    )),
+    Scenario("POST /tasks/", lambda ctx, i: (
+        "POST", "/tasks/", {"json": {"list_id": ctx.user(i).list_ids[0], "task_name": f"New task {i}"}, "headers": ctx.headers(i)}
+    ), expected_status=201),
+    Scenario("PUT /tasks/{task_id}", lambda ctx, i: (
+        "PUT", f"/tasks/{ctx.user(i).task_ids[i % len(ctx.user(i).task_ids)]}",
+        {"json": {"is_completed": bool(i % 2)}, "headers": ctx.headers(i)}
+    )),
+    Scenario("POST /tasks/{task_id}/move", lambda ctx, i: (
+        "POST", f"/tasks/{ctx.user(i).task_ids[1 + i % (len(ctx.user(i).task_ids) - 1)]}/move",
+        {"json": {"after_task_id": ctx.user(i).task_ids[0]}, "headers": ctx.headers(i)}
+    )),
+    Scenario("POST /tasks/bulk", lambda ctx, i: (
+        "POST", "/tasks/bulk", {"json": {"tasks": bulk_tasks(ctx, i)}, "headers": ctx.headers(i)}
+    )),
+    Scenario("POST /import/tasks (1000 rows)", lambda ctx, i: (
+        "POST", "/import/tasks", {"content": import_body(ctx, i), "headers": ctx.headers(i)}
+    )),
+    Scenario("PUT /tasks/bulk", lambda ctx, i: (
+        "PUT", "/tasks/bulk", {"json": {"tasks": [
+            {"task_id": task_id, "task_name": f"Bulk renamed {i}"} for task_id in bulk_task_ids(ctx, i)
+        ]}, "headers": ctx.headers(i)}
+    )),
+    Scenario("POST /tasks/bulk/complete", lambda ctx, i: (
+        "POST", "/tasks/bulk/complete", {"json": {"task_ids": bulk_task_ids(ctx, i), "is_completed": True}, "headers": ctx.headers(i)}
+    )),
+    Scenario("DELETE /tasks/{task_id}", lambda ctx, i: (
+        "DELETE", f"/tasks/{ctx.take_tasks(i)[0]}", {"headers": ctx.headers(i)}
+    )),
+    Scenario("POST /tasks/bulk/delete", lambda ctx, i: (
+        "POST", "/tasks/bulk/delete", {"json": {"task_ids": ctx.take_tasks(i, 10)}, "headers": ctx.headers(i)}
+    )),
+    Scenario("DELETE /lists/{list_id}", lambda ctx, i: (
+        "DELETE", f"/lists/{ctx.spare_lists[i]}", {"headers": ctx.headers(i)}
+    ), prepare=prepare_spare_lists),
+]
+
+
+def build_app(database_url: str):
+    """Recrea las tablas en database_url y conecta la aplicación a ese engine."""
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    if database_url.startswith("sqlite"):
+        # SQLite solo aplica ON DELETE CASCADE con las claves foráneas activadas
+        event.listen(engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+    database.Base.metadata.drop_all(engine)
+    database.Base.metadata.create_all(engine)
+    instrument_engine("benchmark", engine)
+    instrument_queries(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_benchmark_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    import main
+    main.app.dependency_overrides[database.get_db] = get_benchmark_db
+    return main.app, engine, session_factory
+
+
+def percentile(values: list, pct: float) -> float:
+    # Percentil por rango más cercano sobre valores ordenados
+    index = max(int(round(pct / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+async def run_scenario(client, scenario: Scenario, ctx: Context, queries: QueryCounter, requests: int, concurrency: int) -> dict:
+    if scenario.prepare:
+        await scenario.prepare(client, ctx, requests)
+    # Las peticiones se construyen antes de medir
+    pending = [scenario.build(ctx, i) for i in range(requests)]
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while pending:
+            method, url, kwargs = pending.pop()
+            start = perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(perf_counter() - start)
+            if response.status_code != scenario.expected_status:
+                errors += 1
+
+    queries_before = queries.count
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "queries": round((queries.count - queries_before) / requests, 2),
+    }
+
+
+async def run(args) -> dict:
+    app, engine, session_factory = build_app(args.database_url)
+    with session_factory() as db:
+        users = seed(db, args.users, args.lists, args.tasks)
+    ctx = Context(users)
+    queries = QueryCounter(engine)
+    api_key_cache.clear()
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Calentar la caché de API keys para que las consultas por petición
+        # no dependan de qué endpoint se mide primero
+        for index in range(len(users)):
+            await client.get("/lists/?limit=1", headers=ctx.headers(index))
+        for scenario in SCENARIOS:
+            if args.only and args.only not in scenario.name:
+                continue
+            results[scenario.name] = await run_scenario(client, scenario, ctx, queries, args.requests, args.concurrency)
+    engine.dispose()
+    return results
+
+
+def print_results(results: dict) -> None:
+    print(f"{'endpoint':<34} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'errors':>7}")
+    for name, result in results.items():
+        print(
+            f"{name:<34} {result['rps']:>9} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+            f"{result['p99_ms']:>8} {result['queries']:>8} {result['errors']:>7}"
+        )
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> Tuple[list, list]:
+    """Retorna las regresiones (consultas y errores) y los aumentos de p50 respecto al baseline."""
+    regressions = []
+    slowdowns = []
+    for name, result in results.items():
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} unexpected responses")
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        if result["queries"] > expected["queries"]:
+            regressions.append(f"{name}: {result['queries']} queries/request (baseline {expected['queries']})")
+        # La mediana es mucho más estable entre corridas que las colas; el
+        # mínimo absoluto evita falsos positivos en endpoints de ~1 ms
+        limit = max(expected["p50_ms"] * (1 + tolerance), expected["p50_ms"] + min_delta_ms)
+        if result["p50_ms"] > limit:
+            slowdowns.append(f"{name}: p50 {result['p50_ms']} ms (baseline {expected['p50_ms']} ms, limit {limit:.2f} ms)")
+    return regressions, slowdowns
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="In-process load benchmark for the To-Do API")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=5, help="lists per user")
+    parser.add_argument("--tasks", type=int, default=200, help="tasks per list")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--only", default=None, help="only run endpoints whose name contains this text")
+    parser.add_argument("--baseline", default=None, help="fail if results regress against this file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p50 increase over the baseline (0.5 = +50%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="p50 increases below this many ms are never reported")
+    parser.add_argument("--fail-on-latency", action="store_true", help="also fail when p50 exceeds the allowed increase")
+    parser.add_argument("--save-baseline", default=None, help="write the results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.database_url:
+            args.database_url = f"sqlite:///{tmp}/benchmark.db"
+        print(f"Seeding {args.users} users x {args.lists} lists x {args.tasks} tasks, {args.requests} requests per endpoint")
+        results = asyncio.run(run(args))
+
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions, slowdowns = compare(results, json.load(f), args.tolerance, args.min_delta_ms)
+        # La latencia depende de la carga de la máquina: solo falla si se pide
+        if args.fail_on_latency:
+            regressions += slowdowns
+        elif slowdowns:
+            print("\nSLOWER THAN BASELINE (not failing, see --fail-on-latency):")
+            for slowdown in slowdowns:
+                print(f"  - {slowdown}")
+        if regressions:
+            print("\nREGRESSIONS:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark de serialización de respuestas.
+
+Compara la ruta estándar de FastAPI (objetos ORM -> response_model ->
+jsonable_encoder -> json) con la ruta rápida de app/utils/serialization.py
+(filas como dicts -> TypeAdapter precompilado / orjson).
+
+Uso: python -m benchmarks.bench_serialization [filas] [repeticiones]
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.models import Task
+from app.models.schemas import TaskResponse
+from app.utils.serialization import tasks_adapter
+
+
+def build_rows(count: int) -> list:
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "task_id": index,
+            "list_id": index // 100 + 1,
+            "task_name": f"Task {index}",
+            "description": "Lorem ipsum dolor sit amet" if index % 2 else None,
+            "is_completed": index % 3 == 0,
+            "position": f"a{index % 62}",
+            "created_at": start + timedelta(seconds=index),
+            "updated_at": start + timedelta(seconds=index),
+        }
+        for index in range(count)
+    ]
+
+
+# FastAPI crea este campo una sola vez al registrar la ruta
+response_field = create_response_field(name="response", type_=List[TaskResponse], mode="serialization")
+
+
+def fastapi_path(objects: list) -> bytes:
+    # Equivalente a lo que hace FastAPI con response_model=List[TaskResponse]
+    content = asyncio.run(serialize_response(field=response_field, response_content=objects))
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def pydantic_path(rows: list) -> bytes:
+    return tasks_adapter.dump_json(tasks_adapter.validate_python(rows))
+
+
+def orjson_path(rows: list) -> bytes:
+    return orjson.dumps(rows)
+
+
+def measure(label: str, fn, payload, repeat: int) -> float:
+    fn(payload)
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        fn(payload)
+        best = min(best, perf_counter() - start)
+    print(f"{label:<12} {best * 1000:9.2f} ms")
+    return best
+
+
+def main(count: int = 10000, repeat: int = 5) -> None:
+    rows = build_rows(count)
+    objects = [Task(**row) for row in rows]
+
+    # Las tres rutas deben producir el mismo JSON
+    expected = orjson.loads(fastapi_path(objects))
+    assert orjson.loads(pydantic_path(rows)) == expected
+    assert orjson.loads(orjson_path(rows)) == expected
+
+    print(f"Serializing {count} tasks (best of {repeat})")
+    baseline = measure("fastapi", fastapi_path, objects, repeat)
+    for label, fn in (("pydantic", pydantic_path), ("orjson", orjson_path)):
+        elapsed = measure(label, fn, rows, repeat)
+        print(f"{'':<12} {baseline / elapsed:9.1f}x faster")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,151 @@
+"""
+Perfil del arranque en frío: costo de importación por módulo.
+
+Importa el módulo de entrada (main_function por defecto, el de Cloud
+Functions) en procesos nuevos con `python -X importtime`, y reporta la
+mediana del tiempo total de importación, los módulos con mayor tiempo propio
+y el total por paquete de primer nivel.
+
+Con --budget-ms el proceso termina con código 1 si la mediana supera el
+presupuesto. En cualquier caso falla si alguno de los módulos de --deferred
+(los que deben cargarse recién con la primera petición que los usa) se
+importó durante el arranque.
+
+Uso:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --budget-ms 1200
+    python -m benchmarks.bench_startup --module main --deferred ""
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, NamedTuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Variables mínimas para importar la aplicación sin un .env
+DEFAULT_ENV = {
+    "DB_HOST": "localhost", "DB_PORT": "5432", "DB_DATABASE": "benchmark",
+    "DB_USER": "benchmark", "DB_PASSWORD": "benchmark",
+}
+
+# Módulos que el arranque de main_function no debe importar: los drivers se
+# cargan al crear el engine, passlib/bcrypt con el primer registro o login y
+# cada controlador con la primera petición bajo su prefijo
+DEFERRED_MODULES = (
+    "app.controllers", "app.models.models", "passlib", "bcrypt",
+    "psycopg2", "asyncpg", "functions_framework", "flask",
+)
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def profile_imports(module: str, env: dict) -> List[ImportRecord]:
+    """Importa module en un proceso nuevo y retorna el detalle de -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    records = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append(ImportRecord(name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+def total_ms(records: List[ImportRecord]) -> float:
+    # Costo del módulo de entrada más lo que el intérprete importa antes (site, encodings)
+    top_level = [record for record in records if record.depth == 0]
+    return sum(record.cumulative_us for record in top_level) / 1000
+
+
+def by_package(records: List[ImportRecord]) -> dict:
+    totals = {}
+    for record in records:
+        package = record.module.split(".")[0]
+        totals[package] = totals.get(package, 0) + record.self_us
+    return totals
+
+
+def deferred_imports(records: List[ImportRecord], deferred: List[str]) -> List[str]:
+    return sorted({
+        prefix for record in records for prefix in deferred
+        if record.module == prefix or record.module.startswith(prefix + ".")
+    })
+
+
+def print_report(module: str, totals: List[float], records: List[ImportRecord], top: int) -> None:
+    print(f"import {module}: median {statistics.median(totals):.1f} ms "
+          f"(min {min(totals):.1f}, max {max(totals):.1f}, {len(totals)} runs)")
+
+    print(f"\n{'module (self time)':<56} {'self ms':>8} {'cumul. ms':>10}")
+    for record in sorted(records, key=lambda record: record.self_us, reverse=True)[:top]:
+        print(f"{record.module:<56} {record.self_us / 1000:>8.1f} {record.cumulative_us / 1000:>10.1f}")
+
+    print(f"\n{'package':<56} {'self ms':>8}")
+    packages = sorted(by_package(records).items(), key=lambda item: item[1], reverse=True)
+    for package, self_us in packages[:top]:
+        print(f"{package:<56} {self_us / 1000:>8.1f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import profile for the To-Do API")
+    parser.add_argument("--module", default="main_function", help="entry point module to import")
+    parser.add_argument("--runs", type=int, default=5, help="measured runs (after one warm-up run)")
+    parser.add_argument("--top", type=int, default=20, help="rows shown per table")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if the median import time exceeds this")
+    parser.add_argument(
+        "--deferred", default=",".join(DEFERRED_MODULES),
+        help="comma-separated modules that must not be imported at startup ('' to disable)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    env = {**DEFAULT_ENV, **os.environ}
+
+    # La primera corrida compila los .pyc que falten y no se mide
+    profile_imports(args.module, env)
+    runs = [profile_imports(args.module, env) for _ in range(args.runs)]
+    totals = [total_ms(records) for records in runs]
+    median_run = runs[totals.index(sorted(totals)[len(totals) // 2])]
+
+    print_report(args.module, totals, median_run, args.top)
+
+    failures = []
+    deferred = [name for name in args.deferred.split(",") if name]
+    imported = deferred_imports(median_run, deferred)
+    if imported:
+        failures.append(f"imported at startup: {', '.join(imported)}")
+    if args.budget_ms is not None and statistics.median(totals) > args.budget_ms:
+        failures.append(f"median import time {statistics.median(totals):.1f} ms exceeds budget of {args.budget_ms} ms")
+
+    if failures:
+        print("\nStartup check failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    if args.budget_ms is not None:
+        print(f"\nWithin budget ({args.budget_ms} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
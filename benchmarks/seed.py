@@ -0,0 +1,86 @@
+"""
+Datos de prueba para los benchmarks: N usuarios x M listas x K tareas,
+insertados con los modelos de app/models/models.py.
+"""
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.models.models import APIKey, List, Task, User
+from app.utils.positions import keys_between
+from app.utils.api_keys import generate_api_key
+from app.utils.password_hasher import password_hasher
+
+PASSWORD = "benchmark-password"
+
+
+class SeededUser(NamedTuple):
+    user_id: int
+    username: str
+    api_key: str
+    list_ids: list
+    task_ids: list
+
+
+def seed(db: Session, users: int, lists_per_user: int, tasks_per_list: int) -> list:
+    """
+    Inserta el conjunto de datos y retorna los usuarios creados con sus
+    API keys e ids de listas y tareas, en orden de creación.
+    """
+    # Un solo hash para todos los usuarios: bcrypt no es lo que se mide aquí
+    password_hash = password_hasher.context.hash(PASSWORD)
+    start = datetime.utcnow() - timedelta(days=30)
+
+    seeded = []
+    for user_index in range(users):
+        username = f"bench_user_{user_index}"
+        user_id = db.execute(
+            insert(User).returning(User.user_id),
+            {"username": username, "email": f"{username}@benchmark.dev", "password_hash": password_hash, "created_at": start}
+        ).scalar_one()
+        issued = generate_api_key()
+        api_key = issued.api_key
+        db.execute(insert(APIKey), {
+            "user_id": user_id,
+            "key_prefix": issued.key_prefix,
+            "key_hash": issued.key_hash,
+            "created_at": start,
+            "expires_at": datetime.utcnow() + timedelta(days=1),
+        })
+
+        db.execute(insert(List), [
+            {
+                "user_id": user_id,
+                "list_name": f"List {list_index}",
+                "created_at": start + timedelta(minutes=list_index),
+                "updated_at": start + timedelta(minutes=list_index),
+            }
+            for list_index in range(lists_per_user)
+        ])
+        list_ids = list(db.execute(
+            select(List.list_id).where(List.user_id == user_id).order_by(List.list_id)
+        ).scalars())
+
+        positions = keys_between(None, None, tasks_per_list)
+        db.execute(insert(Task), [
+            {
+                "list_id": list_id,
+                "user_id": user_id,
+                "task_name": f"Task {task_index}",
+                "description": f"Description for task {task_index}" if task_index % 2 else None,
+                "is_completed": task_index % 3 == 0,
+                "position": positions[task_index],
+                "created_at": start + timedelta(seconds=task_index),
+                "updated_at": start + timedelta(seconds=task_index),
+            }
+            for list_id in list_ids
+            for task_index in range(tasks_per_list)
+        ])
+        task_ids = list(db.execute(
+            select(Task.task_id).where(Task.list_id.in_(list_ids)).order_by(Task.task_id)
+        ).scalars())
+
+        seeded.append(SeededUser(user_id, username, api_key, list_ids, task_ids))
+
+    db.commit()
+    return seeded
@@ -1,3 +1,6 @@
+-- Extensión para la búsqueda por similitud de trigramas
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 
 -- Tabla para almacenar los usuarios
 CREATE TABLE users (
@@ -5,7 +8,8 @@ CREATE TABLE users (
     username VARCHAR(50) UNIQUE NOT NULL,
     email VARCHAR(100) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    data_version INT NOT NULL DEFAULT 0
 );
 
 -- Tabla para almacenar las listas de tareas
@@ -14,6 +18,9 @@ CREATE TABLE lists (
     user_id INT NOT NULL,
     list_name VARCHAR(100) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- users.data_version de la última escritura de la fila (GET /sync)
+    change_version INT NOT NULL DEFAULT 0,
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
 );
 
@@ -21,19 +28,45 @@ CREATE TABLE lists (
 CREATE TABLE tasks (
     task_id SERIAL PRIMARY KEY,
     list_id INT NOT NULL,
+    -- Dueño de la lista, copiado para paginar todas las tareas del usuario por índice
+    user_id INT NOT NULL,
     task_name VARCHAR(100) NOT NULL,
     description TEXT,
     is_completed BOOLEAN DEFAULT FALSE,
+    -- Orden manual dentro de la lista (claves fraccionarias, ver app/utils/positions.py);
+    -- COLLATE "C" compara byte a byte, igual que Python
+    position VARCHAR(255) COLLATE "C" NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (list_id) REFERENCES lists(list_id) ON DELETE CASCADE
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    change_version INT NOT NULL DEFAULT 0,
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('simple', coalesce(task_name, '') || ' ' || coalesce(description, ''))
+    ) STORED,
+    FOREIGN KEY (list_id) REFERENCES lists(list_id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
 );
 
 -- Tabla para almacenar las API keys (protección del backend)
 CREATE TABLE api_keys (
     api_key_id SERIAL PRIMARY KEY,
     user_id INT NOT NULL,
-    api_key VARCHAR(64) UNIQUE NOT NULL,
+    -- Formato de la key: <key_prefix>.<secreto>; del secreto solo se guarda su SHA-256
+    key_prefix VARCHAR(16) UNIQUE NOT NULL,
+    key_hash CHAR(64) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    revoked_at TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+-- Tabla para registrar las listas y tareas eliminadas (GET /sync)
+CREATE TABLE tombstones (
+    tombstone_id SERIAL PRIMARY KEY,
+    user_id INT NOT NULL,
+    resource VARCHAR(8) NOT NULL,
+    row_id INT NOT NULL,
+    change_version INT NOT NULL,
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
 );
 
@@ -41,4 +74,26 @@ CREATE TABLE api_keys (
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_lists_user_id ON lists(user_id);
 CREATE INDEX idx_tasks_list_id ON tasks(list_id);
-CREATE INDEX idx_api_keys_user_id ON api_keys(user_id);
\ No newline at end of file
+CREATE INDEX idx_api_keys_user_created ON api_keys(user_id, created_at);
+CREATE INDEX idx_api_keys_expires_at ON api_keys(expires_at);
+
+-- Índices compuestos para la paginación keyset (created_at, id)
+CREATE INDEX idx_lists_user_created ON lists(user_id, created_at, list_id);
+CREATE INDEX idx_tasks_list_created ON tasks(list_id, created_at, task_id);
+CREATE INDEX idx_tasks_list_completed_created ON tasks(list_id, is_completed, created_at, task_id);
+CREATE INDEX idx_tasks_user_created ON tasks(user_id, created_at, task_id);
+CREATE INDEX idx_tasks_user_completed_created ON tasks(user_id, is_completed, created_at, task_id);
+
+-- Índices para la búsqueda de texto (GET /tasks/search)
+CREATE INDEX idx_tasks_search ON tasks USING GIN (search_vector);
+CREATE INDEX idx_tasks_name_trgm ON tasks USING GIN (task_name gin_trgm_ops);
+
+-- Índices para la sincronización incremental (GET /sync)
+CREATE INDEX idx_lists_user_version ON lists(user_id, change_version);
+CREATE INDEX idx_tasks_list_version ON tasks(list_id, change_version);
+CREATE INDEX idx_tombstones_user_version ON tombstones(user_id, change_version);
+
+-- Índices para el orden manual de las tareas (GET /tasks?order=position y POST /tasks/{id}/move)
+CREATE INDEX idx_tasks_list_position ON tasks(list_id, position, task_id);
+-- Listas con claves largas, pendientes de rebalanceo (app.cli.rebalance_positions)
+CREATE INDEX idx_tasks_long_position ON tasks(list_id) WHERE length(position) > 32;
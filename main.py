@@ -1,8 +1,19 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.controllers.task_controller import router as task_router
 from app.controllers.user_controller import router as user_router
 from app.controllers.list_controller import router as list_router
+from app.controllers.metrics_controller import router as metrics_router
+from app.controllers.export_controller import router as export_router
+from app.controllers.import_controller import router as import_router
+from app.controllers.sync_controller import router as sync_router
+from app.controllers.events_controller import router as events_router
+from app.config.settings import API_KEY_PRUNE_INTERVAL_SECONDS, POSITION_REBALANCE_INTERVAL_SECONDS
+from app.services.api_key_service import prune_api_keys_periodically
+from app.services.position_service import rebalance_positions_periodically
+from app.utils.change_feed import change_feed
+from app.utils.query_metrics import QueryMetricsMiddleware
 
 app = FastAPI(
     title="To-Do App API",
@@ -20,10 +31,40 @@ app.add_middleware(
     expose_headers=["*"]  # Expone todos los headers
 )
 
+# Consultas SQL por petición: header Server-Timing y métricas en /metrics
+app.add_middleware(QueryMetricsMiddleware)
+
 # Incluir routers
 app.include_router(user_router)
 app.include_router(list_router)
 app.include_router(task_router)
+app.include_router(metrics_router)
+app.include_router(export_router)
+app.include_router(import_router)
+app.include_router(sync_router)
+app.include_router(events_router)
+
+# Tareas en segundo plano; se conserva la referencia para que no se recolecten
+background_tasks = set()
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # Limpieza periódica de API keys vencidas o revocadas
+    if API_KEY_PRUNE_INTERVAL_SECONDS > 0:
+        task = asyncio.create_task(prune_api_keys_periodically(API_KEY_PRUNE_INTERVAL_SECONDS))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+    # Rebalanceo periódico de las posiciones de tareas con claves largas
+    if POSITION_REBALANCE_INTERVAL_SECONDS > 0:
+        task = asyncio.create_task(rebalance_positions_periodically(POSITION_REBALANCE_INTERVAL_SECONDS))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+    # Listener de LISTEN/NOTIFY de los eventos de cambios (CHANGE_FEED_BACKEND=postgres)
+    await change_feed.start()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await change_feed.stop()
 
 @app.get("/")
 async def root():
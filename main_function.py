@@ -1,10 +1,8 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from functions_framework import logging
 
-from app.controllers.user_controller import router as user_router
-from app.controllers.list_controller import router as list_router
-from app.controllers.task_controller import router as task_router
+from app.utils.lazy_routers import LazyRouters, LazyRoutersMiddleware
+from app.utils.query_metrics import QueryMetricsMiddleware
 
 app = FastAPI(
     title="Todo List API",
@@ -19,12 +17,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["*"],
 )
 
-# Incluir los routers
-app.include_router(user_router, prefix="/auth", tags=["Authentication"])
-app.include_router(list_router, prefix="/lists", tags=["Lists"])
-app.include_router(task_router, prefix="/tasks", tags=["Tasks"])
+# Consultas SQL por petición: header Server-Timing y métricas en /metrics
+app.add_middleware(QueryMetricsMiddleware)
+
+# Incluir los routers: cada controlador se importa con la primera petición
+# bajo su prefijo, no durante el arranque en frío
+routers = LazyRouters(app)
+routers.add("/auth", "app.controllers.user_controller", prefix="/auth", tags=["Authentication"])
+routers.add("/lists", "app.controllers.list_controller", prefix="/lists", tags=["Lists"])
+routers.add("/tasks", "app.controllers.task_controller", prefix="/tasks", tags=["Tasks"])
+routers.add("/metrics", "app.controllers.metrics_controller", tags=["Metrics"])
+routers.add("/export", "app.controllers.export_controller", tags=["Export"])
+routers.add("/import", "app.controllers.import_controller", tags=["Import"])
+routers.add("/sync", "app.controllers.sync_controller", tags=["Sync"])
+app.add_middleware(LazyRoutersMiddleware, routers=routers)
 
 @app.get("/")
 async def root():
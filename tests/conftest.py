@@ -0,0 +1,86 @@
+import os
+
+# Configuración mínima para importar la aplicación sin un .env: SQLite en
+# memoria, sin límites de peticiones ni caché de respuestas compartida
+os.environ.update(
+    DB_HOST="localhost", DB_PORT="5432", DB_DATABASE="test", DB_USER="test", DB_PASSWORD="test",
+    RATE_LIMIT_BACKEND="none", CACHE_BACKEND="none", CHANGE_FEED_BACKEND="memory",
+    METRICS_TOKEN="test",
+)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture
+def engine():
+    from app.config.database import Base
+    from app.models import models  # noqa: F401 (registra las tablas)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(engine):
+    import main
+    from app.config import database
+    from app.utils.auth_cache import api_key_cache
+
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[database.get_db] = get_test_db
+    api_key_cache.clear()
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+    api_key_cache.clear()
+
+
+@pytest.fixture
+def queries(engine):
+    """Sentencias SQL ejecutadas desde que se pide el fixture."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def register(client):
+    """Registra un usuario y retorna los headers con su API key."""
+    def register(username: str) -> dict:
+        response = client.post(
+            "/auth/register",
+            json={"username": username, "email": f"{username}@example.com", "password": "secret-password"}
+        )
+        assert response.status_code == 201, response.text
+        return {"X-API-Key": response.json()["api_key"]}
+    return register
+
+
+@pytest.fixture
+def headers(register):
+    return register("alice")
+
+
+@pytest.fixture
+def list_id(client, headers):
+    response = client.post("/lists/", json={"list_name": "Compras"}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["list_id"]
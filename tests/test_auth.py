@@ -0,0 +1,31 @@
+def test_cached_api_key_skips_database(client, headers, queries):
+    assert client.get("/lists/", headers=headers).status_code == 200
+    queries.clear()
+
+    response = client.get("/lists/", headers=headers)
+
+    assert response.status_code == 200
+    assert not any("api_keys" in statement for statement in queries)
+
+
+def test_invalid_api_key_is_rejected(client, headers):
+    prefix = headers["X-API-Key"].split(".")[0]
+    for api_key in ("not-a-key", f"{prefix}.wrong-secret"):
+        response = client.get("/lists/", headers={"X-API-Key": api_key})
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Invalid API key"
+
+
+def test_revoked_key_is_dropped_from_cache(client, headers):
+    from app.config.settings import API_KEY_MAX_ACTIVE
+
+    assert client.get("/lists/", headers=headers).status_code == 200
+
+    # Cada login emite una key nueva y revoca las que exceden el máximo activo
+    credentials = {"email": "alice@example.com", "password": "secret-password"}
+    for _ in range(API_KEY_MAX_ACTIVE):
+        assert client.post("/auth/login", json=credentials).status_code == 200
+
+    response = client.get("/lists/", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "API key revoked"
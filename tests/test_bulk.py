@@ -0,0 +1,64 @@
+def test_bulk_create_reports_each_item(client, headers, register, list_id):
+    foreign_list = client.post("/lists/", json={"list_name": "Ajena"}, headers=register("bob")).json()["list_id"]
+    tasks = [
+        {"list_id": list_id, "task_name": "Leche"},
+        {"list_id": foreign_list, "task_name": "Pan"},
+        {"list_id": list_id, "task_name": "Huevos"},
+    ]
+
+    response = client.post("/tasks/bulk", json={"tasks": tasks}, headers=headers)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["status"] for result in results] == [201, 403, 201]
+    assert [result["task"]["task_name"] for result in results if result["task"]] == ["Leche", "Huevos"]
+    # Se agregan al final de la lista, en el orden del lote
+    positions = [result["task"]["position"] for result in results if result["task"]]
+    assert positions == sorted(positions)
+
+
+def test_bulk_update_applies_partial_changes(client, headers, list_id):
+    created = client.post("/tasks/bulk", json={"tasks": [
+        {"list_id": list_id, "task_name": "Leche"},
+        {"list_id": list_id, "task_name": "Pan"},
+    ]}, headers=headers).json()["results"]
+    first, second = (result["task_id"] for result in created)
+
+    response = client.put("/tasks/bulk", json={"tasks": [
+        {"task_id": first, "task_name": "Leche entera"},
+        {"task_id": second, "is_completed": True},
+        {"task_id": 999999, "is_completed": True},
+    ]}, headers=headers)
+
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [200, 200, 404]
+    assert results[0]["task"]["task_name"] == "Leche entera"
+    assert results[0]["task"]["is_completed"] is False
+    assert results[1]["task"]["task_name"] == "Pan"
+    assert results[1]["task"]["is_completed"] is True
+
+
+def test_bulk_update_rejects_null_fields(client, headers, list_id):
+    task_id = client.post("/tasks/", json={"list_id": list_id, "task_name": "Leche"}, headers=headers).json()["task_id"]
+
+    for field in ("task_name", "is_completed"):
+        response = client.put("/tasks/bulk", json={"tasks": [{"task_id": task_id, field: None}]}, headers=headers)
+        assert response.status_code == 422
+
+    assert client.get(f"/tasks/{task_id}", headers=headers).json()["task_name"] == "Leche"
+
+
+def test_bulk_complete_and_delete(client, headers, list_id):
+    created = client.post("/tasks/bulk", json={"tasks": [
+        {"list_id": list_id, "task_name": "Leche"},
+        {"list_id": list_id, "task_name": "Pan"},
+    ]}, headers=headers).json()["results"]
+    task_ids = [result["task_id"] for result in created]
+
+    response = client.post("/tasks/bulk/complete", json={"task_ids": task_ids}, headers=headers)
+    assert all(result["task"]["is_completed"] for result in response.json()["results"])
+
+    response = client.post("/tasks/bulk/delete", json={"task_ids": task_ids + [999999]}, headers=headers)
+    assert [result["status"] for result in response.json()["results"]] == [200, 200, 404]
+    assert client.get("/tasks/", headers=headers).json() == []
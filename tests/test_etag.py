@@ -0,0 +1,35 @@
+def test_unchanged_collection_returns_304(client, headers, list_id):
+    response = client.get("/tasks/", headers=headers)
+    etag = response.headers["ETag"]
+
+    response = client.get("/tasks/", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_write_changes_etag(client, headers, list_id):
+    etag = client.get("/lists/", headers=headers).headers["ETag"]
+
+    client.post("/tasks/", json={"list_id": list_id, "task_name": "Leche"}, headers=headers)
+    response = client.get("/lists/", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_etag_depends_on_query(client, headers, list_id):
+    etag = client.get("/tasks/", headers=headers).headers["ETag"]
+
+    response = client.get("/tasks/", params={"is_completed": True}, headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+
+
+def test_weak_and_wildcard_etags_match(client, headers):
+    etag = client.get("/lists/", headers=headers).headers["ETag"]
+
+    for if_none_match in (f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get("/lists/", headers={**headers, "If-None-Match": if_none_match})
+        assert response.status_code == 304
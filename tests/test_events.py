@@ -0,0 +1,27 @@
+import json
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+
+def test_websocket_accepts_header_and_subprotocol(client, headers, list_id):
+    with client.websocket_connect("/events/ws", headers=headers) as by_header, \
+            client.websocket_connect("/events/ws", subprotocols=["api-key", headers["X-API-Key"]]) as by_protocol:
+        assert by_protocol.accepted_subprotocol == "api-key"
+
+        client.put(f"/lists/{list_id}", json={"list_name": "Super"}, headers=headers)
+
+        for websocket in (by_header, by_protocol):
+            # Los eventos se envían como mensajes binarios con JSON
+            event = json.loads(websocket.receive_bytes())
+            while event["type"] == "ping":
+                event = json.loads(websocket.receive_bytes())
+            assert event["type"] == "list.updated"
+            assert event["ids"] == [list_id]
+
+
+def test_websocket_rejects_api_key_in_query(client, headers):
+    with pytest.raises(WebSocketDisconnect) as error:
+        with client.websocket_connect(f"/events/ws?api_key={headers['X-API-Key']}") as websocket:
+            websocket.receive_bytes()
+
+    assert error.value.code == 1008
@@ -0,0 +1,54 @@
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+def create_tasks(client, headers, list_id, count):
+    tasks = [{"list_id": list_id, "task_name": f"Tarea {index}"} for index in range(count)]
+    response = client.post("/tasks/bulk", json={"tasks": tasks}, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def test_cursor_pagination_walks_all_tasks(client, headers, list_id):
+    create_tasks(client, headers, list_id, 7)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/tasks/", params=params, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 3
+        seen.extend(task["task_id"] for task in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+
+
+def test_tasks_are_paged_by_default(client, headers, list_id):
+    create_tasks(client, headers, list_id, DEFAULT_PAGE_SIZE + 1)
+
+    response = client.get("/tasks/", headers=headers)
+
+    assert len(response.json()) == DEFAULT_PAGE_SIZE
+    assert response.headers.get("X-Next-Cursor")
+
+
+def test_page_size_is_bounded(client, headers):
+    assert client.get("/tasks/", params={"limit": MAX_PAGE_SIZE + 1}, headers=headers).status_code == 422
+    assert client.get("/lists/", params={"limit": 0}, headers=headers).status_code == 422
+
+
+def test_invalid_cursor_is_rejected(client, headers):
+    response = client.get("/lists/", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_lists_filter_by_owner(client, headers, register, list_id):
+    other = register("bob")
+    client.post("/lists/", json={"list_name": "Ajena"}, headers=other)
+
+    response = client.get("/lists/", headers=headers)
+
+    assert [row["list_id"] for row in response.json()] == [list_id]
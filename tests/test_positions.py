@@ -0,0 +1,69 @@
+import random
+import pytest
+from app.utils.positions import key_between, keys_between
+
+
+def test_key_between_orders_keys():
+    first = key_between(None, None)
+    after = key_between(first, None)
+    before = key_between(None, first)
+    middle = key_between(first, after)
+
+    assert before < first < middle < after
+
+
+def test_repeated_inserts_between_neighbours_stay_ordered():
+    low, high = key_between(None, None), None
+    high = key_between(low, None)
+    for _ in range(200):
+        low = key_between(low, high)
+    assert low < high
+    assert len(low) < 100
+
+
+def test_keys_between_returns_sorted_distinct_keys():
+    keys = keys_between("a0", "a1", 50)
+
+    assert keys == sorted(keys)
+    assert len(set(keys)) == 50
+    assert "a0" < keys[0] and keys[-1] < "a1"
+
+
+def test_random_moves_keep_a_total_order():
+    rng = random.Random(7)
+    keys = keys_between(None, None, 20)
+    for _ in range(500):
+        index = rng.randrange(len(keys) + 1)
+        low = keys[index - 1] if index > 0 else None
+        high = keys[index] if index < len(keys) else None
+        keys.insert(index, key_between(low, high))
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+
+def test_invalid_ranges_are_rejected():
+    with pytest.raises(ValueError):
+        key_between("a1", "a0")
+
+
+def test_move_rewrites_only_the_moved_task(client, headers, list_id, queries):
+    created = client.post("/tasks/bulk", json={"tasks": [
+        {"list_id": list_id, "task_name": name} for name in ("A", "B", "C")
+    ]}, headers=headers).json()["results"]
+    first, _, last = (result["task_id"] for result in created)
+
+    queries.clear()
+    response = client.post(f"/tasks/{last}/move", json={"before_task_id": first}, headers=headers)
+
+    assert response.status_code == 200
+    assert sum(statement.lstrip().upper().startswith("UPDATE TASKS") for statement in queries) == 1
+    order = client.get("/tasks/", params={"list_id": list_id, "order": "position"}, headers=headers).json()
+    assert [task["task_name"] for task in order] == ["C", "A", "B"]
+
+
+def test_move_requires_a_neighbour_in_the_same_list(client, headers, list_id):
+    task_id = client.post("/tasks/", json={"list_id": list_id, "task_name": "A"}, headers=headers).json()["task_id"]
+
+    response = client.post(f"/tasks/{task_id}/move", json={"after_task_id": 999999}, headers=headers)
+
+    assert response.status_code == 404
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.utils.rate_limit import MemoryRateLimitBackend, RateLimiter, RedisRateLimitBackend
+
+
+def check(limiter, key, user_id=None):
+    asyncio.run(limiter.check(key, user_id))
+
+
+def test_burst_then_429_with_retry_after():
+    limiter = RateLimiter(MemoryRateLimitBackend(), "key", rate=0.5, burst=3)
+    for _ in range(3):
+        check(limiter, "a")
+
+    with pytest.raises(HTTPException) as error:
+        check(limiter, "a")
+
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "2"
+    # Cada clave tiene su propio bucket
+    check(limiter, "b")
+
+
+def test_usage_counts_requests_and_rejections():
+    limiter = RateLimiter(MemoryRateLimitBackend(), "key", rate=0.5, burst=1)
+    check(limiter, "a", user_id=7)
+    with pytest.raises(HTTPException):
+        check(limiter, "a", user_id=7)
+
+    assert asyncio.run(limiter.usage()) == {"a": {"user_id": 7, "requests": 2, "limited": 1}}
+    assert limiter.stats()["limited"] == 1
+
+
+def test_backend_errors_fail_open():
+    class BrokenBackend:
+        blocking = False
+
+        def take(self, *args):
+            raise ConnectionError("down")
+
+    limiter = RateLimiter(BrokenBackend(), "key", rate=1, burst=1)
+    for _ in range(3):
+        check(limiter, "a")
+    assert limiter.stats()["errors"] == 3
+
+
+def test_redis_backend_shares_buckets():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis(decode_responses=True)
+    workers = [RateLimiter(RedisRateLimitBackend(client=client), "key", rate=0.5, burst=2) for _ in range(2)]
+
+    check(workers[0], "a", user_id=7)
+    check(workers[1], "a", user_id=7)
+    with pytest.raises(HTTPException):
+        check(workers[0], "a", user_id=7)
+
+    assert asyncio.run(workers[1].usage()) == {"a": {"user_id": 7, "requests": 3, "limited": 1}}
+    # Los contadores de uso no quedan en Redis para siempre
+    assert 0 < client.ttl("todo:usage:key:a") <= 86400
+
+
+@pytest.fixture
+def limiters(monkeypatch):
+    from app.utils import rate_limit
+
+    backend = MemoryRateLimitBackend()
+    for limiter in (rate_limit.api_key_rate_limiter, rate_limit.auth_rate_limiter):
+        monkeypatch.setattr(limiter, "backend", backend)
+        monkeypatch.setattr(limiter, "burst", 2)
+        monkeypatch.setattr(limiter, "rate", 0.01)
+    return rate_limit.api_key_rate_limiter, rate_limit.auth_rate_limiter
+
+
+def test_requests_over_the_limit_get_429(client, headers, limiters):
+    statuses = [client.get("/lists/", headers=headers).status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+
+
+def test_invalid_keys_do_not_drain_the_key_bucket(client, headers, limiters):
+    api_key_limiter, auth_limiter = limiters
+    prefix = headers["X-API-Key"].split(".")[0]
+
+    # Con el prefijo público de otra key y un secreto falso se consume el límite por IP
+    statuses = [client.get("/lists/", headers={"X-API-Key": f"{prefix}.wrong"}).status_code for _ in range(3)]
+    assert statuses == [401, 401, 429]
+
+    assert client.get("/lists/", headers=headers).status_code == 200
+    usage = asyncio.run(api_key_limiter.usage())
+    assert usage == {prefix: {"user_id": usage[prefix]["user_id"], "requests": 1, "limited": 0}}
+    assert asyncio.run(auth_limiter.usage())["testclient"]["limited"] == 1
@@ -0,0 +1,11 @@
+from benchmarks import bench_startup
+
+# Mismo presupuesto que se documenta para el arranque en frío de main_function
+STARTUP_BUDGET_MS = 1200
+
+
+def test_main_function_import_within_budget(capsys):
+    # Falla también si se importan al arrancar módulos que deben diferirse
+    # (controladores, drivers, passlib)
+    exit_code = bench_startup.main(["--runs", "3", "--budget-ms", str(STARTUP_BUDGET_MS)])
+    assert exit_code == 0, capsys.readouterr().out
@@ -0,0 +1,36 @@
+def test_incremental_sync_returns_changes_and_tombstones(client, headers, list_id):
+    keep = client.post("/tasks/", json={"list_id": list_id, "task_name": "Leche"}, headers=headers).json()["task_id"]
+    drop = client.post("/tasks/", json={"list_id": list_id, "task_name": "Pan"}, headers=headers).json()["task_id"]
+
+    full = client.get("/sync/", headers=headers).json()
+    assert full["full"] is True
+    assert {task["task_id"] for task in full["tasks"]} == {keep, drop}
+
+    client.put(f"/tasks/{keep}", json={"is_completed": True}, headers=headers)
+    client.delete(f"/tasks/{drop}", headers=headers)
+    delta = client.get("/sync/", params={"since": full["token"]}, headers=headers).json()
+
+    assert delta["full"] is False
+    assert delta["token"] > full["token"]
+    assert [task["task_id"] for task in delta["tasks"]] == [keep]
+    assert delta["lists"] == []
+    assert delta["deleted"] == {"lists": [], "tasks": [drop]}
+
+    empty = client.get("/sync/", params={"since": delta["token"]}, headers=headers).json()
+    assert empty["tasks"] == [] and empty["deleted"] == {"lists": [], "tasks": []}
+
+
+def test_deleted_list_leaves_tombstone(client, headers, list_id):
+    token = client.get("/sync/", headers=headers).json()["token"]
+
+    client.delete(f"/lists/{list_id}", headers=headers)
+    delta = client.get("/sync/", params={"since": token}, headers=headers).json()
+
+    assert delta["deleted"]["lists"] == [list_id]
+
+
+def test_token_from_the_future_forces_full_sync(client, headers, list_id):
+    response = client.get("/sync/", params={"since": 10 ** 6}, headers=headers).json()
+
+    assert response["full"] is True
+    assert [row["list_id"] for row in response["lists"]] == [list_id]